@@ -1,14 +1,38 @@
 import sqlite3
-from flask import Flask, render_template, request, jsonify, redirect, url_for, session, flash, make_response
-from datetime import datetime, timedelta
+from flask import Flask, Request, Response, g, render_template, request, jsonify, redirect, url_for, session, flash, make_response, send_file
+from datetime import datetime, timedelta, timezone
 from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.middleware.proxy_fix import ProxyFix
+from werkzeug.utils import secure_filename
+import atexit
+import bisect
+import click
+import csv
+import fcntl
+import functools
+import glob
+import gzip
+import hashlib
+import hmac
+import json
+import multiprocessing
 import os
-import uuid
-from io import BytesIO
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import cm
-from reportlab.lib.utils import simpleSplit
+import queue
+import random
+import re
+import secrets
+import struct
+import tempfile
+import threading
+import time
+import zipfile
+import zlib
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextlib import contextmanager, nullcontext
+from io import BytesIO, StringIO
+from itertools import islice
 
 app = Flask(__name__)
 app.secret_key = os.environ.get("SECRET_KEY", "change-this-secret")
@@ -18,9 +42,18 @@ app.config.update(
     SESSION_COOKIE_SAMESITE='Lax',
 )
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "complaints.db")
+DB_PATH = os.environ.get("DB_PATH") or os.path.join(os.path.dirname(__file__), "complaints.db")
+# old Resolved/Rejected complaints move here (see archive_complaints); it is
+# ATTACHed to every connection as "archive"
+ARCHIVE_DB_PATH = os.environ.get("ARCHIVE_DB_PATH") or os.path.splitext(DB_PATH)[0] + "-archive.db"
 OFFICER_PIN = os.environ.get("OFFICER_PIN", "thfvcbdkiem3640")
 
+# Number of reverse proxies in front of the app (1 on Render); needed so
+# request.remote_addr is the client, not the proxy.
+TRUSTED_PROXIES = int(os.environ.get("TRUSTED_PROXIES", 0))
+if TRUSTED_PROXIES:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXIES)
+
 # ---------- i18n ----------
 I18N = {
     'en': {
@@ -38,6 +71,8 @@ I18N = {
         'firka': 'Firka',
         'village': 'Village',
         'description': 'Description',
+        'evidence': 'Evidence (optional)',
+        'evidence_helper': 'Photos, screenshots, audio, video or documents: up to {files} files, {mb} MB each.',
         'submit_btn': 'Submit',
         'login_prompt': 'Please login to submit a petition.',
         'guidelines_title': 'Guidelines',
@@ -75,6 +110,8 @@ I18N = {
         'firka': 'ஃபிர்கா',
         'village': 'கிராமம்',
         'description': 'விவரம்',
+        'evidence': 'ஆதாரங்கள் (விருப்பத்தேர்வு)',
+        'evidence_helper': 'புகைப்படங்கள், திரைப்பிடிப்புகள், ஒலி, காணொளி அல்லது ஆவணங்கள்: அதிகபட்சம் {files} கோப்புகள், ஒவ்வொன்றும் {mb} MB.',
         'submit_btn': 'சமர்ப்பிக்க',
         'login_prompt': 'மனு சமர்ப்பிக்க தயவு செய்து உள்நுழைக.',
         'guidelines_title': 'வழிகாட்டுதல்',
@@ -173,6 +210,36 @@ locations = {
 }
 # ----------------------------------------------------------------------
 
+# Validation index, built once: constant-time membership checks for submit
+# and the officer filters.
+VALID_TALUKS = frozenset(locations)
+VALID_FIRKAS = frozenset((t, f) for t, firkas in locations.items() for f in firkas)
+VALID_VILLAGES = frozenset(
+    (t, f, v) for t, firkas in locations.items() for f, villages in firkas.items() for v in villages
+)
+
+
+def is_valid_location(taluk, firka=None, village=None) -> bool:
+    if village is not None:
+        return (taluk, firka, village) in VALID_VILLAGES
+    if firka is not None:
+        return (taluk, firka) in VALID_FIRKAS
+    return taluk in VALID_TALUKS
+
+
+def _static_json(obj) -> dict:
+    body = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+    return {
+        "body": body,
+        "gzip": gzip.compress(body, compresslevel=9, mtime=0),
+        "etag": hashlib.sha256(body).hexdigest()[:32],
+    }
+
+
+# /locations payloads are serialised and compressed once at import
+LOCATIONS_PAYLOAD = _static_json(locations)
+TALUK_PAYLOADS = {taluk: _static_json(firkas) for taluk, firkas in locations.items()}
+
 STATUS_VALUES = ["Pending", "In Progress", "Resolved", "Rejected"]
 STATUS_COLORS = {"Pending":"#f44336","In Progress":"#ff9800","Resolved":"#4caf50","Rejected":"#9e9e9e"}
 STATUS_TAMIL = {"Pending":"நிலுவையில்","In Progress":"செயல்பாட்டில்","Resolved":"தீர்க்கப்பட்டது","Rejected":"நிராகரிக்கப்பட்டது"}
@@ -184,7 +251,7 @@ def inject_i18n():
         lang = 'en'
     def status_text(s: str) -> str:
         return STATUS_TAMIL.get(s, s) if lang == 'ta' else s
-    return dict(tr=I18N[lang], current_lang=lang, status_text=status_text)
+    return dict(tr=I18N[lang], current_lang=lang, status_text=status_text, locations_version=LOCATIONS_PAYLOAD["etag"])
 
 @app.route('/lang/<code>')
 def set_lang(code: str):
@@ -193,88 +260,868 @@ def set_lang(code: str):
     session['lang'] = code
     return redirect(request.referrer or url_for('index'))
 
-# ---------- DB helpers ----------
-def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    # users
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS users (
-            mobile TEXT PRIMARY KEY,
-            password_hash TEXT NOT NULL,
-            created_at TEXT NOT NULL
-        )
-        """
+# ---------- Metrics ----------
+METRICS_ENABLED = os.environ.get("METRICS", "1") == "1"
+METRICS_DIR = os.environ.get("METRICS_DIR") or None
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN") or None
+METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", 5))
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", 0))
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# name -> (type, help, histogram buckets)
+METRIC_TYPES = {
+    "http_request_duration_seconds": ("histogram", "Time spent handling a request, by endpoint", LATENCY_BUCKETS),
+    "http_request_queries": ("histogram", "SQL statements executed per request, trigger steps included", QUERY_COUNT_BUCKETS),
+    "db_call_duration_seconds": ("histogram", "Latency of DB helper calls", LATENCY_BUCKETS),
+    "db_rows_returned_total": ("counter", "Rows returned by DB helper calls", None),
+    "db_slow_calls_total": ("counter", "DB helper calls slower than SLOW_QUERY_MS", None),
+    "pdf_render_seconds": ("histogram", "Single petition PDF render time", LATENCY_BUCKETS),
+    "pdf_downloads_total": ("counter", "Petition downloads by outcome", None),
+    "complaint_id_conflicts_total": ("counter", "Generated complaint ids that were already taken", None),
+    "db_pool_checkouts_total": ("counter", "Pooled connection checkouts by result", None),
+    "db_pool_waits_total": ("counter", "Checkouts that waited for a free connection", None),
+    "db_pool_wait_seconds_total": ("counter", "Time spent waiting for a free connection", None),
+    "db_pool_idle_connections": ("gauge", "Idle pooled connections", None),
+    "change_feed_polls_total": ("counter", "Change-log reads by the per-worker feed poller", None),
+    "change_feed_streams": ("gauge", "Open /officer/events streams", None),
+    "evidence_bytes_total": ("counter", "Attachment bytes received, by whether they were new or already stored", None),
+}
+
+_query_ctx = threading.local()
+
+
+def _label_str(labels: dict) -> str:
+    return ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels.items()
     )
-    # complaints (fresh schema includes new fields)
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS complaints (
-            id TEXT PRIMARY KEY,
-            mobile TEXT,
-            petitioner_dob TEXT,
-            taluk TEXT,
-            firka TEXT,
-            village TEXT,
-            description TEXT,
-            response_text TEXT,
-            status TEXT,
-            created_at TEXT,
-            FOREIGN KEY(mobile) REFERENCES users(mobile)
+
+
+class Metrics:
+    """Counters and fixed-bucket histograms for one worker process.
+
+    With METRICS_DIR set, every worker writes a JSON snapshot there every
+    METRICS_FLUSH_SECONDS and ``/metrics`` merges all of them, so any worker
+    can answer for the whole gunicorn server. Snapshots of exited workers
+    are folded into ``retired.json`` so counters never go backwards.
+    """
+
+    def __init__(self, directory: str | None = None):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._reset()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._counters = {}
+        self._histograms = {}
+        self._flusher = None
+
+    def _mine(self):
+        # counts made in the master before a fork belong to nobody
+        if self._pid != os.getpid():
+            self._reset()
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = (name, _label_str(labels))
+        with self._lock:
+            self._mine()
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, _label_str(labels))
+        bounds = METRIC_TYPES[name][2]
+        with self._lock:
+            self._mine()
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [[0] * (len(bounds) + 1), 0.0]
+            hist[0][bisect.bisect_left(bounds, value)] += 1
+            hist[1] += value
+
+    def snapshot(self) -> dict:
+        pool = store.pool_stats()
+        with self._lock:
+            self._mine()
+            counters = [[name, labels, value] for (name, labels), value in self._counters.items()]
+            histograms = [[name, labels, list(h[0]), h[1]] for (name, labels), h in self._histograms.items()]
+        counters += [
+            ["db_pool_checkouts_total", 'result="hit"', pool["hits"]],
+            ["db_pool_checkouts_total", 'result="miss"', pool["misses"]],
+            ["db_pool_waits_total", "", pool["waits"]],
+            ["db_pool_wait_seconds_total", "", pool["wait_seconds"]],
+        ]
+        gauges = [
+            ["db_pool_idle_connections", "", pool["idle"]],
+            ["change_feed_streams", "", change_feed.stream_count()],
+        ]
+        return {"pid": os.getpid(), "counters": counters, "histograms": histograms, "gauges": gauges}
+
+    def flush(self):
+        if not self.directory:
+            return
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as fh:
+                json.dump(self.snapshot(), fh)
+            os.replace(tmp, os.path.join(self.directory, f"worker-{os.getpid()}.json"))
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+    def start_flusher(self):
+        if not self.directory or (self._flusher is not None and self._pid == os.getpid()):
+            return
+        with self._lock:
+            self._mine()
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True)
+            self._flusher.start()
+        atexit.register(self.flush)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(METRICS_FLUSH_SECONDS)
+            self.flush()
+
+    def collect(self) -> dict:
+        """Merged series of this worker and, with METRICS_DIR, all the others."""
+        if not self.directory:
+            return merge_snapshots([self.snapshot()])
+        self.flush()
+        snapshots = []
+        with open(os.path.join(self.directory, ".lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            retired_path = os.path.join(self.directory, "retired.json")
+            retired = _read_snapshot(retired_path)
+            dead = []
+            for path in glob.glob(os.path.join(self.directory, "worker-*.json")):
+                snap = _read_snapshot(path)
+                if snap is None:
+                    continue
+                if _pid_alive(snap.get("pid")):
+                    snapshots.append(snap)
+                else:
+                    dead.append((path, snap))
+            if dead:
+                # gauges of an exited worker mean nothing; its counters still count
+                merged = merge_snapshots([retired or {}] + [dict(s, gauges=[]) for _, s in dead])
+                retired = {
+                    "counters": [[n, l, v] for (n, l), v in merged["counters"].items()],
+                    "histograms": [[n, l, h[0], h[1]] for (n, l), h in merged["histograms"].items()],
+                }
+                with open(retired_path + ".tmp", "w") as fh:
+                    json.dump(retired, fh)
+                os.replace(retired_path + ".tmp", retired_path)
+                for path, _ in dead:
+                    os.unlink(path)
+        if retired:
+            snapshots.append(retired)
+        return merge_snapshots(snapshots)
+
+
+def _read_snapshot(path: str):
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _pid_alive(pid) -> bool:
+    if not isinstance(pid, int):
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def merge_snapshots(snapshots) -> dict:
+    counters, histograms, gauges = {}, {}, {}
+    for snap in snapshots:
+        for name, labels, value in snap.get("counters", []):
+            counters[(name, labels)] = counters.get((name, labels), 0) + value
+        for name, labels, counts, total in snap.get("histograms", []):
+            hist = histograms.get((name, labels))
+            if hist is None:
+                histograms[(name, labels)] = [list(counts), total]
+            elif len(hist[0]) == len(counts):
+                hist[0] = [a + b for a, b in zip(hist[0], counts)]
+                hist[1] += total
+        for name, labels, value in snap.get("gauges", []):
+            gauges[(name, labels)] = gauges.get((name, labels), 0) + value
+    return {"counters": counters, "histograms": histograms, "gauges": gauges}
+
+
+def render_prometheus(merged: dict) -> str:
+    series = {}
+    for kind in ("counters", "gauges", "histograms"):
+        for (name, labels), value in merged[kind].items():
+            series.setdefault(name, []).append((labels, value))
+    out = []
+    for name in sorted(series):
+        kind, help_text, bounds = METRIC_TYPES.get(name, ("untyped", "", None))
+        out.append(f"# HELP {name} {help_text}")
+        out.append(f"# TYPE {name} {kind}")
+        for labels, value in sorted(series[name]):
+            if kind != "histogram":
+                out.append(f"{name}{{{labels}}} {value}" if labels else f"{name} {value}")
+                continue
+            counts, total = value
+            sep = "," if labels else ""
+            cumulative = 0
+            for bound, n in zip(list(bounds) + ["+Inf"], counts):
+                cumulative += n
+                out.append(f'{name}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}')
+            suffix = f"{{{labels}}}" if labels else ""
+            out.append(f"{name}_sum{suffix} {total}")
+            out.append(f"{name}_count{suffix} {cumulative}")
+    return "\n".join(out) + "\n"
+
+
+metrics = Metrics(METRICS_DIR)
+
+_SQL_LITERAL = re.compile(r"'(?:[^']|'')*'")
+
+
+def _trace_statement(sql: str):
+    ctx = _query_ctx
+    ctx.count = getattr(ctx, "count", 0) + 1
+    statements = getattr(ctx, "statements", None)
+    if statements is not None and len(statements) < 20:
+        # trace output has parameters expanded; keep mobiles and names out of the log
+        statements.append(" ".join(_SQL_LITERAL.sub("?", sql).split()))
+
+
+def timed_db(fn=None, *, rows=None):
+    """Record latency and rows returned for a DB helper.
+
+    ``rows`` maps the helper's result to a row count; by default a list
+    counts its items, None counts zero and anything else one row.
+    """
+    if fn is None:
+        return lambda f: timed_db(f, rows=rows)
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not METRICS_ENABLED:
+            return fn(*args, **kwargs)
+        ctx = _query_ctx
+        outermost = getattr(ctx, "statements", None) is None
+        if outermost and SLOW_QUERY_MS:
+            ctx.statements = []
+        started = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.observe("db_call_duration_seconds", elapsed, helper=name)
+            if outermost and SLOW_QUERY_MS:
+                statements, ctx.statements = ctx.statements, None
+                if elapsed * 1000 >= SLOW_QUERY_MS:
+                    metrics.inc("db_slow_calls_total", helper=name)
+                    app.logger.warning("slow db call %s: %.1f ms, %d statements: %s",
+                                       name, elapsed * 1000, len(statements), " | ".join(statements))
+        if rows is not None:
+            n = rows(result)
+        else:
+            n = len(result) if isinstance(result, list) else (0 if result is None else 1)
+        metrics.inc("db_rows_returned_total", n, helper=name)
+        return result
+
+    return wrapper
+
+
+# ---------- DB connection pool ----------
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 8))
+DB_BUSY_TIMEOUT_MS = int(os.environ.get("DB_BUSY_TIMEOUT_MS", 5000))
+DB_CACHE_KB = int(os.environ.get("DB_CACHE_KB", 16384))
+DB_STATEMENT_CACHE = int(os.environ.get("DB_STATEMENT_CACHE", 256))
+
+
+class ConnectionPool:
+    """Per-process pool of reusable SQLite connections.
+
+    Connections are opened lazily, configured once (WAL, pragmas, statement
+    cache) and handed out LIFO so a busy thread keeps getting the same warm
+    connection back. The pool is rebuilt after a fork so gunicorn workers
+    never share a connection with the master.
+    """
+
+    def __init__(self, path: str, size: int, attach: dict | None = None):
+        self.path = path
+        self.size = size
+        self.attach = attach or {}
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._stats = {"hits": 0, "misses": 0, "waits": 0, "wait_seconds": 0.0, "discarded": 0}
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=DB_BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,
+            cached_statements=DB_STATEMENT_CACHE,
         )
-        """
-    )
-    # migrate existing complaints table to include new columns if missing
-    cur.execute("PRAGMA table_info(complaints)")
-    cols = [r[1] for r in cur.fetchall()]
-    migrations = []
-    if 'petitioner_name' not in cols:
-        migrations.append("ALTER TABLE complaints ADD COLUMN petitioner_name TEXT")
-    if 'petitioner_dob' not in cols:
-        migrations.append("ALTER TABLE complaints ADD COLUMN petitioner_dob TEXT")
-    if 'response_text' not in cols:
-        migrations.append("ALTER TABLE complaints ADD COLUMN response_text TEXT")
-    for m in migrations:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+        conn.execute(f"PRAGMA cache_size=-{DB_CACHE_KB}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        for schema, path in self.attach.items():
+            conn.execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+            conn.execute(f"PRAGMA {schema}.journal_mode=WAL")
+            conn.execute(f"PRAGMA {schema}.synchronous=NORMAL")
+        if METRICS_ENABLED:
+            conn.set_trace_callback(_trace_statement)
+        return conn
+
+    def _count(self, key: str, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+    @contextmanager
+    def connection(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._reset()
+        slots = self._slots
+        idle = self._idle
+        if not slots.acquire(blocking=False):
+            started = time.perf_counter()
+            if not slots.acquire(timeout=DB_BUSY_TIMEOUT_MS / 1000):
+                raise sqlite3.OperationalError("connection pool exhausted")
+            with self._lock:
+                self._stats["waits"] += 1
+                self._stats["wait_seconds"] += time.perf_counter() - started
         try:
-            cur.execute(m)
-        except Exception:
-            pass
-    conn.commit()
-    conn.close()
+            try:
+                conn = idle.get_nowait()
+                self._count("hits")
+            except queue.Empty:
+                conn = self._open()
+                self._count("misses")
+            try:
+                yield conn
+                if conn.in_transaction:
+                    conn.commit()
+            except BaseException:
+                try:
+                    if conn.in_transaction:
+                        conn.rollback()
+                except sqlite3.Error:
+                    conn.close()
+                    self._count("discarded")
+                    conn = None
+                raise
+            finally:
+                if conn is not None:
+                    idle.put(conn)
+        finally:
+            slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            data = dict(self._stats)
+        data["size"] = self.size
+        data["idle"] = self._idle.qsize()
+        return data
+
+
+db_pool = ConnectionPool(DB_PATH, DB_POOL_SIZE, attach={"archive": ARCHIVE_DB_PATH})
+
+
+def get_conn():
+    # the active storage backend's connection; SQLite unless DATABASE_URL is set
+    return store.connection()
+
+
+# ---------- DB helpers ----------
+# Tables every storage backend creates, written in SQL that SQLite and
+# PostgreSQL both accept: (name, columns, options appended on SQLite only).
+SCHEMA_TABLES = [
+    ("users", """
+        mobile TEXT PRIMARY KEY,
+        password_hash TEXT NOT NULL,
+        created_at TEXT NOT NULL
+    """, ""),
+    ("complaints", """
+        id TEXT PRIMARY KEY,
+        mobile TEXT,
+        petitioner_name TEXT,
+        petitioner_dob TEXT,
+        taluk TEXT,
+        firka TEXT,
+        village TEXT,
+        description TEXT,
+        response_text TEXT,
+        status TEXT,
+        created_at TEXT,
+        version INTEGER NOT NULL DEFAULT 1,
+        updated_at TEXT,
+        FOREIGN KEY(mobile) REFERENCES users(mobile)
+    """, ""),
+    ("quota_ledger", """
+        mobile TEXT NOT NULL,
+        period TEXT NOT NULL,
+        n INTEGER NOT NULL,
+        PRIMARY KEY (mobile, period)
+    """, "WITHOUT ROWID"),
+    ("rate_limits", """
+        key TEXT NOT NULL,
+        bucket INTEGER NOT NULL,
+        n INTEGER NOT NULL,
+        PRIMARY KEY (key, bucket)
+    """, "WITHOUT ROWID"),
+    # append-only feed of complaint inserts and status/response changes
+    ("complaint_changes", """
+        seq {serial},
+        complaint_id TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        prev_status TEXT,
+        changed_at TEXT NOT NULL
+    """, ""),
+    # files attached to a complaint; the bytes live once per sha256 under EVIDENCE_DIR
+    ("complaint_evidence", """
+        complaint_id TEXT NOT NULL,
+        sha256 TEXT NOT NULL,
+        filename TEXT NOT NULL,
+        content_type TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        added_at TEXT NOT NULL,
+        PRIMARY KEY (complaint_id, sha256)
+    """, "WITHOUT ROWID"),
+    # near-duplicate index (see "Duplicate detection"); BYTEA is PostgreSQL's
+    # binary type, and SQLite keeps the bytes as given
+    ("complaint_minhash", """
+        ref {serial},
+        complaint_id TEXT NOT NULL UNIQUE,
+        signature BYTEA NOT NULL
+    """, ""),
+    ("complaint_lsh", """
+        bucket INTEGER NOT NULL,
+        ref BIGINT NOT NULL,
+        PRIMARY KEY (bucket, ref)
+    """, "WITHOUT ROWID"),
+    ("complaint_duplicates", """
+        complaint_id TEXT NOT NULL,
+        duplicate_id TEXT NOT NULL,
+        similarity REAL NOT NULL,
+        PRIMARY KEY (complaint_id, duplicate_id)
+    """, "WITHOUT ROWID"),
+]
+# Columns added after the first release, for databases created before them:
+# (table, column, type, backfill run once the column is added).
+SCHEMA_ADDED_COLUMNS = [
+    ("complaints", "petitioner_name", "TEXT", None),
+    ("complaints", "petitioner_dob", "TEXT", None),
+    ("complaints", "response_text", "TEXT", None),
+    ("complaints", "version", "INTEGER NOT NULL DEFAULT 1", None),
+    ("complaints", "updated_at", "TEXT", "UPDATE complaints SET updated_at = created_at WHERE updated_at IS NULL"),
+]
+
+
+# {serial} in SCHEMA_TABLES: an ever-increasing key, never reused after deletes
+SERIAL_KEY = {
+    "sqlite": "INTEGER PRIMARY KEY AUTOINCREMENT",
+    "postgres": "BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY",
+}
+
+
+def schema_statements(dialect: str, names=None) -> list:
+    """CREATE TABLE statements for SCHEMA_TABLES, or for the tables in ``names``."""
+    return [
+        f"CREATE TABLE IF NOT EXISTS {name} ({columns.strip().replace('{serial}', SERIAL_KEY[dialect])})"
+        + (f" {options}" if options and dialect == "sqlite" else "")
+        for name, columns, options in SCHEMA_TABLES
+        if names is None or name in names
+    ]
+
+
+# Built by the "complaint indexes" migration; to change the set, append a
+# step to SQLITE_MIGRATIONS that runs _migrate_complaint_indexes again.
+COMPLAINT_INDEXES = {
+    # version/updated_at make get_user_version an index-only read
+    "idx_complaints_mobile_created": "complaints(mobile, created_at, version, updated_at)",
+    "idx_complaints_filters": "complaints(status, taluk, firka, village, created_at, id)",
+    "idx_complaints_location": "complaints(taluk, firka, village, created_at, id)",
+    "idx_complaints_created": "complaints(created_at, id)",
+}
+
+
+# unicode61 treats combining marks as separators by default, which splits
+# Tamil words at every vowel sign; adding M* keeps them whole.
+COMPLAINTS_FTS_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE complaints_fts USING fts5(
+        petitioner_name, description, response_text,
+        content='complaints', content_rowid='rowid',
+        tokenize="unicode61 remove_diacritics 2 categories 'L* N* Co M*'"
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS complaints_fts_ai AFTER INSERT ON complaints BEGIN
+        INSERT INTO complaints_fts(rowid, petitioner_name, description, response_text)
+        VALUES (new.rowid, new.petitioner_name, new.description, new.response_text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS complaints_fts_ad AFTER DELETE ON complaints BEGIN
+        INSERT INTO complaints_fts(complaints_fts, rowid, petitioner_name, description, response_text)
+        VALUES ('delete', old.rowid, old.petitioner_name, old.description, old.response_text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS complaints_fts_au AFTER UPDATE OF petitioner_name, description, response_text ON complaints BEGIN
+        INSERT INTO complaints_fts(complaints_fts, rowid, petitioner_name, description, response_text)
+        VALUES ('delete', old.rowid, old.petitioner_name, old.description, old.response_text);
+        INSERT INTO complaints_fts(rowid, petitioner_name, description, response_text)
+        VALUES (new.rowid, new.petitioner_name, new.description, new.response_text);
+    END
+    """,
+]
+
+
+# Materialised counters: one row per (month, taluk, firka, village, status)
+# cell, maintained by triggers so every write path updates them in the same
+# transaction as the complaint itself.
+STATS_CELL = "month, taluk, firka, village, status"
+
+
+def _stats_key(ref: str) -> str:
+    return (f"substr({ref}.created_at, 1, 7), coalesce({ref}.taluk, ''), coalesce({ref}.firka, ''), "
+            f"coalesce({ref}.village, ''), coalesce({ref}.status, '')")
+
+
+def _stats_bump(ref: str, delta: int) -> str:
+    return (f"INSERT INTO complaint_stats ({STATS_CELL}, n) VALUES ({_stats_key(ref)}, {delta}) "
+            f"ON CONFLICT ({STATS_CELL}) DO UPDATE SET n = complaint_stats.n + ({delta});")
+
+
+COMPLAINT_STATS_SCHEMA = [
+    f"""
+    CREATE TABLE IF NOT EXISTS complaint_stats (
+        month TEXT NOT NULL,
+        taluk TEXT NOT NULL,
+        firka TEXT NOT NULL,
+        village TEXT NOT NULL,
+        status TEXT NOT NULL,
+        n INTEGER NOT NULL,
+        PRIMARY KEY ({STATS_CELL})
+    ) WITHOUT ROWID
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS complaint_stats_ai AFTER INSERT ON complaints BEGIN
+        {_stats_bump('new', 1)}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS complaint_stats_ad AFTER DELETE ON complaints BEGIN
+        {_stats_bump('old', -1)}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS complaint_stats_au AFTER UPDATE OF status, taluk, firka, village, created_at ON complaints
+    WHEN old.status IS NOT new.status OR old.taluk IS NOT new.taluk OR old.firka IS NOT new.firka
+      OR old.village IS NOT new.village OR substr(old.created_at, 1, 7) IS NOT substr(new.created_at, 1, 7)
+    BEGIN
+        {_stats_bump('old', -1)}
+        {_stats_bump('new', 1)}
+    END
+    """,
+]
+# archived complaints keep counting towards the statistics
+STATS_FROM_COMPLAINTS = (
+    f"SELECT substr(created_at, 1, 7), coalesce(taluk, ''), coalesce(firka, ''), coalesce(village, ''), "
+    f"coalesce(status, ''), COUNT(*) FROM ("
+    f"SELECT created_at, taluk, firka, village, status FROM main.complaints UNION ALL "
+    f"SELECT created_at, taluk, firka, village, status FROM archive.complaints) GROUP BY 1, 2, 3, 4, 5"
+)
+# PostgreSQL's complaint_stats: the same table, kept by one row trigger
+PG_STATS_FROM_COMPLAINTS = (
+    f"SELECT {_stats_key('c')}, COUNT(*) FROM complaints c GROUP BY 1, 2, 3, 4, 5"
+)
+PG_STATS_SCHEMA = [
+    COMPLAINT_STATS_SCHEMA[0].replace("WITHOUT ROWID", ""),
+    f"""
+    CREATE OR REPLACE FUNCTION complaint_stats_sync() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' AND ({_stats_key('OLD')}) IS NOT DISTINCT FROM ({_stats_key('NEW')}) THEN
+            RETURN NULL;
+        END IF;
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            {_stats_bump('OLD', -1)}
+        END IF;
+        IF TG_OP IN ('UPDATE', 'INSERT') THEN
+            {_stats_bump('NEW', 1)}
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    # DROP + CREATE rather than CREATE OR REPLACE TRIGGER, which needs PostgreSQL 14
+    "DROP TRIGGER IF EXISTS complaint_stats_sync ON complaints",
+    """
+    CREATE TRIGGER complaint_stats_sync
+    AFTER INSERT OR DELETE OR UPDATE OF status, taluk, firka, village, created_at ON complaints
+    FOR EACH ROW EXECUTE FUNCTION complaint_stats_sync()
+    """,
+]
+
+
+# month buckets for all history, day buckets from the given YYYY-MM-DD on
+QUOTA_LEDGER_BACKFILL = """
+    INSERT INTO quota_ledger (mobile, period, n)
+    SELECT mobile, 'M:' || substr(created_at, 1, 7), COUNT(*) FROM complaints
+    WHERE mobile IS NOT NULL GROUP BY 1, 2
+    UNION ALL
+    SELECT mobile, 'D:' || substr(created_at, 1, 10), COUNT(*) FROM complaints
+    WHERE mobile IS NOT NULL AND created_at >= ? GROUP BY 1, 2
+"""
+
+
+ARCHIVE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS archive.complaints (
+        id TEXT PRIMARY KEY,
+        mobile TEXT,
+        petitioner_name TEXT,
+        petitioner_dob TEXT,
+        taluk TEXT,
+        firka TEXT,
+        village TEXT,
+        description TEXT,
+        response_text TEXT,
+        status TEXT,
+        created_at TEXT,
+        version INTEGER NOT NULL DEFAULT 1,
+        updated_at TEXT,
+        archived_at TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS archive.idx_archive_mobile_created ON complaints(mobile, created_at)",
+]
+
+
+IMPORT_PROGRESS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS import_progress (
+        source TEXT PRIMARY KEY,
+        fingerprint TEXT NOT NULL,
+        rows_done INTEGER NOT NULL,
+        imported INTEGER NOT NULL,
+        duplicates INTEGER NOT NULL,
+        rejected INTEGER NOT NULL,
+        started_at TEXT NOT NULL,
+        finished_at TEXT
+    )
+"""
+
+
+def db_timestamp(dt: datetime) -> str:
+    # fixed-width ISO-8601 so created_at compares and range-scans as plain text
+    return dt.isoformat(timespec='microseconds')
+
+
+# ---------- Schema migrations ----------
+# SQLite counts the steps a database has had in PRAGMA user_version. Append
+# new steps and never change a shipped one. The released init_db never set
+# user_version, so a database from before versioning is at 0 and runs every
+# step; steps 1-3 bring it to what that init_db created. Each step makes one
+# schema change (a table, a set of columns, or the tables and triggers of
+# one feature) and must be safe to run again, since such a database may
+# already have what it adds.
+MIGRATE_ON_IMPORT = os.environ.get("MIGRATE_ON_IMPORT", "1") == "1"
+
+
+def _migrate_users(store, conn):
+    store.create_tables(conn, ("users",))
+
+
+def _migrate_complaints(store, conn):
+    store.create_tables(conn, ("complaints",))
+
+
+def _migrate_petitioner_columns(store, conn):
+    # added to the released schema's complaints table after it shipped
+    store.add_columns(conn, ("petitioner_name", "petitioner_dob", "response_text"))
+
+
+def _migrate_timestamps(store, conn):
+    # normalise legacy timestamps to the db_timestamp() format
+    conn.execute("UPDATE complaints SET created_at = replace(created_at, ' ', 'T') WHERE created_at LIKE '% %'")
+    conn.execute("UPDATE complaints SET created_at = created_at || '.000000' WHERE length(created_at) = 19")
+
+
+def _migrate_row_versions(store, conn):
+    # after the timestamps, so the updated_at backfill copies normalised ones
+    store.add_columns(conn, ("version", "updated_at"))
+
+
+def _migrate_complaint_indexes(store, conn):
+    for name, target in COMPLAINT_INDEXES.items():
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+        conn.execute(f"CREATE INDEX {name} ON {target}")
+    conn.execute("PRAGMA optimize")
+
+
+def _migrate_archive(store, conn):
+    for stmt in ARCHIVE_SCHEMA:
+        conn.execute(stmt)
+
+
+def _migrate_search(store, conn):
+    # full-text index over complaint text (external content, trigger-synced)
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name='complaints_fts'").fetchone() is None:
+        for stmt in COMPLAINTS_FTS_SCHEMA:
+            conn.execute(stmt)
+        conn.execute("INSERT INTO complaints_fts(complaints_fts) VALUES('rebuild')")
+    else:
+        # a bulk import drops the insert trigger while it loads
+        for stmt in COMPLAINTS_FTS_SCHEMA[1:]:
+            conn.execute(stmt)
+
+
+def _migrate_stats(store, conn):
+    # after the archive, which the counts include
+    stats_missing = conn.execute("SELECT 1 FROM sqlite_master WHERE name='complaint_stats'").fetchone() is None
+    for stmt in COMPLAINT_STATS_SCHEMA:
+        conn.execute(stmt)
+    if stats_missing:
+        conn.execute(f"INSERT INTO complaint_stats ({STATS_CELL}, n) {STATS_FROM_COMPLAINTS}")
+
+
+def _migrate_quota_ledger(store, conn):
+    ledger_missing = not store.table_columns(conn, "quota_ledger")
+    store.create_tables(conn, ("quota_ledger",))
+    if ledger_missing:
+        conn.execute(QUOTA_LEDGER_BACKFILL, (quota_window_start(),))
+
+
+def _migrate_rate_limits(store, conn):
+    store.create_tables(conn, ("rate_limits",))
+
+
+def _migrate_import_progress(store, conn):
+    conn.execute(IMPORT_PROGRESS_SCHEMA)
+
+
+def _migrate_change_log(store, conn):
+    store.create_tables(conn, ("complaint_changes",))
+
+
+def _migrate_evidence(store, conn):
+    store.create_tables(conn, ("complaint_evidence",))
+
+
+def _migrate_duplicate_index(store, conn):
+    store.create_tables(conn, ("complaint_minhash", "complaint_lsh", "complaint_duplicates"))
+
+
+SQLITE_MIGRATIONS = [
+    ("users table", _migrate_users),
+    ("complaints table", _migrate_complaints),
+    ("petitioner columns", _migrate_petitioner_columns),
+    ("timestamps", _migrate_timestamps),
+    ("row versions", _migrate_row_versions),
+    ("complaint indexes", _migrate_complaint_indexes),
+    ("archive", _migrate_archive),
+    ("full-text search", _migrate_search),
+    ("statistics", _migrate_stats),
+    ("quota ledger", _migrate_quota_ledger),
+    ("rate limits", _migrate_rate_limits),
+    ("import progress", _migrate_import_progress),
+    ("change log", _migrate_change_log),
+    ("evidence", _migrate_evidence),
+    ("duplicate index", _migrate_duplicate_index),
+]
+
+
+def init_db() -> list:
+    """Apply pending schema migrations; returns (step, seconds) for each one run."""
+    return store.migrate()
 
 
 def create_user(mobile: str, password: str) -> bool:
-    try:
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
-        cur.execute(
-            "INSERT INTO users (mobile, password_hash, created_at) VALUES (?, ?, ?)",
-            (mobile, generate_password_hash(password), datetime.now().isoformat()),
+    # hash before taking a connection so the pool isn't held during the KDF
+    return add_user(mobile, password_hasher.hash(password))
+
+
+@timed_db(rows=int)
+def add_user(mobile: str, password_hash: str) -> bool:
+    with get_conn() as conn:
+        cur = conn.execute(
+            "INSERT INTO users (mobile, password_hash, created_at) VALUES (?, ?, ?) ON CONFLICT (mobile) DO NOTHING",
+            (mobile, password_hash, db_timestamp(datetime.now())),
         )
-        conn.commit()
-        return True
-    except sqlite3.IntegrityError:
-        return False
-    finally:
-        conn.close()
+        return cur.rowcount == 1
 
 
+@timed_db
 def get_user(mobile: str):
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute("SELECT mobile, password_hash, created_at FROM users WHERE mobile=?", (mobile,))
-    row = cur.fetchone()
-    conn.close()
-    return row
+    with get_conn() as conn:
+        cur = conn.execute("SELECT mobile, password_hash, created_at FROM users WHERE mobile=?", (mobile,))
+        return cur.fetchone()
+
+
+@timed_db
+def update_password_hash(mobile: str, old_hash: str, new_hash: str) -> bool:
+    # conditional on the old hash so a concurrent password change wins
+    with get_conn() as conn:
+        cur = conn.execute(
+            "UPDATE users SET password_hash=? WHERE mobile=? AND password_hash=?",
+            (new_hash, mobile, old_hash),
+        )
+        return cur.rowcount == 1
+
+
+def _log_new_complaint(conn, cid: str):
+    store.lock_change_log(conn)
+    conn.execute(
+        "INSERT INTO complaint_changes (complaint_id, kind, changed_at) VALUES (?, 'new', ?)",
+        (cid, db_timestamp(datetime.now())),
+    )
+
+
+def _log_status_changes(conn, ids, now: str):
+    # before the UPDATE, so prev_status is the status being replaced
+    store.lock_change_log(conn)
+    conn.executemany(
+        "INSERT INTO complaint_changes (complaint_id, kind, prev_status, changed_at) "
+        "SELECT id, 'updated', status, ? FROM complaints WHERE id = ?",
+        [(now, cid) for cid in ids],
+    )
 
 
+@timed_db
 def insert_complaint(c):
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute(
-        """INSERT INTO complaints (id,mobile,petitioner_name,petitioner_dob,taluk,firka,village,description,response_text,status,created_at)
-                   VALUES (?,?,?,?,?,?,?,?,?,?,?)""",
+    c.setdefault('signature', description_signature(c['description']))
+    with get_conn() as conn:
+        _insert_complaint_row(conn, c)
+    change_feed.poke()
+
+
+def _insert_complaint_row(conn, c):
+    conn.execute(
+        """INSERT INTO complaints (id,mobile,petitioner_name,petitioner_dob,taluk,firka,village,description,response_text,status,created_at,updated_at)
+                   VALUES (?,?,?,?,?,?,?,?,?,?,?,?)""",
         (
             c['id'],
             c['mobile'],
@@ -287,80 +1134,30 @@ def insert_complaint(c):
             c.get('response_text'),
             c['status'],
             c['created_at'],
+            c.get('updated_at') or c['created_at'],
         ),
     )
-    conn.commit()
-    conn.close()
-
-
-def get_last_by_mobile(mobile):
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT created_at FROM complaints WHERE mobile=? ORDER BY created_at DESC LIMIT 1",
-        (mobile,),
-    )
-    row = cur.fetchone()
-    conn.close()
-    return row[0] if row else None
-
-
-def count_month_complaints(mobile: str, year: int, month: int) -> int:
-    start = datetime(year, month, 1)
-    if month == 12:
-        end = datetime(year + 1, 1, 1)
-    else:
-        end = datetime(year, month + 1, 1)
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT COUNT(*) FROM complaints
-        WHERE mobile=? AND datetime(created_at) >= ? AND datetime(created_at) < ?
-        """,
-        (mobile, start.isoformat(), end.isoformat()),
-    )
-    count = cur.fetchone()[0]
-    conn.close()
-    return count
+    _insert_evidence_rows(conn, c['id'], c.get('evidence', ()), c['created_at'])
+    _log_new_complaint(conn, c['id'])
+    # after the change-log lock, so concurrent inserts on PostgreSQL see each other's signatures
+    signature = c['signature'] if 'signature' in c else description_signature(c['description'])
+    _index_description(conn, c['id'], signature)
 
 
+@timed_db
 def find_complaints_by_mobile(mobile):
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT id,mobile,petitioner_name,petitioner_dob,taluk,firka,village,description,response_text,status,created_at
-        FROM complaints WHERE mobile=? ORDER BY datetime(created_at) DESC
-        """,
-        (mobile,),
-    )
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    return store.find_complaints_by_mobile(mobile)
 
 
+@timed_db
 def get_by_id(cid):
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT id,mobile,petitioner_name,petitioner_dob,taluk,firka,village,description,response_text,status,created_at
-        FROM complaints WHERE id=?
-        """,
-        (cid,),
-    )
-    row = cur.fetchone()
-    conn.close()
-    return row
+    return store.get_by_id(cid)
 
 
-def list_all_complaints(filters: dict | None = None, limit: int = 500):
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    query = (
-        "SELECT id,mobile,petitioner_name,petitioner_dob,taluk,firka,village,description,response_text,status,created_at FROM complaints"
-    )
+COMPLAINT_COLUMNS = "id,mobile,petitioner_name,petitioner_dob,taluk,firka,village,description,response_text,status,created_at"
+
+
+def _complaint_filter_clauses(filters: dict | None):
     clauses = []
     params = []
     if filters:
@@ -377,161 +1174,2240 @@ def list_all_complaints(filters: dict | None = None, limit: int = 500):
             clauses.append("village = ?")
             params.append(filters['village'])
         if filters.get('from_date'):
-            clauses.append("datetime(created_at) >= ?")
+            clauses.append("created_at >= ?")
             params.append(filters['from_date'] + "T00:00:00")
         if filters.get('to_date'):
-            clauses.append("datetime(created_at) <= ?")
-            params.append(filters['to_date'] + "T23:59:59")
+            clauses.append("created_at <= ?")
+            params.append(filters['to_date'] + "T23:59:59.999999")
+    return clauses, params
+
+
+IDS_PER_QUERY = 500
+
+
+def _rows_for_ids(sql: str, ids, conn=None) -> list:
+    """Run ``sql``, whose ``{ids}`` is a placeholder list, over ``ids`` a chunk at a time.
+
+    Runs on ``conn`` when given, so it can share the caller's transaction.
+    """
+    ids = list(ids)
+    rows = []
+    if not ids:
+        return rows
+    if conn is None:
+        with get_conn() as conn:
+            return _rows_for_ids(sql, ids, conn)
+    for lo in range(0, len(ids), IDS_PER_QUERY):
+        chunk = ids[lo:lo + IDS_PER_QUERY]
+        rows.extend(conn.execute(sql.format(ids=",".join("?" * len(chunk))), chunk).fetchall())
+    return rows
+
+
+def _complaints_page(conn, filters: dict | None, limit: int, before=None, after=None) -> list:
+    clauses, params = _complaint_filter_clauses(filters)
+    order = "DESC"
+    if before:
+        clauses.append("(created_at, id) < (?, ?)")
+        params.extend(before)
+    elif after:
+        clauses.append("(created_at, id) > (?, ?)")
+        params.extend(after)
+        order = "ASC"
+    query = f"SELECT {COMPLAINT_COLUMNS} FROM complaints"
     if clauses:
         query += " WHERE " + " AND ".join(clauses)
-    query += " ORDER BY datetime(created_at) DESC LIMIT ?"
+    query += f" ORDER BY created_at {order}, id {order} LIMIT ?"
     params.append(limit)
-    cur.execute(query, tuple(params))
-    rows = cur.fetchall()
-    conn.close()
+    rows = conn.execute(query, tuple(params)).fetchall()
+    if order == "ASC":
+        rows.reverse()
     return rows
 
 
-def update_status(cid, new_status):
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute("UPDATE complaints SET status=? WHERE id=?", (new_status, cid))
-    conn.commit()
-    conn.close()
+@timed_db
+def list_all_complaints(filters: dict | None = None, limit: int = 500, before=None, after=None):
+    """Newest-first page of complaints, keyset-paginated on (created_at, id).
 
+    ``before`` returns the page older than the given (created_at, id) key,
+    ``after`` the page newer than it (still returned newest-first).
+    """
+    with get_conn() as conn:
+        return _complaints_page(conn, filters, limit, before, after)
 
-def update_response_and_resolve(cid: str, response_text: str):
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute(
-        "UPDATE complaints SET response_text=?, status='Resolved' WHERE id=?",
-        (response_text, cid),
-    )
-    conn.commit()
-    conn.close()
 
+def iter_complaints(filters: dict | None = None, batch_size: int = 1000):
+    """Yield every matching complaint (newest first), fetching a page at a time."""
+    for rows, _ in store.complaint_pages(filters, batch_size):
+        yield from rows
 
-# ---------- Routes ----------
-@app.route("/")
-def index():
-    user_mobile = session.get("user_mobile")
-    my_complaints = []
-    if user_mobile:
-        my_complaints = find_complaints_by_mobile(user_mobile)
-    return render_template("index.html", user_mobile=user_mobile, my_complaints=my_complaints, status_colors=STATUS_COLORS)
 
+def iter_complaints_with_evidence(filters: dict | None = None, batch_size: int = 1000):
+    """Like iter_complaints, yielding (row, evidence files) read with the row's page."""
+    for rows, files in store.complaint_pages(filters, batch_size, evidence=True):
+        for row in rows:
+            yield row, files.get(row[0], ())
 
-@app.route("/locations")
-def get_locations():
-    return jsonify(locations)
 
+SEARCH_MAX_TERMS = 12
 
-@app.route("/register", methods=["GET", "POST"])
-def register():
-    if request.method == "GET":
-        return render_template("register.html")
-    mobile = request.form.get("mobile", "").strip()
-    password = request.form.get("password", "")
-    if not mobile or not password:
-        flash("Mobile and password are required")
-        return redirect(url_for("register"))
-    if create_user(mobile, password):
-        flash("Registration successful. Please login.")
-        return redirect(url_for("login"))
-    else:
-        flash("Mobile already registered")
-        return redirect(url_for("register"))
 
+def search_terms(text: str) -> list:
+    terms = [t.strip('"\'.,;:!?()[]{}') for t in text.split()]
+    return [t for t in terms if t][:SEARCH_MAX_TERMS]
 
-@app.route("/login", methods=["GET", "POST"])
-def login():
-    if request.method == "GET":
-        return render_template("login.html")
-    mobile = request.form.get("mobile", "").strip()
-    password = request.form.get("password", "")
-    row = get_user(mobile)
-    if not row:
-        flash("Invalid credentials")
-        return redirect(url_for("login"))
-    if not check_password_hash(row[1], password):
-        flash("Invalid credentials")
-        return redirect(url_for("login"))
-    session["user_mobile"] = mobile
-    flash("Logged in successfully")
-    return redirect(url_for("index"))
 
+def fts_query(text: str) -> str | None:
+    """Turn free text into an FTS5 query: every word must match, as a prefix.
 
-@app.route("/logout")
-def logout():
-    session.pop("user_mobile", None)
-    return redirect(url_for("index"))
+    Words are quoted so user input can never be parsed as FTS syntax.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return None
+    return " ".join('"' + t.replace('"', '""') + '"*' for t in terms)
 
 
-@app.route("/submit", methods=["POST"])
-def submit():
-    user_mobile = session.get("user_mobile")
-    if not user_mobile:
-        return jsonify({"status": "error", "message": "Login required."}), 401
-    petitioner_name = request.form.get("petitioner_name", "").strip()
-    petitioner_dob = request.form.get("petitioner_dob", "").strip()
-    taluk = request.form.get("taluk")
-    firka = request.form.get("firka")
-    village = request.form.get("village")
-    description = request.form.get("description", "").strip()
+def _search_from(filters: dict | None, query: str):
+    clauses, params = _complaint_filter_clauses(filters)
+    clauses.insert(0, "complaints_fts MATCH ?")
+    params.insert(0, query)
+    # CROSS JOIN pins the FTS scan as the outer loop; otherwise the planner may
+    # walk a filter index and re-run the MATCH once per candidate row.
+    return "FROM complaints_fts CROSS JOIN complaints c ON c.rowid = complaints_fts.rowid WHERE " + " AND ".join(clauses), params
 
-    if not petitioner_name or not petitioner_dob or not taluk or not firka or not village or not description:
-        return jsonify({"status":"error","message":"All fields required."}), 400
 
-      # enforce max 2 per calendar month
-    now = datetime.now()
-    count_this_month = count_month_complaints(user_mobile, now.year, now.month)
-    if count_this_month >= 10:
-        return jsonify({"status":"error","message":f"Monthly limit reached. Only 10 petitions allowed in {now.strftime('%B %Y')}."}), 429
+@timed_db
+def search_complaints(text: str, filters: dict | None = None, limit: int = 50, offset: int = 0):
+    """Complaints matching ``text``, best match first (names weighted up)."""
+    return store.search_complaints(text, filters, limit, offset)
 
-    cid = str(uuid.uuid4())[:8]
-    complaint = {
-        "id": cid,
-        "mobile": user_mobile,
-        "petitioner_name": petitioner_name,
-        "petitioner_dob": petitioner_dob,
-        "taluk": taluk,
-        "firka": firka,
-        "village": village,
-        "description": description,
-        "response_text": None,
-        "status": "Pending",
-        "created_at": datetime.now().isoformat()
+
+@timed_db
+def count_search_matches(text: str, filters: dict | None = None) -> int:
+    return store.count_search_matches(text, filters)
+
+
+def rebuild_search_index():
+    with get_conn() as conn:
+        conn.execute("INSERT INTO complaints_fts(complaints_fts) VALUES('rebuild')")
+        conn.execute("INSERT INTO complaints_fts(complaints_fts) VALUES('optimize')")
+
+
+@timed_db
+def count_complaints(filters: dict | None = None) -> int:
+    clauses, params = _complaint_filter_clauses(filters)
+    query = "SELECT COUNT(*) FROM complaints"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    with get_conn() as conn:
+        return conn.execute(query, tuple(params)).fetchone()[0]
+
+
+@timed_db
+def get_version(cid):
+    """Cheap (version, updated_at) lookup used for cache keys and validators."""
+    return store.get_version(cid)
+
+
+@timed_db
+def get_user_version(mobile):
+    """(complaints, sum of their versions, latest updated_at) for one mobile.
+
+    Every insert or update raises the count or the sum, so the triple
+    changes whenever the user's list does; used for page validators.
+    """
+    return store.get_user_version(mobile)
+
+
+@timed_db(rows=lambda r: 0 if r[0] is None else 1)
+def get_with_version(cid):
+    """The get_by_id row plus its version and updated_at, read in one statement."""
+    return store.get_with_version(cid)
+
+
+@timed_db
+def update_status(cid, new_status):
+    now = db_timestamp(datetime.now())
+    with get_conn() as conn:
+        _log_status_changes(conn, [cid], now)
+        conn.execute(
+            "UPDATE complaints SET status=?, version=version+1, updated_at=? WHERE id=?",
+            (new_status, now, cid),
+        )
+    change_feed.poke()
+
+
+@timed_db
+def update_response_and_resolve(cid: str, response_text: str):
+    now = db_timestamp(datetime.now())
+    with get_conn() as conn:
+        _log_status_changes(conn, [cid], now)
+        conn.execute(
+            "UPDATE complaints SET response_text=?, status='Resolved', version=version+1, updated_at=? WHERE id=?",
+            (response_text, now, cid),
+        )
+    change_feed.poke()
+
+
+BATCH_UPDATE_MAX = int(os.environ.get("BATCH_UPDATE_MAX", 500))
+
+
+@timed_db(rows=lambda r: len(r[1]))
+def batch_update_complaints(ids, status: str | None = None, response_text: str | None = None):
+    """Apply one status (or a shared response, which resolves) to many complaints.
+
+    Runs as a single transaction with one executemany. Returns
+    ``(results, rows)``: each id mapped to "updated" or "not_found", and the
+    refreshed rows of the updated complaints.
+    """
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        return {}, []
+    now = db_timestamp(datetime.now())
+    with get_conn() as conn:
+        found = [r[0] for r in _rows_for_ids("SELECT id FROM complaints WHERE id IN ({ids})", ids, conn)]
+        _log_status_changes(conn, found, now)
+        if response_text:
+            conn.executemany(
+                "UPDATE complaints SET response_text=?, status='Resolved', version=version+1, updated_at=? WHERE id=?",
+                [(response_text, now, cid) for cid in found],
+            )
+        else:
+            conn.executemany(
+                "UPDATE complaints SET status=?, version=version+1, updated_at=? WHERE id=?",
+                [(status, now, cid) for cid in found],
+            )
+        rows = _rows_for_ids(f"SELECT {COMPLAINT_COLUMNS} FROM complaints WHERE id IN ({{ids}})", ids, conn)
+    change_feed.poke()
+    found = set(found)
+    return {cid: "updated" if cid in found else "not_found" for cid in ids}, rows
+
+
+# ---------- Quota ledger ----------
+# Per-mobile counters charged in the same transaction as the insert:
+# "M:YYYY-MM" rows for the calendar-month cap and "D:YYYY-MM-DD" rows for the
+# rolling window (pruned once they fall out of it). Checks are primary-key
+# reads, independent of how many complaints a mobile has filed.
+MONTHLY_COMPLAINT_LIMIT = int(os.environ.get("QUOTA_MONTHLY_LIMIT", 10))
+QUOTA_WINDOW_DAYS = int(os.environ.get("QUOTA_WINDOW_DAYS", 15))
+QUOTA_WINDOW_LIMIT = int(os.environ.get("QUOTA_WINDOW_LIMIT", 0))
+QUOTA_CACHE = os.environ.get("QUOTA_CACHE", "1") == "1"
+QUOTA_CACHE_MAX = 10000
+
+
+class QuotaExceeded(Exception):
+    pass
+
+
+# mobile -> (rule key, message) for limits known to be used up; the key
+# names the month or day it applies to, so entries go stale on their own
+_quota_exhausted = {}
+
+
+def _month_limit_message(when: datetime) -> str:
+    return f"Monthly limit reached. Only {MONTHLY_COMPLAINT_LIMIT} petitions allowed in {when.strftime('%B %Y')}."
+
+
+def _window_limit_message() -> str:
+    return f"Limit reached. Only {QUOTA_WINDOW_LIMIT} petition(s) allowed every {QUOTA_WINDOW_DAYS} days."
+
+
+def _remember_exhausted(mobile: str, key: str, message: str):
+    if not QUOTA_CACHE:
+        return
+    if len(_quota_exhausted) >= QUOTA_CACHE_MAX:
+        _quota_exhausted.clear()
+    _quota_exhausted[mobile] = (key, message)
+
+
+def check_quota_cache(mobile: str, when: datetime):
+    """Reject without touching the database when this worker already knows the answer."""
+    hit = _quota_exhausted.get(mobile)
+    if hit and hit[0] in (f"M:{when:%Y-%m}", f"D:{when:%Y-%m-%d}"):
+        raise QuotaExceeded(hit[1])
+
+
+def charge_quota(conn, mobile: str, when: datetime):
+    month_key = f"M:{when:%Y-%m}"
+    day_key = f"D:{when:%Y-%m-%d}"
+    if MONTHLY_COMPLAINT_LIMIT:
+        row = conn.execute("SELECT n FROM quota_ledger WHERE mobile=? AND period=?", (mobile, month_key)).fetchone()
+        if row and row[0] >= MONTHLY_COMPLAINT_LIMIT:
+            _remember_exhausted(mobile, month_key, _month_limit_message(when))
+            raise QuotaExceeded(_month_limit_message(when))
+    first_day = f"D:{(when - timedelta(days=QUOTA_WINDOW_DAYS - 1)):%Y-%m-%d}"
+    if QUOTA_WINDOW_LIMIT:
+        used = conn.execute(
+            "SELECT COALESCE(SUM(n), 0) FROM quota_ledger WHERE mobile=? AND period BETWEEN ? AND ?",
+            (mobile, first_day, day_key),
+        ).fetchone()[0]
+        if used >= QUOTA_WINDOW_LIMIT:
+            # re-checked tomorrow, when the oldest day may have left the window
+            _remember_exhausted(mobile, day_key, _window_limit_message())
+            raise QuotaExceeded(_window_limit_message())
+    conn.executemany(
+        "INSERT INTO quota_ledger (mobile, period, n) VALUES (?, ?, 1) ON CONFLICT (mobile, period) DO UPDATE SET n = quota_ledger.n + 1",
+        [(mobile, month_key), (mobile, day_key)],
+    )
+    conn.execute("DELETE FROM quota_ledger WHERE mobile=? AND period >= 'D:' AND period < ?", (mobile, first_day))
+
+
+def quota_window_start() -> str:
+    """First day (YYYY-MM-DD) of the rolling window that ends today; older day rows aren't kept."""
+    return f"{(datetime.now() - timedelta(days=QUOTA_WINDOW_DAYS - 1)):%Y-%m-%d}"
+
+
+def rebuild_quota_ledger():
+    """Recompute the ledger from the complaints table (after bulk loads)."""
+    with get_conn() as conn:
+        conn.execute("DELETE FROM quota_ledger")
+        conn.execute(QUOTA_LEDGER_BACKFILL, (quota_window_start(),))
+    _quota_exhausted.clear()
+
+
+# ---------- Complaint submission ----------
+SUBMIT_BATCHING = os.environ.get("SUBMIT_BATCHING", "0") == "1"
+SUBMIT_BATCH_MAX = int(os.environ.get("SUBMIT_BATCH_MAX", 64))
+SUBMIT_BATCH_WAIT_MS = float(os.environ.get("SUBMIT_BATCH_WAIT_MS", 5))
+SUBMIT_TIMEOUT_S = float(os.environ.get("SUBMIT_TIMEOUT_S", 30))
+COMPLAINT_ID_ATTEMPTS = 3
+
+
+class SubmitBusy(Exception):
+    pass
+
+CROCKFORD32 = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+# ids count seconds from here; 7 base32 digits last until the 3100s
+COMPLAINT_ID_EPOCH = int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp())
+_CROCKFORD_ALIASES = str.maketrans("ILO", "110")
+COMPLAINT_ID_RANDOM_BITS = 45
+
+
+def _base32(n: int, width: int) -> str:
+    out = []
+    for _ in range(width):
+        n, digit = divmod(n, 32)
+        out.append(CROCKFORD32[digit])
+    return "".join(reversed(out))
+
+
+class ComplaintIdGenerator:
+    """Short, time-ordered complaint ids: 16 Crockford base32 characters.
+
+    Seven characters count seconds since COMPLAINT_ID_EPOCH and nine are
+    COMPLAINT_ID_RANDOM_BITS random bits. The alphabet is in ASCII order,
+    so ids sort by creation second and new rows land near the right edge of
+    the primary-key index. An id opens its petition on /track and its PDF
+    without a login, so nothing after the time part may be derivable from
+    another id; a clash is left to submit_complaint's retry.
+    """
+
+    def next(self, now: float | None = None) -> str:
+        second = int(now if now is not None else time.time()) - COMPLAINT_ID_EPOCH
+        return _base32(second, 7) + _base32(secrets.randbits(COMPLAINT_ID_RANDOM_BITS), 9)
+
+    def seeded(self, seed: str, when: float) -> str:
+        """An id of the same shape whose random part is a SHA-256 of ``seed``, so it can be made again.
+
+        For rows that are loaded rather than filed; ``when`` is the row's
+        creation time, clamped to COMPLAINT_ID_EPOCH for older rows.
+        """
+        second = max(0, int(when) - COMPLAINT_ID_EPOCH)
+        digest = int.from_bytes(hashlib.sha256(seed.encode()).digest()[:8], "big")
+        return _base32(second, 7) + _base32(digest >> (64 - COMPLAINT_ID_RANDOM_BITS), 9)
+
+
+complaint_ids = ComplaintIdGenerator()
+
+
+def normalize_complaint_id(key: str) -> str:
+    """Accept ids as typed: any case, with spaces or dashes, I/L for 1 and O for 0.
+
+    Legacy ids (8 hex characters from uuid4) are stored lower-case.
+    """
+    compact = key.strip().replace("-", "").replace(" ", "")
+    if len(compact) == 16 and compact.isalnum():
+        return compact.upper().translate(_CROCKFORD_ALIASES)
+    if len(compact) == 8 and all(ch in "0123456789abcdefABCDEF" for ch in compact):
+        return compact.lower()
+    return key.strip()
+
+
+def _insert_within_quota(conn, c):
+    # caller holds the store's submit lock, so check + charge + insert is atomic
+    charge_quota(conn, c['mobile'], datetime.fromisoformat(c['created_at']))
+    _insert_complaint_row(conn, c)
+
+
+class SubmitWriter:
+    """Single writer thread that commits queued submissions in small groups.
+
+    Requests block on a Future that resolves only after the group's commit,
+    so each caller still learns whether its complaint was stored (or gets
+    its QuotaExceeded). Quota checks run inside the group transaction, in
+    arrival order, so several submissions from one mobile in the same group
+    are counted correctly. A caller that stops waiting after its timeout
+    withdraws a submission still in the queue, so it is never stored.
+    """
+
+    def __init__(self, max_batch: int, max_wait_ms: float):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+
+    def _ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                threading.Thread(target=self._run, args=(self._queue,), name="submit-writer", daemon=True).start()
+                self._pid = os.getpid()
+
+    def submit(self, complaint: dict, timeout: float = SUBMIT_TIMEOUT_S):
+        self._ensure_started()
+        fut = Future()
+        self._queue.put((complaint, fut))
+        try:
+            return fut.result(timeout)
+        except FutureTimeout:
+            if fut.cancel():
+                # still queued: the writer skips it, so it is never stored
+                raise SubmitBusy("Server busy. Please try again in a moment.") from None
+        # its group is committing; the outcome follows shortly
+        return fut.result()
+
+    def _run(self, q):
+        while True:
+            batch = [q.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(q.get(timeout=remaining) if remaining > 0 else q.get_nowait())
+                except queue.Empty:
+                    break
+            # drops submissions whose caller gave up waiting; the rest can no longer be cancelled
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if batch:
+                self._commit(batch)
+
+    def _commit(self, batch):
+        outcomes = []
+        try:
+            with get_conn() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                for complaint, fut in batch:
+                    # a savepoint per item keeps one bad row from failing the group
+                    conn.execute("SAVEPOINT submit_item")
+                    try:
+                        _insert_within_quota(conn, complaint)
+                        outcomes.append((fut, None))
+                        conn.execute("RELEASE submit_item")
+                    except (sqlite3.Error, QuotaExceeded) as exc:
+                        conn.execute("ROLLBACK TO submit_item")
+                        conn.execute("RELEASE submit_item")
+                        outcomes.append((fut, exc))
+        except Exception as exc:
+            for _, fut in batch:
+                fut.set_exception(exc)
+            return
+        for fut, exc in outcomes:
+            if exc is not None:
+                fut.set_exception(exc)
+            else:
+                fut.set_result(None)
+
+
+submit_writer = SubmitWriter(SUBMIT_BATCH_MAX, SUBMIT_BATCH_WAIT_MS)
+
+
+@timed_db
+def submit_complaint(complaint: dict) -> str:
+    """Store a new complaint and return its id; raises QuotaExceeded if the mobile is over a limit.
+
+    A complaint without an id gets a generated one, regenerated if taken.
+    """
+    check_quota_cache(complaint['mobile'], datetime.fromisoformat(complaint['created_at']))
+    # signed before any lock is taken; the insert only looks up and stores it
+    complaint.setdefault('signature', description_signature(complaint['description']))
+    if complaint.get('id'):
+        store.submit_complaint(complaint)
+        change_feed.poke()
+        return complaint['id']
+    for attempt in range(COMPLAINT_ID_ATTEMPTS):
+        complaint['id'] = complaint_ids.next()
+        try:
+            store.submit_complaint(complaint)
+            change_feed.poke()
+            return complaint['id']
+        except store.duplicate_key_errors:
+            metrics.inc("complaint_id_conflicts_total")
+            if attempt == COMPLAINT_ID_ATTEMPTS - 1:
+                raise
+
+
+# ---------- Evidence attachments ----------
+# Uploads are written to a temp file under EVIDENCE_DIR while the multipart
+# body is parsed, hashed chunk by chunk, then hard-linked to a path named by
+# their sha256, so a file sent twice is stored once. The directory must be
+# shared by every worker and host, like the database.
+EVIDENCE_DIR = os.environ.get("EVIDENCE_DIR") or os.path.splitext(DB_PATH)[0] + "-evidence"
+EVIDENCE_MAX_BYTES = int(os.environ.get("EVIDENCE_MAX_BYTES", 10 * 1024 * 1024))
+EVIDENCE_MAX_FILES = int(os.environ.get("EVIDENCE_MAX_FILES", 5))
+# the form fields on top of the files
+EVIDENCE_REQUEST_MAX = EVIDENCE_MAX_FILES * EVIDENCE_MAX_BYTES + 1024 * 1024
+EVIDENCE_UPLOAD_ENDPOINTS = ("submit",)
+EVIDENCE_NAME_MAX = 120
+# by extension; the stored type comes from here, never from the client
+EVIDENCE_TYPES = {
+    ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png", ".gif": "image/gif",
+    ".webp": "image/webp", ".heic": "image/heic",
+    ".mp3": "audio/mpeg", ".m4a": "audio/mp4", ".aac": "audio/aac", ".ogg": "audio/ogg",
+    ".opus": "audio/ogg", ".wav": "audio/wav", ".amr": "audio/amr", ".mp4": "video/mp4",
+    ".pdf": "application/pdf", ".txt": "text/plain", ".doc": "application/msword",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+EVIDENCE_ACCEPT = ",".join(EVIDENCE_TYPES)
+EVIDENCE_INSERT = (
+    "INSERT INTO complaint_evidence (complaint_id, sha256, filename, content_type, size, added_at) "
+    "SELECT ?, ?, ?, ?, ?, ? WHERE (SELECT COUNT(*) FROM complaint_evidence WHERE complaint_id = ?) < ? "
+    "ON CONFLICT (complaint_id, sha256) DO NOTHING"
+)
+
+
+class EvidenceUpload:
+    """Write target for one uploaded file: a temp file hashed as each chunk arrives.
+
+    Stands in for werkzeug's spooled temp file, so reads and seeks go to the
+    file underneath; closing it (at the end of the request) deletes it.
+    """
+
+    def __init__(self, limit: int):
+        tmp_dir = os.path.join(EVIDENCE_DIR, "tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        self.file = tempfile.NamedTemporaryFile(dir=tmp_dir, prefix="upload-")
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.limit = limit
+
+    def write(self, data) -> int:
+        self.size += len(data)
+        if self.size > self.limit:
+            raise RequestEntityTooLarge()
+        self.sha256.update(data)
+        return self.file.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+
+class PortalRequest(Request):
+    """Streams files posted to EVIDENCE_UPLOAD_ENDPOINTS into EvidenceUpload sinks."""
+
+    @property
+    def max_content_length(self):
+        if self.endpoint in EVIDENCE_UPLOAD_ENDPOINTS:
+            return EVIDENCE_REQUEST_MAX
+        return super().max_content_length
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.endpoint not in EVIDENCE_UPLOAD_ENDPOINTS:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        sink = EvidenceUpload(EVIDENCE_MAX_BYTES)
+        # kept here too: a part cut off by a size limit never reaches request.files
+        self.__dict__.setdefault("_evidence_sinks", []).append(sink)
+        return sink
+
+    def close(self):
+        super().close()
+        for sink in self.__dict__.pop("_evidence_sinks", ()):
+            sink.close()
+
+
+app.request_class = PortalRequest
+
+
+def evidence_path(sha256: str) -> str:
+    return os.path.join(EVIDENCE_DIR, sha256[:2], sha256[2:])
+
+
+def evidence_name(filename: str) -> str:
+    # browsers may send a full client path; keep the last part, printable, bounded
+    name = os.path.basename(filename.replace("\\", "/")).strip()
+    return "".join(ch for ch in name if ch.isprintable())[-EVIDENCE_NAME_MAX:]
+
+
+def check_evidence(uploads) -> str | None:
+    """Why these uploads can't be accepted, or None."""
+    if len(uploads) > EVIDENCE_MAX_FILES:
+        return f"At most {EVIDENCE_MAX_FILES} attachments."
+    for upload in uploads:
+        name = evidence_name(upload.filename)
+        if os.path.splitext(name)[1].lower() not in EVIDENCE_TYPES:
+            return f"{name}: attach photos, audio, video, PDF, Word or text files."
+        if not upload.stream.size:
+            return f"{name} is empty."
+    return None
+
+
+def store_evidence(upload) -> dict:
+    """Move a parsed upload into the content-addressed store; returns its complaint_evidence fields."""
+    sink = upload.stream
+    sha256 = sink.sha256.hexdigest()
+    path = evidence_path(sha256)
+    sink.flush()
+    os.fsync(sink.fileno())
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        os.link(sink.name, path)
+        metrics.inc("evidence_bytes_total", sink.size, outcome="stored")
+    except FileExistsError:
+        # already stored; a fresh mtime keeps prune-evidence off it until this submission commits
+        os.utime(path)
+        metrics.inc("evidence_bytes_total", sink.size, outcome="deduplicated")
+    name = evidence_name(upload.filename)
+    return {"sha256": sha256, "filename": name, "size": sink.size,
+            "content_type": EVIDENCE_TYPES[os.path.splitext(name)[1].lower()]}
+
+
+def _insert_evidence_rows(conn, cid: str, items, now: str) -> int:
+    added = 0
+    for item in items:
+        added += conn.execute(EVIDENCE_INSERT, (cid, item['sha256'], item['filename'], item['content_type'],
+                                                item['size'], now, cid, EVIDENCE_MAX_FILES)).rowcount
+    return added
+
+
+@timed_db(rows=lambda found: sum(len(files) for files in found.values()))
+def list_evidence(ids, conn=None) -> dict:
+    """complaint id -> [(sha256, filename, content_type, size)] for the given complaints."""
+    found = {}
+    for row in _rows_for_ids(
+        "SELECT complaint_id, sha256, filename, content_type, size FROM complaint_evidence "
+        "WHERE complaint_id IN ({ids}) ORDER BY complaint_id, added_at, filename",
+        ids,
+        conn,
+    ):
+        found.setdefault(row[0], []).append(tuple(row[1:]))
+    return found
+
+
+@timed_db
+def get_evidence(cid: str, sha256: str):
+    with get_conn() as conn:
+        return conn.execute(
+            "SELECT filename, content_type, size FROM complaint_evidence WHERE complaint_id=? AND sha256=?",
+            (cid, sha256),
+        ).fetchone()
+
+
+@app.cli.command("prune-evidence")
+@click.option("--grace-hours", type=float, default=24, show_default=True,
+              help="Keep unlinked files younger than this")
+def prune_evidence_command(grace_hours):
+    """Delete stored attachments no complaint links to, e.g. from submissions over quota."""
+    with get_conn() as conn:
+        linked = {r[0] for r in conn.execute("SELECT DISTINCT sha256 FROM complaint_evidence")}
+    cutoff = time.time() - grace_hours * 3600
+    removed = freed = 0
+    # "ab/cdef..." is blob "abcdef..."; leftovers in tmp/ never match a hash
+    for path in glob.glob(os.path.join(EVIDENCE_DIR, "*", "*")):
+        try:
+            st = os.stat(path)
+            if os.path.relpath(path, EVIDENCE_DIR).replace(os.sep, "") in linked or st.st_mtime > cutoff:
+                continue
+            os.unlink(path)
+        except OSError:
+            continue
+        removed += 1
+        freed += st.st_size
+    click.echo(f"removed {removed} unlinked files ({freed / 2**20:.1f} MiB)")
+
+
+# ---------- Duplicate detection ----------
+# A description's signature is a MinHash over its word pairs: for each of
+# MINHASH_SIZE hash functions, the low 16 bits of the smallest hash of any
+# pair. Two signatures agree at about the Jaccard similarity of the two pair
+# sets. The signature is cut into LSH_BANDS bands stored as buckets, so a
+# new complaint only compares against those sharing a whole band with it:
+# at 20 bands of 3 values a similarity of 0.5 shares one 93% of the time,
+# and of 0.1 about 2%. Matches at DUPLICATE_THRESHOLD or above are recorded
+# both ways in complaint_duplicates.
+MINHASH_SIZE = 60
+LSH_BANDS = 20
+SHINGLE_WORDS = 2
+DUPLICATE_MIN_SHINGLES = 4
+DUPLICATE_THRESHOLD = float(os.environ.get("DUPLICATE_THRESHOLD", 0.5))
+DUPLICATE_CANDIDATES_MAX = 200
+DUPLICATE_MATCHES_MAX = 10
+DUPLICATE_SHOWN = 5
+_MERSENNE_61 = (1 << 61) - 1
+# signatures are stored, so every process must draw the same functions
+_minhash_rng = random.Random(4207313)
+MINHASH_PERMUTATIONS = [(_minhash_rng.randrange(1, _MERSENNE_61), _minhash_rng.randrange(_MERSENNE_61))
+                        for _ in range(MINHASH_SIZE)]
+_SIGNATURE = struct.Struct(f">{MINHASH_SIZE}H")
+
+
+def description_shingles(text: str) -> set:
+    """Hashes of the description's SHINGLE_WORDS-word runs, ignoring case and punctuation."""
+    words = [w for w in (t.strip('"\'.,;:!?()[]{}').lower() for t in (text or "").split()) if w]
+    return {
+        zlib.crc32(" ".join(words[i:i + SHINGLE_WORDS]).encode())
+        for i in range(max(1, len(words) - SHINGLE_WORDS + 1))
+    }
+
+
+def description_signature(text: str) -> bytes:
+    """MinHash signature of a description; empty when it is too short to compare."""
+    shingles = description_shingles(text)
+    if len(shingles) < DUPLICATE_MIN_SHINGLES:
+        return b""
+    return _SIGNATURE.pack(*(min([(a * x + b) % _MERSENNE_61 for x in shingles]) & 0xFFFF
+                             for a, b in MINHASH_PERMUTATIONS))
+
+
+def signature_similarity(a: bytes, b: bytes) -> float:
+    return sum(map(int.__eq__, _SIGNATURE.unpack(a), _SIGNATURE.unpack(b))) / MINHASH_SIZE
+
+
+def lsh_buckets(signature: bytes) -> list:
+    width = len(signature) // LSH_BANDS
+    # the band number is hashed in, so equal values in different bands don't collide
+    return [zlib.crc32(bytes([band]) + signature[band * width:(band + 1) * width]) - 2**31
+            for band in range(LSH_BANDS)]
+
+
+def find_duplicates(conn, signature: bytes, buckets: list | None = None) -> list:
+    """Indexed complaints resembling ``signature``, likeliest first, as [(id, similarity)].
+
+    Only complaints sharing a bucket are read, those sharing the most
+    first, up to DUPLICATE_CANDIDATES_MAX.
+    """
+    buckets = buckets or lsh_buckets(signature)
+    candidates = conn.execute(
+        "SELECT complaint_id, signature FROM complaint_minhash WHERE ref IN ("
+        f"SELECT ref FROM complaint_lsh WHERE bucket IN ({','.join('?' * len(buckets))}) "
+        "GROUP BY ref ORDER BY COUNT(*) DESC LIMIT ?)",
+        (*buckets, DUPLICATE_CANDIDATES_MAX),
+    ).fetchall()
+    matches = [(other, signature_similarity(signature, bytes(theirs))) for other, theirs in candidates]
+    return sorted((m for m in matches if m[1] >= DUPLICATE_THRESHOLD), key=lambda m: -m[1])[:DUPLICATE_MATCHES_MAX]
+
+
+def _index_description(conn, cid: str, signature: bytes) -> list:
+    """Index a complaint's signature and record what it resembles; returns [(id, similarity)]."""
+    row = conn.execute(
+        "INSERT INTO complaint_minhash (complaint_id, signature) VALUES (?, ?) "
+        "ON CONFLICT (complaint_id) DO NOTHING RETURNING ref",
+        (cid, signature),
+    ).fetchone()
+    if row is None or not signature:
+        return []
+    buckets = lsh_buckets(signature)
+    matches = find_duplicates(conn, signature, buckets)
+    conn.executemany("INSERT INTO complaint_lsh (bucket, ref) VALUES (?, ?) ON CONFLICT DO NOTHING",
+                     [(bucket, row[0]) for bucket in buckets])
+    conn.executemany(
+        "INSERT INTO complaint_duplicates (complaint_id, duplicate_id, similarity) VALUES (?, ?, ?) "
+        "ON CONFLICT DO NOTHING",
+        [pair for other, sim in matches for pair in ((cid, other, sim), (other, cid, sim))],
+    )
+    return matches
+
+
+@timed_db(rows=lambda found: sum(len(dups) for dups in found.values()))
+def list_duplicates(ids) -> dict:
+    """complaint id -> its DUPLICATE_SHOWN likeliest duplicates as [(id, similarity)]."""
+    found = {}
+    for cid, other, sim in _rows_for_ids(
+        "SELECT complaint_id, duplicate_id, similarity FROM complaint_duplicates "
+        "WHERE complaint_id IN ({ids}) ORDER BY complaint_id, similarity DESC, duplicate_id",
+        ids,
+    ):
+        dups = found.setdefault(cid, [])
+        if len(dups) < DUPLICATE_SHOWN:
+            dups.append((other, sim))
+    return found
+
+
+def backfill_duplicate_index(batch_size: int = 1000, rebuild: bool = False, progress=None) -> dict:
+    """Sign and index complaints that have no signature yet (bulk imports, rows older than the index).
+
+    Complaints go in filing order, one transaction per batch, and each is
+    matched against everything indexed before it, so every pair is found.
+    """
+    started = time.perf_counter()
+    if rebuild:
+        with get_conn() as conn:
+            for table in ("complaint_duplicates", "complaint_lsh", "complaint_minhash"):
+                conn.execute(f"DELETE FROM {table}")
+    cursor = ("", "")
+    indexed = pairs = 0
+    while True:
+        with get_conn() as conn:
+            rows = conn.execute(
+                "SELECT c.id, c.description, c.created_at FROM complaints c "
+                "LEFT JOIN complaint_minhash m ON m.complaint_id = c.id "
+                "WHERE m.complaint_id IS NULL AND (c.created_at, c.id) > (?, ?) "
+                "ORDER BY c.created_at, c.id LIMIT ?",
+                (*cursor, batch_size),
+            ).fetchall()
+        if not rows:
+            break
+        cursor = (rows[-1][2], rows[-1][0])
+        signed = [(cid, description_signature(text)) for cid, text, _ in rows]
+        with get_conn() as conn:
+            # the lock new complaints are indexed under
+            store.lock_change_log(conn)
+            for cid, signature in signed:
+                pairs += len(_index_description(conn, cid, signature))
+        indexed += len(rows)
+        if progress:
+            progress(indexed)
+    return {"indexed": indexed, "pairs": pairs, "seconds": time.perf_counter() - started}
+
+
+@app.cli.command("index-duplicates")
+@click.option("--batch-size", type=int, default=1000, show_default=True)
+@click.option("--rebuild", is_flag=True, help="Drop every signature and match first")
+def index_duplicates_command(batch_size, rebuild):
+    """Add complaints missing from the duplicate index, e.g. after import-complaints."""
+    counts = backfill_duplicate_index(batch_size, rebuild, progress=lambda n: click.echo(f"{n} indexed"))
+    rate = counts["indexed"] / counts["seconds"] if counts["seconds"] else 0
+    click.echo(f"{counts['indexed']} complaints indexed, {counts['pairs']} possible duplicates "
+               f"in {counts['seconds']:.1f}s ({rate:.0f} rows/s)")
+
+
+# ---------- Complaint statistics ----------
+STATS_LEVELS = ("taluk", "firka", "village")
+
+
+@timed_db(rows=lambda r: len(r[1]))
+def complaint_stats(taluk=None, firka=None, from_month=None, to_month=None):
+    """Counts per (month, location, status), one level below the given location.
+
+    This reads only counter rows, so the cost depends on how many cells are
+    requested, not on how many complaints exist.
+    """
+    return store.complaint_stats(taluk, firka, from_month, to_month)
+
+
+def stats_drift():
+    """Cells whose counter differs from a fresh GROUP BY: (cell, stored, actual)."""
+    with get_conn() as conn:
+        actual = {row[:5]: row[5] for row in conn.execute(store.stats_source)}
+        stored = {row[:5]: row[5] for row in conn.execute(f"SELECT {STATS_CELL}, n FROM complaint_stats")}
+    drift = []
+    for cell in sorted(set(actual) | set(stored)):
+        if actual.get(cell, 0) != stored.get(cell, 0):
+            drift.append((cell, stored.get(cell, 0), actual.get(cell, 0)))
+    return drift
+
+
+def rebuild_stats():
+    with get_conn() as conn:
+        conn.execute("DELETE FROM complaint_stats")
+        conn.execute(f"INSERT INTO complaint_stats ({STATS_CELL}, n) {store.stats_source}")
+
+
+# ---------- Storage backends ----------
+# Helpers above whose SQL both dialects accept (qmark placeholders, ON
+# CONFLICT, RETURNING, row values) run through get_conn() on either backend.
+# The operations that differ are methods of the active store.
+DATABASE_URL = os.environ.get("DATABASE_URL") or None
+PG_POOL_MIN = int(os.environ.get("PG_POOL_MIN", 1))
+PG_POOL_MAX = int(os.environ.get("PG_POOL_MAX", DB_POOL_SIZE))
+PG_MIGRATION_LOCK = 4207311
+PG_CHANGE_LOG_LOCK = 4207312
+
+
+class ComplaintStore:
+    """Persistence operations whose SQL differs between backends.
+
+    Routes reach these through the module-level helpers of the same names,
+    which add metrics; every backend must return the same rows for them.
+    """
+
+    name = None
+    # raised by an insert whose primary key is taken
+    duplicate_key_errors = ()
+    # SELECT of complaint_stats rows recomputed from the complaints
+    stats_source = None
+
+    def connection(self):
+        """Context manager for a connection that commits on success."""
+        raise NotImplementedError
+
+    def pool_stats(self) -> dict:
+        raise NotImplementedError
+
+    def table_columns(self, conn, table: str) -> set:
+        raise NotImplementedError
+
+    def migrate(self) -> list:
+        """Bring the schema up to date; returns (step, seconds) for each step run."""
+        raise NotImplementedError
+
+    def create_tables(self, conn, names=None):
+        for stmt in schema_statements(self.name, names):
+            conn.execute(stmt)
+
+    def add_columns(self, conn, columns=None):
+        """Add the SCHEMA_ADDED_COLUMNS (or those named) a table lacks, with their backfill."""
+        for table, column, decl, backfill in SCHEMA_ADDED_COLUMNS:
+            if columns is not None and column not in columns:
+                continue
+            if column not in self.table_columns(conn, table):
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+                if backfill:
+                    conn.execute(backfill)
+
+    def migrate_shared(self, conn):
+        """Create SCHEMA_TABLES and add SCHEMA_ADDED_COLUMNS; the same steps on every backend."""
+        ledger_missing = not self.table_columns(conn, "quota_ledger")
+        self.create_tables(conn)
+        self.add_columns(conn)
+        if ledger_missing:
+            conn.execute(QUOTA_LEDGER_BACKFILL, (quota_window_start(),))
+
+    def get_by_id(self, cid):
+        raise NotImplementedError
+
+    def get_version(self, cid):
+        raise NotImplementedError
+
+    def get_with_version(self, cid):
+        raise NotImplementedError
+
+    def get_user_version(self, mobile):
+        raise NotImplementedError
+
+    def find_complaints_by_mobile(self, mobile):
+        raise NotImplementedError
+
+    def complaint_pages(self, filters, batch_size: int, evidence: bool = False):
+        """Yield (rows, evidence by complaint id) a page at a time, newest first."""
+        raise NotImplementedError
+
+    def search_complaints(self, text: str, filters, limit: int, offset: int):
+        raise NotImplementedError
+
+    def count_search_matches(self, text: str, filters) -> int:
+        raise NotImplementedError
+
+    def complaint_stats(self, taluk, firka, from_month, to_month):
+        # both backends keep complaint_stats; months are compared whole, never against a sentinel
+        level = "village" if firka else "firka" if taluk else "taluk"
+        clauses, params = ["n > 0"], []
+        if taluk:
+            clauses.append("taluk = ?")
+            params.append(taluk)
+        if firka:
+            clauses.append("firka = ?")
+            params.append(firka)
+        if from_month:
+            clauses.append("month >= ?")
+            params.append(from_month)
+        if to_month:
+            clauses.append("month <= ?")
+            params.append(to_month)
+        sql = (f"SELECT month, {level}, status, SUM(n) FROM complaint_stats WHERE {' AND '.join(clauses)} "
+               f"GROUP BY month, {level}, status ORDER BY month DESC, {level}, status")
+        with self.connection() as conn:
+            return level, conn.execute(sql, tuple(params)).fetchall()
+
+    def submit_complaint(self, complaint: dict):
+        raise NotImplementedError
+
+    def lock_change_log(self, conn):
+        """Hold until commit, so complaint_changes rows commit in seq order."""
+        raise NotImplementedError
+
+
+class SqliteStore(ComplaintStore):
+    """The local SQLite file, with the archive database attached."""
+
+    name = "sqlite"
+    duplicate_key_errors = (sqlite3.IntegrityError,)
+    stats_source = STATS_FROM_COMPLAINTS
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+
+    def connection(self):
+        return self.pool.connection()
+
+    def pool_stats(self) -> dict:
+        return self.pool.stats()
+
+    def table_columns(self, conn, table: str) -> set:
+        return {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+
+    @contextmanager
+    def migration_lock(self, wait: bool = True):
+        """Held while migrating and by a deferred import for its whole load.
+
+        Yields whether the lock was taken; without ``wait`` it gives up at once
+        when another process holds it.
+        """
+        with open(f"{self.pool.path}.migrate-lock", "a") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | (0 if wait else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield False
+                return
+            yield True
+
+    def migrate(self):
+        # a dedicated connection, so a pre-forking master never opens the pool
+        conn = self.pool._open()
+        try:
+            pending = conn.execute("PRAGMA user_version").fetchone()[0] < len(SQLITE_MIGRATIONS)
+            if not pending and not self._index_set_dropped(conn):
+                return []
+            applied = []
+            # one process migrates; the others wait here and then find nothing to do.
+            # With only a dropped index set to restore, a busy lock is a deferred import
+            # still loading (it restores them when done) or another process restoring them
+            with self.migration_lock(wait=pending) as locked:
+                if not locked:
+                    return []
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                for n, (name, step) in enumerate(SQLITE_MIGRATIONS[version:], version + 1):
+                    started = time.perf_counter()
+                    # the step and its user_version bump commit together
+                    conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        step(self, conn)
+                        conn.execute(f"PRAGMA user_version={n}")
+                        conn.commit()
+                    except BaseException:
+                        conn.rollback()
+                        raise
+                    applied.append((f"{n} {name}", time.perf_counter() - started))
+                if self._index_set_dropped(conn):
+                    applied.extend(self._finish_deferred_import(conn))
+            return applied
+        finally:
+            conn.close()
+
+    def _index_set_dropped(self, conn) -> bool:
+        # a deferred bulk import drops these for its load; while any is missing
+        # (it is loading, or died mid-load) rows went in without the FTS and statistics triggers
+        names = [*COMPLAINT_INDEXES, *IMPORT_DEFERRED_TRIGGERS]
+        found = conn.execute(
+            f"SELECT COUNT(*) FROM sqlite_master WHERE name IN ({','.join('?' * len(names))})", names
+        ).fetchone()[0]
+        return found < len(names)
+
+    def finish_deferred_import(self) -> list:
+        """Restore what _defer_complaint_indexes dropped; the caller holds migration_lock."""
+        conn = self.pool._open()
+        try:
+            return self._finish_deferred_import(conn)
+        finally:
+            conn.close()
+
+    def _finish_deferred_import(self, conn) -> list:
+        started = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            _migrate_complaint_indexes(self, conn)
+            for stmt in COMPLAINTS_FTS_SCHEMA[1:] + COMPLAINT_STATS_SCHEMA:
+                conn.execute(stmt)
+            conn.execute("DELETE FROM complaint_stats")
+            conn.execute(f"INSERT INTO complaint_stats ({STATS_CELL}, n) {self.stats_source}")
+            conn.execute("INSERT INTO complaints_fts(complaints_fts) VALUES('rebuild')")
+            conn.execute("INSERT INTO complaints_fts(complaints_fts) VALUES('optimize')")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        return [("restore indexes, statistics and search index after a deferred import", time.perf_counter() - started)]
+
+    def get_by_id(self, cid):
+        # hot table first; a row caught mid-archive may briefly exist in both
+        with self.connection() as conn:
+            return conn.execute(
+                f"SELECT {COMPLAINT_COLUMNS} FROM main.complaints WHERE id=? "
+                f"UNION ALL SELECT {COMPLAINT_COLUMNS} FROM archive.complaints WHERE id=? LIMIT 1",
+                (cid, cid),
+            ).fetchone()
+
+    def get_version(self, cid):
+        with self.connection() as conn:
+            return conn.execute(
+                "SELECT version, updated_at FROM main.complaints WHERE id=? "
+                "UNION ALL SELECT version, updated_at FROM archive.complaints WHERE id=? LIMIT 1",
+                (cid, cid),
+            ).fetchone()
+
+    def get_with_version(self, cid):
+        with self.connection() as conn:
+            row = conn.execute(
+                f"SELECT {COMPLAINT_COLUMNS}, version, updated_at FROM main.complaints WHERE id=? "
+                f"UNION ALL SELECT {COMPLAINT_COLUMNS}, version, updated_at FROM archive.complaints WHERE id=? LIMIT 1",
+                (cid, cid),
+            ).fetchone()
+        return (row[:-2], *row[-2:]) if row else (None, None, None)
+
+    def get_user_version(self, mobile):
+        with self.connection() as conn:
+            return conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(version), 0), MAX(updated_at) FROM ("
+                "SELECT version, updated_at FROM main.complaints WHERE mobile=? "
+                "UNION ALL SELECT version, updated_at FROM archive.complaints WHERE mobile=?)",
+                (mobile, mobile),
+            ).fetchone()
+
+    def find_complaints_by_mobile(self, mobile):
+        with self.connection() as conn:
+            return conn.execute(
+                f"SELECT {COMPLAINT_COLUMNS} FROM main.complaints WHERE mobile=? "
+                f"UNION ALL SELECT {COMPLAINT_COLUMNS} FROM archive.complaints WHERE mobile=? "
+                f"ORDER BY created_at DESC",
+                (mobile, mobile),
+            ).fetchall()
+
+    def complaint_pages(self, filters, batch_size: int, evidence: bool = False):
+        # each page is read on a connection checked out for that page alone and
+        # released before it is yielded, so a slow client holds neither a pooled
+        # connection nor a read snapshot between pages
+        before = None
+        while True:
+            with self.connection() as conn:
+                rows = _complaints_page(conn, filters, batch_size, before)
+                files = list_evidence([r[0] for r in rows], conn) if evidence else {}
+            if not rows:
+                return
+            yield rows, files
+            if len(rows) < batch_size:
+                return
+            before = (rows[-1][10], rows[-1][0])
+
+    def search_complaints(self, text: str, filters, limit: int, offset: int):
+        query = fts_query(text)
+        if query is None:
+            return []
+        where, params = _search_from(filters, query)
+        columns = ",".join("c." + col for col in COMPLAINT_COLUMNS.split(","))
+        sql = f"SELECT {columns} {where} ORDER BY bm25(complaints_fts, 4.0, 1.0, 1.0), c.created_at DESC LIMIT ? OFFSET ?"
+        with self.connection() as conn:
+            return conn.execute(sql, (*params, limit, offset)).fetchall()
+
+    def count_search_matches(self, text: str, filters) -> int:
+        query = fts_query(text)
+        if query is None:
+            return 0
+        where, params = _search_from(filters, query)
+        with self.connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) {where}", tuple(params)).fetchone()[0]
+
+    def submit_complaint(self, complaint: dict):
+        if SUBMIT_BATCHING:
+            return submit_writer.submit(complaint)
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            _insert_within_quota(conn, complaint)
+
+    def lock_change_log(self, conn):
+        # a write transaction already shuts out every other writer
+        pass
+
+
+# PostgreSQL's counterpart of complaints_fts: a generated tsvector with the
+# petitioner's name weighted above the text, and a GIN index over it.
+PG_SEARCH_SCHEMA = [
+    """
+    ALTER TABLE complaints ADD COLUMN IF NOT EXISTS search_tsv tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(petitioner_name, '')), 'A') ||
+        to_tsvector('simple', coalesce(description, '') || ' ' || coalesce(response_text, ''))
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_complaints_search ON complaints USING GIN (search_tsv)",
+]
+
+
+def pg_tsquery(text: str) -> str | None:
+    """Like fts_query, for to_tsquery: every word, as a quoted prefix lexeme."""
+    terms = search_terms(text)
+    if not terms:
+        return None
+    return " & ".join("'" + t.replace("\\", "\\\\").replace("'", "''") + "':*" for t in terms)
+
+
+class _PgConnection:
+    """Runs the shared qmark SQL on a psycopg connection.
+
+    Placeholders become %s, so shared SQL must not contain a literal '?'
+    or '%'.
+    """
+
+    def __init__(self, conn):
+        self.raw = conn
+
+    def execute(self, sql: str, params=()):
+        if METRICS_ENABLED:
+            _trace_statement(sql)
+        return self.raw.execute(sql.replace("?", "%s"), params or None)
+
+    def executemany(self, sql: str, seq):
+        if METRICS_ENABLED:
+            _trace_statement(sql)
+        cur = self.raw.cursor()
+        cur.executemany(sql.replace("?", "%s"), list(seq))
+        return cur
+
+
+class PostgresStore(ComplaintStore):
+    """PostgreSQL, for running the app on several hosts against one database.
+
+    Each process opens its own psycopg_pool lazily, so gunicorn workers
+    never share the master's sockets. Search uses a generated tsvector
+    column and statistics a trigger-kept complaint_stats table. There is no
+    archive database, and the SQLite-only maintenance commands refuse to run.
+    """
+
+    name = "postgres"
+    stats_source = PG_STATS_FROM_COMPLAINTS
+
+    def __init__(self, url: str, min_size: int, max_size: int):
+        try:
+            import psycopg
+            import psycopg_pool
+        except ImportError as exc:
+            raise RuntimeError("DATABASE_URL needs the psycopg and psycopg-pool packages") from exc
+        self.url = url
+        self.min_size = min_size
+        self.max_size = max_size
+        self._psycopg = psycopg
+        self.duplicate_key_errors = (psycopg.errors.UniqueViolation,)
+        self._pool_class = psycopg_pool.ConnectionPool
+        self._lock = threading.Lock()
+        self._pid = None
+        self._pool = None
+
+    def _get_pool(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._pool = self._pool_class(
+                        self.url, min_size=self.min_size, max_size=self.max_size,
+                        timeout=DB_BUSY_TIMEOUT_MS / 1000, open=True,
+                    )
+                    self._pid = os.getpid()
+        return self._pool
+
+    @contextmanager
+    def connection(self):
+        with self._get_pool().connection() as conn:
+            yield _PgConnection(conn)
+
+    def pool_stats(self) -> dict:
+        stats = self._get_pool().get_stats()
+        return {
+            "hits": max(0, stats.get("requests_num", 0) - stats.get("connections_num", 0)),
+            "misses": stats.get("connections_num", 0),
+            "waits": stats.get("requests_queued", 0),
+            "wait_seconds": stats.get("requests_wait_ms", 0) / 1000,
+            "discarded": stats.get("returns_bad", 0),
+            "size": self.max_size,
+            "idle": stats.get("pool_available", 0),
+        }
+
+    def table_columns(self, conn, table: str) -> set:
+        rows = conn.execute(
+            "SELECT column_name FROM information_schema.columns WHERE table_schema = current_schema() AND table_name = ?",
+            (table,),
+        ).fetchall()
+        return {r[0] for r in rows}
+
+    def migrate(self):
+        # a dedicated connection, so a pre-forking master never opens the pool
+        started = time.perf_counter()
+        with self._psycopg.connect(self.url) as raw:
+            conn = _PgConnection(raw)
+            # workers starting together take turns; later ones find nothing to do
+            conn.execute("SELECT pg_advisory_xact_lock(?)", (PG_MIGRATION_LOCK,))
+            self.migrate_shared(conn)
+            for name, target in COMPLAINT_INDEXES.items():
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+            for stmt in PG_SEARCH_SCHEMA:
+                conn.execute(stmt)
+            stats_missing = not self.table_columns(conn, "complaint_stats")
+            # creating the trigger blocks writes to complaints until commit, so the backfill misses none
+            for stmt in PG_STATS_SCHEMA:
+                conn.execute(stmt)
+            if stats_missing:
+                conn.execute(f"INSERT INTO complaint_stats ({STATS_CELL}, n) {PG_STATS_FROM_COMPLAINTS}")
+        # every statement is IF NOT EXISTS, so this re-checks rather than tracks versions
+        return [("postgres schema", time.perf_counter() - started)]
+
+    def get_by_id(self, cid):
+        with self.connection() as conn:
+            return conn.execute(f"SELECT {COMPLAINT_COLUMNS} FROM complaints WHERE id=?", (cid,)).fetchone()
+
+    def get_version(self, cid):
+        with self.connection() as conn:
+            return conn.execute("SELECT version, updated_at FROM complaints WHERE id=?", (cid,)).fetchone()
+
+    def get_with_version(self, cid):
+        with self.connection() as conn:
+            row = conn.execute(f"SELECT {COMPLAINT_COLUMNS}, version, updated_at FROM complaints WHERE id=?", (cid,)).fetchone()
+        return (row[:-2], *row[-2:]) if row else (None, None, None)
+
+    def get_user_version(self, mobile):
+        with self.connection() as conn:
+            return conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(version), 0), MAX(updated_at) FROM complaints WHERE mobile=?", (mobile,)
+            ).fetchone()
+
+    def find_complaints_by_mobile(self, mobile):
+        with self.connection() as conn:
+            return conn.execute(
+                f"SELECT {COMPLAINT_COLUMNS} FROM complaints WHERE mobile=? ORDER BY created_at DESC", (mobile,)
+            ).fetchall()
+
+    def complaint_pages(self, filters, batch_size: int, evidence: bool = False):
+        clauses, params = _complaint_filter_clauses(filters)
+        query = f"SELECT {COMPLAINT_COLUMNS} FROM complaints"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY created_at DESC, id DESC"
+        if METRICS_ENABLED:
+            _trace_statement(query)
+        with self.connection() as conn:
+            # a named cursor lives on the server and is fetched a page at a time; the
+            # evidence is read on the same connection, in the cursor's transaction
+            with conn.raw.cursor(name="complaint_pages") as cur:
+                cur.execute(query.replace("?", "%s"), params)
+                while rows := cur.fetchmany(batch_size):
+                    yield rows, list_evidence([r[0] for r in rows], conn) if evidence else {}
+
+    def _search_where(self, query: str, filters):
+        clauses, params = _complaint_filter_clauses(filters)
+        clauses.insert(0, "search_tsv @@ to_tsquery('simple', ?)")
+        params.insert(0, query)
+        return " AND ".join(clauses), params
+
+    def search_complaints(self, text: str, filters, limit: int, offset: int):
+        query = pg_tsquery(text)
+        if query is None:
+            return []
+        where, params = self._search_where(query, filters)
+        sql = (f"SELECT {COMPLAINT_COLUMNS} FROM complaints WHERE {where} "
+               f"ORDER BY ts_rank(search_tsv, to_tsquery('simple', ?)) DESC, created_at DESC LIMIT ? OFFSET ?")
+        with self.connection() as conn:
+            return conn.execute(sql, (*params, query, limit, offset)).fetchall()
+
+    def count_search_matches(self, text: str, filters) -> int:
+        query = pg_tsquery(text)
+        if query is None:
+            return 0
+        where, params = self._search_where(query, filters)
+        with self.connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM complaints WHERE {where}", tuple(params)).fetchone()[0]
+
+    def submit_complaint(self, complaint: dict):
+        with self.connection() as conn:
+            # held until commit, so two submissions from one mobile can't both pass the quota check
+            conn.execute("SELECT pg_advisory_xact_lock(hashtext(?))", (complaint['mobile'],))
+            _insert_within_quota(conn, complaint)
+
+    def lock_change_log(self, conn):
+        # identity values are handed out before commit; without this a reader
+        # could see seq 8 commit, move past it, and never see seq 7
+        conn.execute("SELECT pg_advisory_xact_lock(?)", (PG_CHANGE_LOG_LOCK,))
+
+
+def require_sqlite(command: str):
+    if store.name != "sqlite":
+        raise click.UsageError(f"{command} only applies to the SQLite backend")
+
+
+store = PostgresStore(DATABASE_URL, PG_POOL_MIN, PG_POOL_MAX) if DATABASE_URL else SqliteStore(db_pool)
+
+
+@app.cli.command("migrate-db")
+def migrate_db_command():
+    """Apply pending schema migrations.
+
+    For deploys that start workers some other way than gunicorn.conf.py;
+    run it with MIGRATE_ON_IMPORT=0 so importing the app doesn't migrate first.
+    """
+    applied = init_db()
+    for name, seconds in applied:
+        click.echo(f"applied {name} ({seconds:.2f}s)")
+    if not applied:
+        click.echo("schema is up to date")
+
+
+# ---------- Archive ----------
+ARCHIVE_AFTER_DAYS = int(os.environ.get("ARCHIVE_AFTER_DAYS", 365))
+ARCHIVE_STATUSES = ("Resolved", "Rejected")
+ARCHIVE_COLUMNS = f"{COMPLAINT_COLUMNS},version,updated_at"
+
+
+def archive_complaints(days: int = ARCHIVE_AFTER_DAYS, batch_size: int = 1000, progress=None) -> int:
+    """Move Resolved/Rejected complaints untouched for ``days`` into the archive.
+
+    Each batch is copied in one transaction and removed from the hot table in
+    a second (``_drop_archived_copies``), which only deletes rows still equal
+    to their copy, so an update landing in between keeps its complaint hot.
+    In WAL mode a transaction spanning attached databases is only atomic per
+    file, so this order means a crash can leave a row in both (the next run
+    copies it again and finishes the move) but never in neither.
+    """
+    cutoff = db_timestamp(datetime.now() - timedelta(days=days))
+    placeholders = ",".join("?" * len(ARCHIVE_STATUSES))
+    moved, last_rowid = 0, 0
+    while True:
+        with get_conn() as conn:
+            rows = conn.execute(
+                f"SELECT rowid, id FROM main.complaints WHERE rowid > ? AND status IN ({placeholders}) "
+                f"AND coalesce(updated_at, created_at) < ? ORDER BY rowid LIMIT ?",
+                (last_rowid, *ARCHIVE_STATUSES, cutoff, batch_size),
+            ).fetchall()
+            if not rows:
+                break
+            last_rowid = rows[-1][0]
+            ids = [r[1] for r in rows]
+            marks = ",".join("?" * len(ids))
+            # REPLACE: a copy left by an interrupted run may predate later updates
+            conn.execute(
+                f"INSERT OR REPLACE INTO archive.complaints ({ARCHIVE_COLUMNS}, archived_at) "
+                f"SELECT {ARCHIVE_COLUMNS}, ? FROM main.complaints WHERE id IN ({marks})",
+                (db_timestamp(datetime.now()), *ids),
+            )
+        moved += _drop_archived_copies(ids, cutoff)
+        if progress:
+            progress(moved)
+    return moved
+
+
+def _drop_archived_copies(ids: list, cutoff: str) -> int:
+    """Delete the hot rows among ``ids`` whose archive copy is current.
+
+    A row counts as archived only while it is still closed, still older than
+    ``cutoff`` and at the version that was copied; any other copy is dropped,
+    since the hot row has moved on. The statistics delete trigger is offset in
+    the same transaction, so archived rows keep their counts.
+    """
+    marks = ",".join("?" * len(ids))
+    placeholders = ",".join("?" * len(ARCHIVE_STATUSES))
+    archived = (
+        f"id IN ({marks}) AND status IN ({placeholders}) AND coalesce(updated_at, created_at) < ? "
+        f"AND (id, version) IN (SELECT id, version FROM archive.complaints WHERE id IN ({marks}))"
+    )
+    params = (*ids, *ARCHIVE_STATUSES, cutoff, *ids)
+    with get_conn() as conn:
+        conn.execute(
+            f"INSERT INTO complaint_stats ({STATS_CELL}, n) "
+            f"SELECT {_stats_key('c')}, COUNT(*) FROM main.complaints c WHERE {archived} GROUP BY 1, 2, 3, 4, 5 "
+            f"ON CONFLICT ({STATS_CELL}) DO UPDATE SET n = complaint_stats.n + excluded.n",
+            params,
+        )
+        moved = conn.execute(f"DELETE FROM main.complaints WHERE {archived}", params).rowcount
+        conn.execute(
+            f"DELETE FROM archive.complaints WHERE id IN ({marks}) "
+            f"AND id IN (SELECT id FROM main.complaints WHERE id IN ({marks}))",
+            (*ids, *ids),
+        )
+    return moved
+
+
+@app.cli.command("archive-complaints")
+@click.option("--days", type=int, default=ARCHIVE_AFTER_DAYS, show_default=True,
+              help="Archive Resolved/Rejected complaints not updated for this many days")
+@click.option("--batch-size", type=int, default=1000, show_default=True)
+@click.option("--vacuum", is_flag=True, help="Compact the hot database afterwards")
+def archive_complaints_command(days, batch_size, vacuum):
+    """Move old closed complaints from the hot table into the archive database."""
+    require_sqlite("archive-complaints")
+    if days < 1:
+        raise click.BadParameter("must be at least 1", param_hint="--days")
+    started = time.perf_counter()
+    moved = archive_complaints(days, batch_size, progress=lambda n: click.echo(f"{n} archived"))
+    elapsed = time.perf_counter() - started
+    click.echo(f"{moved} complaints moved to {ARCHIVE_DB_PATH} in {elapsed:.1f}s "
+               f"({moved / elapsed if elapsed else 0:.0f} rows/s)")
+    with get_conn() as conn:
+        conn.execute("PRAGMA main.optimize")
+        if vacuum:
+            conn.execute("VACUUM main")
+            click.echo("hot database compacted")
+
+
+# ---------- PDF cache ----------
+PDF_CACHE_MAX_BYTES = int(os.environ.get("PDF_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+PDF_CACHE_DIR = os.environ.get("PDF_CACHE_DIR") or None
+# Bump when the petition layout changes so cached PDFs and client ETags expire.
+PDF_LAYOUT_VERSION = 1
+
+
+class PdfCache:
+    """Rendered petitions keyed on (complaint id, row version).
+
+    A byte-bounded in-memory LRU per worker, optionally backed by a directory
+    shared by all gunicorn workers. A version bump makes older entries
+    unreachable; the disk tier also deletes them when the new one is written.
+    """
+
+    def __init__(self, max_bytes: int, disk_dir: str | None = None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_prefix(self, cid: str) -> str:
+        return os.path.join(self.disk_dir, hashlib.sha1(cid.encode()).hexdigest())
+
+    def get(self, cid: str, version: int):
+        key = (cid, version)
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                return data
+        if not self.disk_dir:
+            return None
+        try:
+            with open(f"{self._disk_prefix(cid)}-v{version}-l{PDF_LAYOUT_VERSION}.pdf", "rb") as fh:
+                data = fh.read()
+        except OSError:
+            return None
+        self._remember(key, data)
+        return data
+
+    def put(self, cid: str, version: int, data: bytes):
+        self._remember((cid, version), data)
+        if not self.disk_dir:
+            return
+        prefix = self._disk_prefix(cid)
+        path = f"{prefix}-v{version}-l{PDF_LAYOUT_VERSION}.pdf"
+        fd, tmp = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            return
+        for stale in glob.glob(f"{prefix}-v*.pdf"):
+            if stale != path:
+                try:
+                    os.unlink(stale)
+                except OSError:
+                    pass
+
+    def _remember(self, key, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+
+pdf_cache = PdfCache(PDF_CACHE_MAX_BYTES, PDF_CACHE_DIR)
+
+
+# ---------- Password hashing ----------
+# any werkzeug method string, e.g. "scrypt:32768:8:1" or "pbkdf2:sha256:600000"
+PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+HASH_WORKERS = int(os.environ.get("HASH_WORKERS", os.cpu_count() or 2))
+HASH_QUEUE_MAX = int(os.environ.get("HASH_QUEUE_MAX", 16))
+HASH_TIMEOUT = float(os.environ.get("HASH_TIMEOUT", 10))
+
+
+class HasherBusy(Exception):
+    pass
+
+
+class PasswordHasher:
+    """Runs password KDFs on a small thread pool with a bounded backlog.
+
+    hashlib's scrypt and pbkdf2 release the GIL, so the pool hashes on
+    several cores while request threads only wait on the result. At most
+    ``workers + max_pending`` hashes are in flight per process; beyond that
+    ``HasherBusy`` is raised at once instead of letting logins queue up
+    behind a burst, and also when a hash takes longer than ``timeout``.
+    """
+
+    def __init__(self, method: str = PASSWORD_HASH_METHOD, workers: int = HASH_WORKERS,
+                 max_pending: int = HASH_QUEUE_MAX, timeout: float = HASH_TIMEOUT):
+        self.method = method
+        self.workers = workers
+        self.timeout = timeout
+        self._prefix = None
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pwhash")
+                self._pid = os.getpid()
+            return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy("Server busy. Please try again in a moment.")
+        try:
+            future = self._pool().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # a hash still queued is dropped; one already running keeps its slot until it ends
+            future.cancel()
+            raise HasherBusy("Server busy. Please try again in a moment.") from None
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        if self._prefix is None:
+            # werkzeug fills in default parameters ("scrypt" -> "scrypt:32768:8:1"),
+            # so compare against what this method actually produces; that takes
+            # a full hash, made on the pool like any other
+            self._prefix = self._run(generate_password_hash, "", self.method).split("$", 1)[0]
+        return password_hash.split("$", 1)[0] != self._prefix
+
+
+password_hasher = PasswordHasher()
+
+
+# ---------- Login throttling ----------
+LOGIN_WINDOW_SECONDS = int(os.environ.get("LOGIN_WINDOW_SECONDS", 900))
+LOGIN_MAX_FAILURES = int(os.environ.get("LOGIN_MAX_FAILURES", 5))
+LOGIN_IP_MAX_FAILURES = int(os.environ.get("LOGIN_IP_MAX_FAILURES", 20))
+LOGIN_ACCOUNT_MAX_FAILURES = int(os.environ.get("LOGIN_ACCOUNT_MAX_FAILURES", 50))
+OFFICER_MAX_FAILURES = int(os.environ.get("OFFICER_MAX_FAILURES", 5))
+RATE_LIMIT_SHARED = os.environ.get("RATE_LIMIT_SHARED", "1") == "1"
+
+
+class SlidingWindowLimiter:
+    """Failure counter over a sliding window, approximated with two buckets.
+
+    The estimate is ``current + previous * (unelapsed share of the window)``.
+    Each worker keeps (bucket, current, previous) per key in memory and
+    rejects from that alone once a key is over the limit. Counts are shared
+    across gunicorn workers through the ``rate_limits`` table unless
+    RATE_LIMIT_SHARED=0.
+    """
+
+    MAX_LOCAL_KEYS = 50000
+
+    def __init__(self, name: str, limit: int, window: int, shared: bool = RATE_LIMIT_SHARED):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.shared = shared
+        self._local = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+
+    def _estimate(self, entry, now: float) -> float:
+        bucket = int(now // self.window)
+        current, previous = 0, 0
+        if entry:
+            if entry[0] == bucket:
+                current, previous = entry[1], entry[2]
+            elif entry[0] == bucket - 1:
+                previous = entry[1]
+        elapsed = (now % self.window) / self.window
+        return current + previous * (1 - elapsed)
+
+    def _load(self, key: str, bucket: int):
+        with get_conn() as conn:
+            counts = dict(conn.execute(
+                "SELECT bucket, n FROM rate_limits WHERE key=? AND bucket IN (?, ?)",
+                (f"{self.name}:{key}", bucket, bucket - 1),
+            ).fetchall())
+        return (bucket, counts.get(bucket, 0), counts.get(bucket - 1, 0))
+
+    def blocked(self, key: str) -> bool:
+        if not self.limit or not key:
+            return False
+        now = time.time()
+        entry = self._local.get(key)
+        if self._estimate(entry, now) >= self.limit:
+            return True
+        if not self.shared:
+            return False
+        # another worker may have seen failures this one hasn't
+        entry = self._load(key, int(now // self.window))
+        self._remember(key, entry)
+        return self._estimate(entry, now) >= self.limit
+
+    def hit(self, key: str):
+        if not self.limit or not key:
+            return
+        now = time.time()
+        bucket = int(now // self.window)
+        if self.shared:
+            with get_conn() as conn:
+                current = conn.execute(
+                    "INSERT INTO rate_limits (key, bucket, n) VALUES (?, ?, 1) "
+                    "ON CONFLICT (key, bucket) DO UPDATE SET n = rate_limits.n + 1 RETURNING n",
+                    (f"{self.name}:{key}", bucket),
+                ).fetchone()[0]
+                previous = conn.execute(
+                    "SELECT n FROM rate_limits WHERE key=? AND bucket=?", (f"{self.name}:{key}", bucket - 1)
+                ).fetchone()
+                self._hits += 1
+                if self._hits % 1000 == 0:
+                    conn.execute("DELETE FROM rate_limits WHERE bucket < ?", (bucket - 1,))
+            self._remember(key, (bucket, current, previous[0] if previous else 0))
+            return
+        with self._lock:
+            entry = self._local.get(key)
+            if entry and entry[0] == bucket:
+                entry = (bucket, entry[1] + 1, entry[2])
+            elif entry and entry[0] == bucket - 1:
+                entry = (bucket, 1, entry[1])
+            else:
+                entry = (bucket, 1, 0)
+        self._remember(key, entry)
+
+    def reset(self, key: str):
+        self._local.pop(key, None)
+        if self.shared and key:
+            with get_conn() as conn:
+                conn.execute("DELETE FROM rate_limits WHERE key=?", (f"{self.name}:{key}",))
+
+    def _remember(self, key: str, entry):
+        with self._lock:
+            if len(self._local) >= self.MAX_LOCAL_KEYS:
+                stale = int(time.time() // self.window) - 1
+                self._local = {k: v for k, v in self._local.items() if v[0] >= stale}
+                if len(self._local) >= self.MAX_LOCAL_KEYS:
+                    self._local.clear()
+            self._local[key] = entry
+
+
+# keyed by mobile and address, so failures from elsewhere can't lock the owner out
+login_mobile_limiter = SlidingWindowLimiter("login-mobile", LOGIN_MAX_FAILURES, LOGIN_WINDOW_SECONDS)
+# by mobile alone, so guesses spread over many addresses still run out; set well
+# above LOGIN_MAX_FAILURES, since reaching it locks the owner out too
+login_account_limiter = SlidingWindowLimiter("login-account", LOGIN_ACCOUNT_MAX_FAILURES, LOGIN_WINDOW_SECONDS)
+login_ip_limiter = SlidingWindowLimiter("login-ip", LOGIN_IP_MAX_FAILURES, LOGIN_WINDOW_SECONDS)
+officer_ip_limiter = SlidingWindowLimiter("officer-ip", OFFICER_MAX_FAILURES, LOGIN_WINDOW_SECONDS)
+
+
+def login_key(mobile: str, ip: str | None) -> str:
+    return f"{mobile}@{ip}" if mobile else ""
+
+
+# ---------- Change feed ----------
+# complaint_changes gets a row in the same transaction as every petition
+# insert and officer status/response change (bulk imports excepted).
+# /officer/events streams it to open officer panels as server-sent events.
+# Each worker has one poller thread reading the log for all of its streams.
+CHANGE_POLL_SECONDS = float(os.environ.get("CHANGE_POLL_SECONDS", 1))
+CHANGE_LOG_DAYS = int(os.environ.get("CHANGE_LOG_DAYS", 7))
+CHANGE_BATCH = 500
+CHANGE_BACKLOG = 2000
+CHANGE_RESUME_MAX = 1000
+EVENTS_MAX_STREAMS = int(os.environ.get("EVENTS_MAX_STREAMS", 4))
+EVENTS_STREAM_SECONDS = int(os.environ.get("EVENTS_STREAM_SECONDS", 300))
+EVENTS_HEARTBEAT_SECONDS = 15
+EVENTS_QUEUE_MAX = 1000
+CHANGE_COLUMNS = ", ".join(f"c.{col}" for col in COMPLAINT_COLUMNS.split(","))
+SSE_RESET = "event: reset\ndata: {}\n\n"
+
+
+@timed_db
+def change_log_bounds():
+    """(oldest, newest) seq in the change log, 0 for an empty log."""
+    with get_conn() as conn:
+        row = conn.execute("SELECT MIN(seq), MAX(seq) FROM complaint_changes").fetchone()
+    return row[0] or 0, row[1] or 0
+
+
+@timed_db
+def read_changes(after: int, limit: int, upto: int | None = None) -> list:
+    """Log entries after ``after`` with their complaint's current row (None once archived)."""
+    fields = COMPLAINT_COLUMNS.split(",")
+    with get_conn() as conn:
+        rows = conn.execute(
+            f"SELECT l.seq, l.kind, l.prev_status, {CHANGE_COLUMNS} FROM complaint_changes l "
+            f"LEFT JOIN complaints c ON c.id = l.complaint_id "
+            f"WHERE l.seq > ? AND l.seq <= ? ORDER BY l.seq LIMIT ?",
+            (after, upto if upto is not None else 2**62, limit),
+        ).fetchall()
+    events = [
+        {"seq": r[0], "kind": r[1], "prev_status": r[2], "row": dict(zip(fields, r[3:])) if r[3] else None}
+        for r in rows
+    ]
+    # attachments only change with the insert, so only new rows carry them;
+    # so do duplicates, which are matched in the same transaction
+    new_ids = {e["row"]["id"] for e in events if e["kind"] == "new" and e["row"]}
+    files, dups = list_evidence(new_ids), list_duplicates(new_ids)
+    for e in events:
+        if e["kind"] == "new" and e["row"]:
+            e["evidence"] = [{"sha256": f[0], "filename": f[1], "size": f[3]} for f in files.get(e["row"]["id"], ())]
+            e["duplicates"] = [{"id": d, "similarity": sim} for d, sim in dups.get(e["row"]["id"], ())]
+    return events
+
+
+def prune_change_log(days: int = CHANGE_LOG_DAYS) -> int:
+    with get_conn() as conn:
+        return conn.execute(
+            "DELETE FROM complaint_changes WHERE changed_at < ?",
+            (db_timestamp(datetime.now() - timedelta(days=days)),),
+        ).rowcount
+
+
+def change_matches(event: dict, filters: dict) -> bool:
+    """Whether an officer panel with these filters shows the row, before or after the change."""
+    row = event["row"]
+    if row is None:
+        return False
+    for key in ("taluk", "firka", "village"):
+        if filters.get(key) and row[key] != filters[key]:
+            return False
+    # a row that just left the panel's status still goes out, so the panel drops it
+    if filters.get("status") and filters["status"] not in (row["status"], event["prev_status"]):
+        return False
+    if filters.get("from_date") and row["created_at"] < filters["from_date"] + "T00:00:00":
+        return False
+    if filters.get("to_date") and row["created_at"] > filters["to_date"] + "T23:59:59.999999":
+        return False
+    return True
+
+
+def _sse_change(event: dict) -> str:
+    data = json.dumps({"kind": event["kind"], "prev_status": event["prev_status"], "row": event["row"],
+                       "evidence": event.get("evidence", []), "duplicates": event.get("duplicates", [])},
+                      ensure_ascii=False)
+    return f"id: {event['seq']}\nevent: change\ndata: {data}\n\n"
+
+
+class _EventStream:
+    __slots__ = ("filters", "after", "queue")
+
+    def __init__(self, filters: dict, after: int):
+        self.filters = filters
+        # the client has every entry up to here
+        self.after = after
+        self.queue = queue.Queue()
+
+
+class ChangeFeed:
+    """One poller per worker fanning change-log entries out to SSE streams.
+
+    The thread starts with the first stream and sleeps while none are
+    open, so the DB sees one poll per interval however many officers
+    watch. The latest entries stay in memory and a reconnect with
+    Last-Event-ID resumes from them. Older positions are read from the log
+    once, and ones that have been pruned get a "reset" event.
+    """
+
+    def __init__(self, interval: float, backlog: int):
+        self.interval = interval
+        self.backlog = backlog
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._wake = threading.Condition(self._lock)
+        self._streams = set()
+        self._recent = deque(maxlen=self.backlog)
+        self._last_seq = None
+        self._thread = None
+        self._poked = False
+        self._next_prune = 0.0
+
+    def _mine(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._reset()
+
+    def stream_count(self) -> int:
+        self._mine()
+        return len(self._streams)
+
+    def open(self, filters: dict, since: int | None):
+        """Register a stream; returns it and the SSE text it missed since ``since``.
+
+        The missed text is None when that position is too old to resume, and
+        the stream itself is None when the worker is at EVENTS_MAX_STREAMS.
+        """
+        self._mine()
+        # read outside the lock, which poke() and the poller take on every write;
+        # a poll landing meanwhile is re-read from this head, never skipped
+        head = change_log_bounds()[1]
+        with self._lock:
+            if len(self._streams) >= EVENTS_MAX_STREAMS:
+                return None, None
+            if not self._streams:
+                # the poller slept while no stream was open; start from the log's head again
+                if head != self._last_seq:
+                    self._recent.clear()
+                    self._last_seq = head
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="change-feed", daemon=True)
+                self._thread.start()
+            upto = self._last_seq
+            stream = _EventStream(filters, upto if since is None else since)
+            self._streams.add(stream)
+            self._wake.notify()
+            if since is None or since >= upto:
+                return stream, []
+            if self._recent and since >= self._recent[0]["seq"] - 1:
+                missed = [e for e in self._recent if e["seq"] > since]
+                return stream, [_sse_change(e) for e in missed if change_matches(e, filters)]
+        # later entries reach the stream's queue through the poller
+        oldest, _ = change_log_bounds()
+        missed = read_changes(since, CHANGE_RESUME_MAX + 1, upto)
+        if since < oldest - 1 or len(missed) > CHANGE_RESUME_MAX:
+            return stream, None
+        return stream, [_sse_change(e) for e in missed if change_matches(e, filters)]
+
+    def close(self, stream):
+        with self._lock:
+            self._streams.discard(stream)
+
+    def poke(self):
+        """Poll now instead of at the next interval; called after this worker commits a change."""
+        if self._pid == os.getpid() and self._streams:
+            with self._lock:
+                self._poked = True
+                self._wake.notify()
+
+    def _publish(self, events: list):
+        with self._lock:
+            # a poll that began before open() moved the head on
+            events = [e for e in events if e["seq"] > self._last_seq]
+            if not events:
+                return
+            for stream in list(self._streams):
+                fresh = [e for e in events if e["seq"] > stream.after]
+                if not fresh:
+                    continue
+                matched = [_sse_change(e) for e in fresh if change_matches(e, stream.filters)]
+                if stream.queue.qsize() + len(matched) > EVENTS_QUEUE_MAX:
+                    # a stream this far behind starts over
+                    self._streams.discard(stream)
+                    stream.queue.put(None)
+                    continue
+                for text in matched:
+                    stream.queue.put(text)
+                if not matched:
+                    # moves the client's Last-Event-ID past entries it didn't want
+                    stream.queue.put(f"id: {fresh[-1]['seq']}\n\n")
+            self._recent.extend(events)
+            self._last_seq = events[-1]["seq"]
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._streams:
+                    self._wake.wait()
+                self._poked = False
+                after = self._last_seq
+            try:
+                events = read_changes(after, CHANGE_BATCH)
+                metrics.inc("change_feed_polls_total")
+                if events:
+                    self._publish(events)
+                if time.monotonic() >= self._next_prune:
+                    prune_change_log()
+                    self._next_prune = time.monotonic() + 3600
+            except Exception:
+                app.logger.exception("change feed poll failed")
+                events = []
+            if len(events) < CHANGE_BATCH:
+                with self._lock:
+                    # changes committed by other workers show up within the interval
+                    if not self._poked:
+                        self._wake.wait(self.interval)
+
+
+change_feed = ChangeFeed(CHANGE_POLL_SECONDS, CHANGE_BACKLOG)
+
+
+def _event_stream(stream, missed: list | None, seconds: float):
+    deadline = time.monotonic() + seconds
+    try:
+        yield f"retry: {int(CHANGE_POLL_SECONDS * 1000) + 2000}\n\n"
+        if missed is None:
+            yield SSE_RESET
+            return
+        yield from missed
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # the browser reconnects with Last-Event-ID
+                return
+            try:
+                text = stream.queue.get(timeout=min(remaining, EVENTS_HEARTBEAT_SECONDS))
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            if text is None:
+                yield SSE_RESET
+                return
+            yield text
+    finally:
+        change_feed.close(stream)
+
+
+# ---------- Routes ----------
+@app.route("/")
+def index():
+    user_mobile = session.get("user_mobile")
+    etag = last_modified = None
+    # a page carrying flashed messages is shown once, so it gets no validators
+    if not session.get("_flashes"):
+        count, versions, updated_at = get_user_version(user_mobile) if user_mobile else (0, 0, None)
+        etag = _page_etag("index", user_mobile, count, versions, updated_at)
+        last_modified = _http_time(updated_at)
+        if _not_modified(etag, last_modified):
+            return _with_validators(make_response("", 304), etag, last_modified)
+    my_complaints = []
+    if user_mobile:
+        my_complaints = find_complaints_by_mobile(user_mobile)
+    resp = make_response(render_template(
+        "index.html", user_mobile=user_mobile, my_complaints=my_complaints, status_colors=STATUS_COLORS,
+        evidence_accept=EVIDENCE_ACCEPT, evidence_max_files=EVIDENCE_MAX_FILES,
+        evidence_max_mb=EVIDENCE_MAX_BYTES // 2**20))
+    return _with_validators(resp, etag, last_modified) if etag else resp
+
+
+LOCATIONS_MAX_AGE = int(os.environ.get("LOCATIONS_MAX_AGE", 3600))
+
+
+def _serve_static_json(payload, immutable: bool = False):
+    gzipped = 'gzip' in request.accept_encodings
+    # each encoding is its own representation, so each gets its own strong tag
+    etag = payload["etag"] + ("-gz" if gzipped else "")
+    if request.if_none_match.contains(payload["etag"]) or request.if_none_match.contains(payload["etag"] + "-gz"):
+        resp = make_response("", 304)
+    else:
+        resp = Response(payload["gzip"] if gzipped else payload["body"], mimetype="application/json")
+        if gzipped:
+            resp.headers['Content-Encoding'] = 'gzip'
+    resp.set_etag(etag)
+    resp.vary.add('Accept-Encoding')
+    if immutable:
+        resp.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        resp.headers['Cache-Control'] = f'public, max-age={LOCATIONS_MAX_AGE}'
+    return resp
+
+
+@app.route("/locations")
+def get_locations():
+    # pages request /locations?v=<etag>; that URL changes whenever the data does
+    return _serve_static_json(LOCATIONS_PAYLOAD, immutable=request.args.get('v') == LOCATIONS_PAYLOAD["etag"])
+
+
+@app.route("/locations/<taluk>")
+def get_taluk_locations(taluk: str):
+    payload = TALUK_PAYLOADS.get(taluk)
+    if payload is None:
+        return jsonify({"status":"error","message":"unknown taluk"}), 404
+    return _serve_static_json(payload)
+
+
+@app.route("/register", methods=["GET", "POST"])
+def register():
+    if request.method == "GET":
+        return render_template("register.html")
+    mobile = request.form.get("mobile", "").strip()
+    password = request.form.get("password", "")
+    if not mobile or not password:
+        flash("Mobile and password are required")
+        return redirect(url_for("register"))
+    try:
+        created = create_user(mobile, password)
+    except HasherBusy as exc:
+        flash(str(exc))
+        return render_template("register.html"), 503
+    if created:
+        flash("Registration successful. Please login.")
+        return redirect(url_for("login"))
+    else:
+        flash("Mobile already registered")
+        return redirect(url_for("register"))
+
+
+@app.route("/login", methods=["GET", "POST"])
+def login():
+    if request.method == "GET":
+        return render_template("login.html")
+    mobile = request.form.get("mobile", "").strip()
+    password = request.form.get("password", "")
+    ip = request.remote_addr
+    key = login_key(mobile, ip)
+    # throttle before the user lookup and the (deliberately slow) hash check
+    if login_mobile_limiter.blocked(key) or login_account_limiter.blocked(mobile) or login_ip_limiter.blocked(ip):
+        flash("Too many failed attempts. Please try again later.")
+        return render_template("login.html"), 429
+    row = get_user(mobile)
+    try:
+        ok = bool(row) and password_hasher.verify(row[1], password)
+    except HasherBusy as exc:
+        flash(str(exc))
+        return render_template("login.html"), 503
+    if not ok:
+        login_mobile_limiter.hit(key)
+        login_account_limiter.hit(mobile)
+        login_ip_limiter.hit(ip)
+        flash("Invalid credentials")
+        return redirect(url_for("login"))
+    # upgrade hashes made with an older method or cost while we have the password;
+    # under load this just waits for a later login
+    try:
+        if password_hasher.needs_rehash(row[1]):
+            update_password_hash(mobile, row[1], password_hasher.hash(password))
+    except HasherBusy:
+        pass
+    login_mobile_limiter.reset(key)
+    session["user_mobile"] = mobile
+    flash("Logged in successfully")
+    return redirect(url_for("index"))
+
+
+@app.route("/logout")
+def logout():
+    session.pop("user_mobile", None)
+    return redirect(url_for("index"))
+
+
+@app.route("/submit", methods=["POST"])
+def submit():
+    user_mobile = session.get("user_mobile")
+    if not user_mobile:
+        return jsonify({"status": "error", "message": "Login required."}), 401
+    try:
+        # parsing the body streams the attachments to disk
+        uploads = [f for f in request.files.getlist("evidence") if f.filename]
+    except RequestEntityTooLarge:
+        return jsonify({"status":"error","message":f"Attachments are limited to {EVIDENCE_MAX_FILES} files of {EVIDENCE_MAX_BYTES // 2**20} MB each."}), 413
+    petitioner_name = request.form.get("petitioner_name", "").strip()
+    petitioner_dob = request.form.get("petitioner_dob", "").strip()
+    taluk = request.form.get("taluk")
+    firka = request.form.get("firka")
+    village = request.form.get("village")
+    description = request.form.get("description", "").strip()
+
+    if not petitioner_name or not petitioner_dob or not taluk or not firka or not village or not description:
+        return jsonify({"status":"error","message":"All fields required."}), 400
+    if not is_valid_location(taluk, firka, village):
+        return jsonify({"status":"error","message":"Invalid location."}), 400
+    problem = check_evidence(uploads)
+    if problem:
+        return jsonify({"status":"error","message":problem}), 400
+
+    now = datetime.now()
+    complaint = {
+        "mobile": user_mobile,
+        "petitioner_name": petitioner_name,
+        "petitioner_dob": petitioner_dob,
+        "taluk": taluk,
+        "firka": firka,
+        "village": village,
+        "description": description,
+        "response_text": None,
+        "status": "Pending",
+        "created_at": db_timestamp(now),
+        "evidence": [store_evidence(f) for f in uploads],
     }
-    insert_complaint(complaint)
+    # quotas are checked and charged atomically with the insert
+    try:
+        cid = submit_complaint(complaint)
+    except QuotaExceeded as exc:
+        return jsonify({"status":"error","message":str(exc)}), 429
+    except SubmitBusy as exc:
+        return jsonify({"status":"error","message":str(exc)}), 503
     return jsonify({"status":"success","message":"Petition registered.","complaint_id": cid})
 
 
+# searches a session remembers, so the back button still reaches recent results
+TRACK_SESSION_KEYS = 5
+
+
 @app.route("/track", methods=["GET","POST"])
 def track():
     if request.method == "GET":
-        return render_template("track.html")
+        return _no_referrer(make_response(render_template("track.html")))
     key = request.form.get("key", "").strip()
-    result = None
     if not key:
         flash("Enter mobile number or petition ID.")
         return redirect(url_for("track"))
-    row = get_by_id(key)
-    if row:
-        result = [row]
+    # the mobile or id stays out of the URL, and so out of access logs, history and Referer;
+    # results live at a GET URL so browsers can revalidate them
+    token = secrets.token_urlsafe(9)
+    # a list, since the session serializer sorts dict keys
+    session["track"] = session.get("track", [])[-(TRACK_SESSION_KEYS - 1):] + [[token, key]]
+    return redirect(url_for("track_results", token=token), 303)
+
+
+@app.route("/track/<token>")
+def track_results(token: str):
+    key = dict(session.get("track", [])).get(token)
+    if not key:
+        flash("Search again.")
+        return redirect(url_for("track"))
+    etag = last_modified = None
+    cid = normalize_complaint_id(key)
+    meta = get_version(cid)
+    if meta:
+        version, updated_at = meta
+        etag = _page_etag("track", cid, version, updated_at)
     else:
-        rows = find_complaints_by_mobile(key)
-        result = rows
-    return render_template("track.html", results=result, status_colors=STATUS_COLORS)
+        count, versions, updated_at = get_user_version(key)
+        etag = _page_etag("track-mobile", key, count, versions, updated_at)
+    last_modified = _http_time(updated_at)
+    if not session.get("_flashes") and _not_modified(etag, last_modified):
+        return _no_referrer(_with_validators(make_response("", 304), etag, last_modified))
+    row = get_by_id(cid) if meta else None
+    result = [row] if row else find_complaints_by_mobile(key)
+    resp = _no_referrer(make_response(render_template("track.html", results=result, key=key, status_colors=STATUS_COLORS)))
+    if session.get("_flashes"):
+        return resp
+    return _with_validators(resp, etag, last_modified)
 
 
-@app.route("/petition/<cid>/download")
-def download_petition(cid: str):
-    row = get_by_id(cid)
-    if not row:
-        return "Not found", 404
-    # Build PDF in memory
-    buf = BytesIO()
-    p = canvas.Canvas(buf, pagesize=A4)
+def _no_referrer(resp):
+    resp.headers['Referrer-Policy'] = 'no-referrer'
+    return resp
+
+
+def _draw_petition(p, row, evidence=()):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+    from reportlab.lib.utils import simpleSplit
+
     width, height = A4
     left_margin = 1.5 * cm
     right_margin = 1.5 * cm
@@ -553,15 +3429,15 @@ def download_petition(cid: str):
     line(f"Mobile: {row[1]}")
     line(f"Petitioner Name: {row[2]}")
     line(f"DOB: {row[3]}")
-    line(f"Taluk: {row[5]}")
-    line(f"Firka: {row[6]}")
-    line(f"Village: {row[7]}")
+    line(f"Taluk: {row[4]}")
+    line(f"Firka: {row[5]}")
+    line(f"Village: {row[6]}")
 
     y -= 0.5 * cm
     p.setFont("Helvetica-Bold", 12)
     line("Description:")
     p.setFont("Helvetica", 10)
-    for para in (row[8] or "").split("\n"):
+    for para in (row[7] or "").split("\n"):
         wrapped = simpleSplit(para, "Helvetica", 10, max_width)
         for chunk in wrapped:
             line(chunk, 0.55 * cm)
@@ -570,7 +3446,7 @@ def download_petition(cid: str):
     p.setFont("Helvetica-Bold", 12)
     line("Officer Response:")
     p.setFont("Helvetica", 10)
-    for para in (row[9] or "").split("\n"):
+    for para in (row[8] or "").split("\n"):
         wrapped = simpleSplit(para, "Helvetica", 10, max_width)
         for chunk in wrapped:
             line(chunk, 0.55 * cm)
@@ -579,17 +3455,529 @@ def download_petition(cid: str):
     p.setFont("Helvetica-Bold", 12)
     line("Status & Timestamps:")
     p.setFont("Helvetica", 10)
-    line(f"Status: {row[10]}")
-    line(f"Created At: {row[11]}")
+    line(f"Status: {row[9]}")
+    line(f"Created At: {row[10]}")
+
+    if evidence:
+        y -= 0.5 * cm
+        p.setFont("Helvetica-Bold", 12)
+        line("Evidence:")
+        p.setFont("Helvetica", 10)
+        for n, (sha256, filename, content_type, size) in enumerate(evidence, 1):
+            line(f"{n}. {filename} ({content_type}, {max(1, round(size / 1024))} KB)", 0.5 * cm)
+            p.setFont("Helvetica", 8)
+            line(f"    SHA-256 {sha256}", 0.6 * cm)
+            p.setFont("Helvetica", 10)
 
     p.showPage()
+
+
+def render_petition_pdf(row, evidence=()) -> bytes:
+    return render_petitions_pdf([row], {row[0]: evidence})
+
+
+def render_petitions_pdf(rows, evidence: dict | None = None) -> bytes:
+    """One document with a page per petition; ``evidence`` is list_evidence() for the rows."""
+    # ReportLab costs ~25 ms of import; only workers that render a PDF pay it
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    buf = BytesIO()
+    p = canvas.Canvas(buf, pagesize=A4)
+    for row in rows:
+        _draw_petition(p, row, (evidence or {}).get(row[0], ()))
     p.save()
     pdf = buf.getvalue()
     buf.close()
+    return pdf
+
+
+def _http_time(ts: str | None):
+    # stored timestamps are naive local time; validators need an aware UTC value
+    if not ts:
+        return None
+    try:
+        return datetime.fromisoformat(ts).astimezone(timezone.utc).replace(microsecond=0)
+    except ValueError:
+        return None
+
+
+def _not_modified(etag: str, last_modified) -> bool:
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if last_modified and request.if_modified_since:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def _with_validators(resp, etag: str, last_modified, cache_control: str = 'private, no-cache'):
+    resp.set_etag(etag)
+    if last_modified:
+        resp.last_modified = last_modified
+    resp.headers['Cache-Control'] = cache_control
+    return resp
+
+
+def _pdf_etag(cid: str, version: int) -> str:
+    return hashlib.sha1(f"{cid}:{version}:{PDF_LAYOUT_VERSION}".encode()).hexdigest()[:20]
+
+
+@functools.lru_cache(maxsize=None)
+def _templates_digest() -> str:
+    # a deploy that changes templates or translations invalidates every page tag
+    digest = hashlib.sha1(json.dumps(I18N, sort_keys=True).encode())
+    for path in sorted(glob.glob(os.path.join(app.root_path, app.template_folder, "*.html"))):
+        with open(path, "rb") as fh:
+            digest.update(fh.read())
+    return digest.hexdigest()
+
+
+def _page_etag(page: str, *parts) -> str:
+    """Tag for an HTML page built from ``parts`` (who is asking and the data's versions)."""
+    key = ":".join(str(p) for p in (page, _templates_digest(), session.get("lang", "en"),
+                                      session.get("user_mobile"), *parts))
+    return hashlib.sha1(key.encode()).hexdigest()[:20]
+
+
+@app.route("/petition/<cid>/download")
+def download_petition(cid: str):
+    cid = normalize_complaint_id(cid)
+    meta = get_version(cid)
+    if not meta:
+        return "Not found", 404
+    version, updated_at = meta
+    last_modified = _http_time(updated_at)
+    if _not_modified(_pdf_etag(cid, version), last_modified):
+        metrics.inc("pdf_downloads_total", outcome="not_modified")
+        return _with_validators(make_response("", 304), _pdf_etag(cid, version), last_modified)
+    pdf = pdf_cache.get(cid, version)
+    if pdf is None:
+        # the complaint may have changed since the lookup above; the ETag and
+        # Last-Modified must both describe the copy that gets rendered
+        row, version, updated_at = get_with_version(cid)
+        if not row:
+            return "Not found", 404
+        last_modified = _http_time(updated_at)
+        started = time.perf_counter()
+        pdf = render_petition_pdf(row, list_evidence([cid]).get(cid, ()))
+        metrics.observe("pdf_render_seconds", time.perf_counter() - started)
+        metrics.inc("pdf_downloads_total", outcome="rendered")
+        pdf_cache.put(cid, version, pdf)
+    else:
+        metrics.inc("pdf_downloads_total", outcome="cached")
 
     resp = make_response(pdf)
     resp.headers['Content-Type'] = 'application/pdf'
     resp.headers['Content-Disposition'] = f"attachment; filename=petition-{cid}.pdf"
+    return _with_validators(resp, _pdf_etag(cid, version), last_modified)
+
+
+# ---------- Bulk petition rendering ----------
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", os.cpu_count() or 2))
+BULK_PDF_MAX_ROWS = int(os.environ.get("BULK_PDF_MAX_ROWS", 5000))
+BULK_PDF_CHUNK = 16
+
+_pdf_executor = None
+_pdf_executor_pid = None
+_pdf_executor_lock = threading.Lock()
+
+
+def pdf_process_pool(workers: int | None = None) -> ProcessPoolExecutor:
+    # spawn keeps children clear of locks held by the parent's other threads
+    return ProcessPoolExecutor(max_workers=workers or PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _shared_pdf_pool() -> ProcessPoolExecutor:
+    global _pdf_executor, _pdf_executor_pid
+    with _pdf_executor_lock:
+        if _pdf_executor is None or _pdf_executor_pid != os.getpid():
+            _pdf_executor = pdf_process_pool()
+            _pdf_executor_pid = os.getpid()
+        return _pdf_executor
+
+
+def _render_chunk(items):
+    return [render_petition_pdf(row, files) for row, files in items]
+
+
+def render_petition_files(items, pool: ProcessPoolExecutor, window: int = PDF_WORKERS * 2):
+    """Yield (row, pdf) in input order from (row, evidence files) pairs, rendering chunks across the pool.
+
+    Only ``window`` chunks are in flight at once, so ``items`` can be a lazy
+    iter_complaints_with_evidence() over any number of complaints.
+    """
+    items = iter(items)
+    in_flight = deque()
+
+    def submit_next():
+        chunk = list(islice(items, BULK_PDF_CHUNK))
+        if chunk:
+            in_flight.append((chunk, pool.submit(_render_chunk, chunk)))
+
+    for _ in range(max(2, window)):
+        submit_next()
+    while in_flight:
+        chunk, fut = in_flight.popleft()
+        submit_next()
+        yield from ((row, pdf) for (row, _), pdf in zip(chunk, fut.result()))
+
+
+class _StreamSink:
+    # write-only file object so ZipFile can emit bytes as each entry is added
+    def __init__(self):
+        self._chunks = []
+        self._pos = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._pos
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_petition_zip(rendered):
+    sink = _StreamSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for row, pdf in rendered:
+            zf.writestr(f"petition-{secure_filename(row[0]) or 'unnamed'}.pdf", pdf)
+            yield sink.drain()
+    yield sink.drain()
+
+
+@app.route("/officer/petitions/bundle")
+def officer_petition_bundle():
+    fmt = request.args.get('format', 'zip')
+    if fmt not in ('zip', 'pdf'):
+        return jsonify({"status":"error","message":"format must be zip or pdf"}), 400
+    filters = _officer_filters()
+    stamp = f"{datetime.now():%Y%m%d-%H%M}"
+    if fmt == 'pdf':
+        # ReportLab can't concatenate finished documents, so a combined
+        # bundle is drawn on one canvas by a single pool worker.
+        items = list(islice(iter_complaints_with_evidence(filters), BULK_PDF_MAX_ROWS + 1))
+        if len(items) > BULK_PDF_MAX_ROWS:
+            return jsonify({"status":"error","message":f"Too many petitions for one PDF (max {BULK_PDF_MAX_ROWS}); use format=zip or narrow the filters."}), 400
+        rows = [row for row, _ in items]
+        pdf = _shared_pdf_pool().submit(render_petitions_pdf, rows, {row[0]: files for row, files in items}).result()
+        resp = make_response(pdf)
+        resp.headers['Content-Type'] = 'application/pdf'
+        resp.headers['Content-Disposition'] = f"attachment; filename=petitions-{stamp}.pdf"
+        return resp
+    body = stream_petition_zip(render_petition_files(iter_complaints_with_evidence(filters), _shared_pdf_pool()))
+    resp = Response(body, mimetype='application/zip')
+    resp.headers['Content-Disposition'] = f"attachment; filename=petitions-{stamp}.zip"
+    resp.headers['Cache-Control'] = 'no-store'
+    return resp
+
+
+@app.cli.command("bundle-petitions")
+@click.option("--format", "fmt", type=click.Choice(["zip", "pdf"]), default="zip", show_default=True)
+@click.option("--out", required=True, type=click.Path(dir_okay=False), help="Output file")
+@click.option("--status", type=click.Choice(STATUS_VALUES))
+@click.option("--taluk")
+@click.option("--firka")
+@click.option("--village")
+@click.option("--from-date", help="YYYY-MM-DD")
+@click.option("--to-date", help="YYYY-MM-DD")
+@click.option("--workers", type=int, default=PDF_WORKERS, show_default=True)
+def bundle_petitions_command(fmt, out, workers, **filters):
+    """Render every petition matching the filters into one PDF or a ZIP."""
+    started = time.perf_counter()
+    pages = 0
+    with pdf_process_pool(workers) as pool, open(out, "wb") as fh:
+        if fmt == "pdf":
+            items = list(iter_complaints_with_evidence(filters))
+            evidence = {row[0]: files for row, files in items}
+            fh.write(pool.submit(render_petitions_pdf, [row for row, _ in items], evidence).result())
+            pages = len(items)
+        else:
+            def counted():
+                nonlocal pages
+                for item in render_petition_files(iter_complaints_with_evidence(filters), pool, window=workers * 2):
+                    pages += 1
+                    yield item
+            for chunk in stream_petition_zip(counted()):
+                fh.write(chunk)
+    elapsed = time.perf_counter() - started
+    click.echo(f"{pages} petitions -> {out} in {elapsed:.1f}s ({pages / elapsed if elapsed else 0:.1f} pages/s)")
+
+
+@app.cli.command("rebuild-search-index")
+def rebuild_search_index_command():
+    """Rebuild and optimise the complaints full-text index."""
+    require_sqlite("rebuild-search-index")
+    started = time.perf_counter()
+    rebuild_search_index()
+    click.echo(f"search index rebuilt in {time.perf_counter() - started:.1f}s")
+
+
+@app.cli.command("rebuild-stats")
+@click.option("--verify-only", is_flag=True, help="Report drift without rewriting the counters")
+def rebuild_stats_command(verify_only):
+    """Recompute complaint_stats from the complaints table and report drift."""
+    drift = stats_drift()
+    for (month, taluk, firka, village, status), stored, actual in drift:
+        click.echo(f"drift {month} {taluk}/{firka}/{village} {status}: stored={stored} actual={actual}")
+    click.echo(f"{len(drift)} drifted cell(s)")
+    if drift and not verify_only:
+        rebuild_stats()
+        click.echo("counters rebuilt")
+
+
+# ---------- Bulk import ----------
+IMPORT_FIELDS = COMPLAINT_COLUMNS.split(",")
+IMPORT_REQUIRED = ("mobile", "petitioner_name", "taluk", "firka", "village", "description")
+IMPORT_TIME_FORMATS = ("%d/%m/%Y", "%d-%m-%Y", "%d/%m/%Y %H:%M", "%d-%m-%Y %H:%M")
+# insert-time triggers skipped during a deferred load and rebuilt wholesale after it
+IMPORT_DEFERRED_TRIGGERS = ("complaints_fts_ai", "complaint_stats_ai")
+_STATUS_BY_LOWER = {s.lower(): s for s in STATUS_VALUES}
+
+
+def _import_fingerprint(path: str) -> str:
+    # the whole file, so an edit anywhere is caught before a resume skips rows
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        while chunk := fh.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_import_records(path: str, fmt: str):
+    """Yield one dict per CSV row or JSON line (None for unparseable lines)."""
+    with open(path, newline="" if fmt == "csv" else None, encoding="utf-8-sig") as fh:
+        if fmt == "csv":
+            yield from csv.DictReader(fh)
+            return
+        for line in fh:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield record if isinstance(record, dict) else None
+
+
+def _parse_import_time(value: str) -> datetime:
+    try:
+        parsed = datetime.fromisoformat(value)
+        return parsed.astimezone().replace(tzinfo=None) if parsed.tzinfo else parsed
+    except ValueError:
+        pass
+    for fmt in IMPORT_TIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"unrecognised date {value!r}")
+
+
+def validate_import_record(record, fingerprint: str, n: int, now: datetime):
+    """Return (row tuple, None) or (None, reason) for one source record."""
+    if record is None:
+        return None, "not a JSON object"
+    rec = {k: (str(v).strip() if v is not None else "") for k, v in record.items() if k in IMPORT_FIELDS}
+    missing = [f for f in IMPORT_REQUIRED if not rec.get(f)]
+    if missing:
+        return None, "missing " + ", ".join(missing)
+    if not is_valid_location(rec["taluk"], rec["firka"], rec["village"]):
+        return None, f"unknown location {rec['taluk']}/{rec['firka']}/{rec['village']}"
+    status = _STATUS_BY_LOWER.get((rec.get("status") or "Pending").lower())
+    if status is None:
+        return None, f"unknown status {rec['status']!r}"
+    try:
+        created = db_timestamp(_parse_import_time(rec["created_at"])) if rec.get("created_at") else db_timestamp(now)
+    except ValueError as exc:
+        return None, str(exc)
+    # ids for rows without one are derived from the file and line so a resumed
+    # run regenerates the same ones
+    cid = rec.get("id") or complaint_ids.seeded(f"{fingerprint}:{n}", datetime.fromisoformat(created).timestamp())
+    return (cid, rec["mobile"], rec["petitioner_name"], rec.get("petitioner_dob") or None,
+            rec["taluk"], rec["firka"], rec["village"], rec["description"],
+            rec.get("response_text") or None, status, created, created), None
+
+
+def _defer_complaint_indexes(conn):
+    # the missing index set is what tells the next start, if the load dies,
+    # to restore it; user_version is left alone so no step reruns meanwhile
+    for name in COMPLAINT_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+    for name in IMPORT_DEFERRED_TRIGGERS:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def bulk_import(path: str, fmt: str, batch_size: int = 20000, defer: bool = True, restart: bool = False,
+                rejects=None, progress=None) -> dict:
+    """Load complaints from a CSV/JSON-lines file in batched transactions.
+
+    Each batch is one ``executemany`` and commits together with a checkpoint
+    in ``import_progress``, so a rerun after a crash skips what is already in.
+    Rows whose id already exists are skipped. With ``defer``, the secondary
+    indexes and the FTS/statistics insert triggers are dropped for the
+    load and rebuilt once at the end.
+    """
+    source = os.path.abspath(path)
+    fingerprint = _import_fingerprint(source)
+    now = datetime.now()
+    # a deferred load holds the migration lock until the index set is back, so
+    # no other process migrates or restores it underneath the load
+    with store.migration_lock() if defer else nullcontext():
+        with get_conn() as conn:
+            if restart:
+                conn.execute("DELETE FROM import_progress WHERE source=?", (source,))
+            row = conn.execute(
+                "SELECT fingerprint, rows_done, imported, duplicates, rejected, finished_at FROM import_progress WHERE source=?",
+                (source,),
+            ).fetchone()
+            if row and row[0] != fingerprint:
+                raise ValueError(f"{path} changed since the last run; use --restart to import it afresh")
+            if row and row[5]:
+                return {"done": row[1], "imported": 0, "duplicates": 0, "rejected": 0, "skipped": row[1],
+                        "load_seconds": 0.0, "rebuild_seconds": 0.0, "finished": True}
+            if not row:
+                conn.execute(
+                    "INSERT INTO import_progress (source, fingerprint, rows_done, imported, duplicates, rejected, started_at) "
+                    "VALUES (?, ?, 0, 0, 0, 0, ?)",
+                    (source, fingerprint, db_timestamp(now)),
+                )
+            resume_from = row[1] if row else 0
+            if defer:
+                _defer_complaint_indexes(conn)
+        counts = {"done": resume_from, "imported": 0, "duplicates": 0, "rejected": 0, "skipped": resume_from}
+        insert = f"INSERT OR IGNORE INTO complaints ({COMPLAINT_COLUMNS},updated_at) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)"
+        started = time.perf_counter()
+        records = islice(_read_import_records(source, fmt), resume_from, None)
+        n = resume_from
+        while True:
+            batch, bad = [], 0
+            for record in islice(records, batch_size):
+                n += 1
+                values, reason = validate_import_record(record, fingerprint, n, now)
+                if values is None:
+                    bad += 1
+                    if rejects is not None:
+                        entry = {"row": n, "reason": reason, "record": record}
+                        rejects.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                else:
+                    batch.append(values)
+            if not batch and not bad:
+                break
+            if rejects is not None:
+                rejects.flush()
+            with get_conn() as conn:
+                inserted = conn.executemany(insert, batch).rowcount if batch else 0
+                conn.execute(
+                    "UPDATE import_progress SET rows_done=?, imported=imported+?, duplicates=duplicates+?, "
+                    "rejected=rejected+? WHERE source=?",
+                    (n, inserted, len(batch) - inserted, bad, source),
+                )
+            counts["done"] = n
+            counts["imported"] += inserted
+            counts["duplicates"] += len(batch) - inserted
+            counts["rejected"] += bad
+            if progress:
+                progress(counts, time.perf_counter() - started)
+        counts["load_seconds"] = time.perf_counter() - started
+        started = time.perf_counter()
+        if defer:
+            # restores the indexes and triggers, then rebuilds what the triggers skipped
+            store.finish_deferred_import()
+        rebuild_quota_ledger()
+        with get_conn() as conn:
+            conn.execute("UPDATE import_progress SET finished_at=? WHERE source=?",
+                         (db_timestamp(datetime.now()), source))
+            conn.execute("PRAGMA optimize")
+        counts["rebuild_seconds"] = time.perf_counter() - started
+        counts["finished"] = False
+        return counts
+
+
+@app.cli.command("import-complaints")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]), help="Default: from the file extension")
+@click.option("--batch-size", type=int, default=20000, show_default=True, help="Rows per transaction")
+@click.option("--defer-indexes/--keep-indexes", default=True, show_default=True,
+              help="Drop indexes and insert triggers during the load and rebuild them after")
+@click.option("--restart", is_flag=True, help="Ignore the checkpoint and start from the first row")
+@click.option("--rejects", type=click.Path(dir_okay=False), help="Append rejected rows with reasons (JSON lines)")
+def import_complaints_command(path, fmt, batch_size, defer_indexes, restart, rejects):
+    """Import complaints from CSV or JSON lines, resuming an interrupted run.
+
+    Columns/keys match the export: id (optional), mobile, petitioner_name,
+    petitioner_dob, taluk, firka, village, description, response_text,
+    status (default Pending) and created_at (ISO or dd/mm/yyyy; default now).
+    """
+    require_sqlite("import-complaints")
+    fmt = fmt or ("csv" if path.lower().endswith(".csv") else "jsonl")
+
+    def progress(counts, elapsed):
+        new = counts["done"] - counts["skipped"]
+        click.echo(f"{counts['done']} rows read, {counts['imported']} imported, {counts['rejected']} rejected "
+                   f"({new / elapsed if elapsed else 0:.0f} rows/s)")
+
+    with (open(rejects, "a", encoding="utf-8") if rejects else nullcontext()) as rejects_fh:
+        try:
+            counts = bulk_import(path, fmt, batch_size, defer_indexes, restart, rejects_fh, progress)
+        except ValueError as exc:
+            raise click.ClickException(str(exc))
+    if counts["finished"]:
+        click.echo(f"{path} was already imported ({counts['done']} rows); use --restart to load it again")
+        return
+    new = counts["done"] - counts["skipped"]
+    total = counts["load_seconds"] + counts["rebuild_seconds"]
+    if counts["skipped"]:
+        click.echo(f"resumed after {counts['skipped']} rows")
+    click.echo(f"{counts['imported']} imported, {counts['duplicates']} duplicate ids skipped, "
+               f"{counts['rejected']} rejected")
+    click.echo(f"load {counts['load_seconds']:.1f}s ({new / counts['load_seconds'] if counts['load_seconds'] else 0:.0f} rows/s), "
+               f"rebuild {counts['rebuild_seconds']:.1f}s, overall {new / total if total else 0:.0f} rows/s")
+    if counts["imported"]:
+        click.echo("run index-duplicates to match the imported complaints for possible duplicates")
+
+
+# ---------- Request metrics ----------
+# registered before guard_officer_routes so requests it redirects are timed too
+@app.before_request
+def start_request_timer():
+    if not METRICS_ENABLED:
+        return None
+    g.request_started = time.perf_counter()
+    _query_ctx.count = 0
+    return None
+
+
+@app.after_request
+def record_request_metrics(resp):
+    started = g.pop("request_started", None)
+    if started is not None:
+        # streamed bodies (exports, bundles) are timed up to the first byte
+        labels = {"endpoint": request.endpoint or "unmatched", "method": request.method, "status": resp.status_code}
+        metrics.observe("http_request_duration_seconds", time.perf_counter() - started, **labels)
+        metrics.observe("http_request_queries", getattr(_query_ctx, "count", 0), endpoint=labels["endpoint"])
+    return resp
+
+
+@app.route("/metrics")
+def metrics_endpoint():
+    # the series name endpoints, volumes and timings, so they are never public
+    if not METRICS_ENABLED or not METRICS_TOKEN:
+        return "Not found", 404
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    if not hmac.compare_digest(supplied.encode(), METRICS_TOKEN.encode()):
+        return "Unauthorized", 401
+    resp = make_response(render_prometheus(metrics.collect()))
+    resp.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+    resp.headers['Cache-Control'] = 'no-store'
     return resp
 
 
@@ -624,10 +4012,16 @@ def officer_login():
         session.pop("officer_at", None)
         return render_template("officer_login.html")
     pin = request.form.get("pin", "")
-    if pin == OFFICER_PIN:
+    ip = request.remote_addr
+    if officer_ip_limiter.blocked(ip):
+        flash("Too many failed attempts. Please try again later.")
+        return render_template("officer_login.html"), 429
+    if hmac.compare_digest(pin.encode(), OFFICER_PIN.encode()):
+        officer_ip_limiter.reset(ip)
         session["officer"] = True
         session["officer_at"] = datetime.now().timestamp()
         return redirect(url_for("officer_panel"))
+    officer_ip_limiter.hit(ip)
     flash("Invalid PIN.")
     return redirect(url_for("officer_login"))
 
@@ -643,10 +4037,25 @@ def officer_root():
     return redirect(url_for("officer_login"))
 
 
-@app.route("/officer/panel")
-def officer_panel():
-    if not session.get("officer"):
-        return redirect(url_for("officer_login"))
+OFFICER_PAGE_SIZE = int(os.environ.get("OFFICER_PAGE_SIZE", 50))
+OFFICER_PAGE_MAX = int(os.environ.get("OFFICER_PAGE_MAX", 200))
+
+
+class InvalidFilter(Exception):
+    pass
+
+
+@app.errorhandler(InvalidFilter)
+def invalid_filter(exc):
+    return jsonify({"status":"error","message":str(exc)}), 400
+
+
+def _officer_filters():
+    """The panel filters in the query string; raises InvalidFilter for a value that names nothing.
+
+    Ignoring a stale or mistyped value would widen the panel, an export or
+    a bundle to every complaint, so it is refused instead.
+    """
     filters = {
         'status': request.args.get('status') or None,
         'taluk': request.args.get('taluk') or None,
@@ -655,8 +4064,196 @@ def officer_panel():
         'from_date': request.args.get('from_date') or None,
         'to_date': request.args.get('to_date') or None,
     }
-    rows = list_all_complaints(filters=filters, limit=1000)
-    return render_template("officer.html", complaints=rows, statuses=STATUS_VALUES, colors=STATUS_COLORS, filters=filters)
+    if filters['status'] and filters['status'] not in STATUS_VALUES:
+        raise InvalidFilter("unknown status")
+    _check_location_args(filters['taluk'], filters['firka'], filters['village'])
+    for key in ('from_date', 'to_date'):
+        if filters[key]:
+            try:
+                datetime.strptime(filters[key], "%Y-%m-%d")
+            except ValueError:
+                raise InvalidFilter(f"{key} must be YYYY-MM-DD") from None
+    return filters
+
+
+def _check_location_args(taluk, firka=None, village=None):
+    if taluk and not is_valid_location(taluk):
+        raise InvalidFilter("unknown taluk")
+    if firka and not (taluk and is_valid_location(taluk, firka)):
+        raise InvalidFilter("unknown firka for this taluk")
+    if village and not (firka and is_valid_location(taluk, firka, village)):
+        raise InvalidFilter("unknown village for this firka")
+
+
+def _page_key(value):
+    # cursor format: "<created_at>|<id>"
+    if not value or '|' not in value:
+        return None
+    created_at, cid = value.split('|', 1)
+    return (created_at, cid)
+
+
+@app.route("/officer/panel")
+def officer_panel():
+    if not session.get("officer"):
+        return redirect(url_for("officer_login"))
+    filters = _officer_filters()
+    per_page = request.args.get('per_page', type=int) or OFFICER_PAGE_SIZE
+    per_page = max(1, min(per_page, OFFICER_PAGE_MAX))
+    q = (request.args.get('q') or '').strip()
+    if q:
+        return _officer_search_page(filters, q, per_page)
+    # read before the rows, so a change committed in between is streamed rather than lost
+    since = change_log_bounds()[1]
+    before = _page_key(request.args.get('before'))
+    after = None if before else _page_key(request.args.get('after'))
+    rows = list_all_complaints(filters=filters, limit=per_page + 1, before=before, after=after)
+    # one extra row tells us whether another page exists in that direction
+    if after:
+        has_prev = len(rows) > per_page
+        rows = rows[-per_page:] if has_prev else rows
+        has_next = True
+    else:
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        has_prev = before is not None
+    page_args = {k: v for k, v in filters.items() if v}
+    page_args['per_page'] = per_page
+    next_url = prev_url = None
+    if rows and has_next:
+        next_url = url_for('officer_panel', before=f"{rows[-1][10]}|{rows[-1][0]}", **page_args)
+    if rows and has_prev:
+        prev_url = url_for('officer_panel', after=f"{rows[0][10]}|{rows[0][0]}", **page_args)
+    return render_template(
+        "officer.html", complaints=rows, statuses=STATUS_VALUES, colors=STATUS_COLORS, filters=filters,
+        evidence=list_evidence(r[0] for r in rows), duplicates=list_duplicates(r[0] for r in rows),
+        per_page=per_page, next_url=next_url, prev_url=prev_url, q='',
+        count_url=url_for('officer_count', **{k: v for k, v in filters.items() if v}),
+        export_args={k: v for k, v in filters.items() if v},
+        events_url=url_for('officer_events', since=since, **{k: v for k, v in filters.items() if v}),
+        # new petitions are only prepended on the newest page
+        live_new=not before and not after,
+    )
+
+
+def _officer_search_page(filters: dict, q: str, per_page: int):
+    # ranked results can't be keyset-paginated, so search pages by offset
+    page = max(1, request.args.get('page', type=int) or 1)
+    since = change_log_bounds()[1]
+    rows = search_complaints(q, filters, limit=per_page + 1, offset=(page - 1) * per_page)
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    page_args = {k: v for k, v in filters.items() if v}
+    page_args.update(per_page=per_page, q=q)
+    next_url = url_for('officer_panel', page=page + 1, **page_args) if has_next else None
+    prev_url = url_for('officer_panel', page=page - 1, **page_args) if page > 1 else None
+    return render_template(
+        "officer.html", complaints=rows, statuses=STATUS_VALUES, colors=STATUS_COLORS, filters=filters,
+        evidence=list_evidence(r[0] for r in rows), duplicates=list_duplicates(r[0] for r in rows),
+        per_page=per_page, next_url=next_url, prev_url=prev_url, q=q,
+        count_url=url_for('officer_count', q=q, **{k: v for k, v in filters.items() if v}),
+        export_args={k: v for k, v in filters.items() if v},
+        events_url=url_for('officer_events', since=since, **{k: v for k, v in filters.items() if v}),
+        live_new=False,
+    )
+
+
+@app.route("/officer/count")
+def officer_count():
+    q = (request.args.get('q') or '').strip()
+    if q:
+        return jsonify({"status": "success", "total": count_search_matches(q, _officer_filters())})
+    return jsonify({"status": "success", "total": count_complaints(_officer_filters())})
+
+
+def _stats_args():
+    taluk = request.args.get('taluk') or None
+    firka = request.args.get('firka') or None
+    _check_location_args(taluk, firka)
+    return {
+        'taluk': taluk,
+        'firka': firka,
+        'from_month': request.args.get('from_month') or None,
+        'to_month': request.args.get('to_month') or None,
+    }
+
+
+@app.route("/officer/stats")
+def officer_stats():
+    args = _stats_args()
+    level, rows = complaint_stats(**args)
+    return jsonify({
+        "status": "success",
+        "level": level,
+        "filters": args,
+        "cells": [{"month": m, level: loc, "status": st, "count": n} for m, loc, st, n in rows],
+    })
+
+
+@app.route("/officer/dashboard")
+def officer_dashboard():
+    args = _stats_args()
+    level, rows = complaint_stats(**args)
+    # pivot to one table row per (month, location) with a column per status
+    table = OrderedDict()
+    for month, loc, status, n in rows:
+        counts = table.setdefault((month, loc), dict.fromkeys(STATUS_VALUES, 0))
+        if status in counts:
+            counts[status] = n
+    return render_template("officer_stats.html", level=level, table=table, statuses=STATUS_VALUES, filters=args)
+
+
+EXPORT_BATCH_ROWS = int(os.environ.get("EXPORT_BATCH_ROWS", 1000))
+# Spreadsheets run a cell that starts with one of these as a formula, and the
+# text comes from petitioners, so the CSV export quotes it as plain text.
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_cell(value):
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _export_csv(rows):
+    buf = StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(COMPLAINT_COLUMNS.split(","))
+    for i, row in enumerate(rows, 1):
+        writer.writerow([_csv_cell(v) for v in row])
+        if i % EXPORT_BATCH_ROWS == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+def _export_ndjson(rows):
+    fields = COMPLAINT_COLUMNS.split(",")
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps(dict(zip(fields, row)), ensure_ascii=False))
+        if len(chunk) >= EXPORT_BATCH_ROWS:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+@app.route("/officer/export")
+def officer_export():
+    fmt = request.args.get('format', 'csv')
+    if fmt not in ('csv', 'ndjson'):
+        return jsonify({"status":"error","message":"format must be csv or ndjson"}), 400
+    rows = iter_complaints(_officer_filters(), batch_size=EXPORT_BATCH_ROWS)
+    if fmt == 'csv':
+        body, mimetype = _export_csv(rows), 'text/csv'
+    else:
+        body, mimetype = _export_ndjson(rows), 'application/x-ndjson'
+    resp = Response(body, mimetype=mimetype)
+    resp.headers['Content-Disposition'] = f"attachment; filename=complaints-{datetime.now():%Y%m%d-%H%M}.{fmt}"
+    resp.headers['Cache-Control'] = 'no-store'
+    return resp
 
 
 @app.route("/officer/update", methods=["POST"])
@@ -675,18 +4272,90 @@ def officer_update():
     return redirect(url_for("officer_panel"))
 
 
+@app.route("/officer/batch-update", methods=["POST"])
+def officer_batch_update():
+    if not session.get("officer"):
+        return jsonify({"status":"error","message":"not authorized"}), 401
+    data = request.get_json(silent=True)
+    if data is None:
+        data = {"ids": request.form.getlist("ids"), "status": request.form.get("status"),
+                "response_text": request.form.get("response_text")}
+    if not isinstance(data, dict):
+        return jsonify({"status":"error","message":"expected an object with ids and a status or response_text"}), 400
+    ids = data.get("ids") or []
+    new_status = data.get("status")
+    response_text = data.get("response_text") or ""
+    if not isinstance(ids, list) or not isinstance(response_text, str):
+        return jsonify({"status":"error","message":"ids must be a list and response_text a string"}), 400
+    if not all(isinstance(cid, str) and cid.strip() for cid in ids):
+        return jsonify({"status":"error","message":"every id must be a non-empty string"}), 400
+    response_text = response_text.strip()
+    if not ids:
+        return jsonify({"status":"error","message":"no complaints selected"}), 400
+    if len(ids) > BATCH_UPDATE_MAX:
+        return jsonify({"status":"error","message":f"at most {BATCH_UPDATE_MAX} complaints per batch"}), 400
+    if not response_text and new_status not in STATUS_VALUES:
+        return jsonify({"status":"error","message":"invalid status"}), 400
+    results, rows = batch_update_complaints(ids, status=new_status, response_text=response_text or None)
+    fields = COMPLAINT_COLUMNS.split(",")
+    return jsonify({
+        "status": "success",
+        "updated": sum(1 for r in results.values() if r == "updated"),
+        "results": results,
+        "rows": [dict(zip(fields, row)) for row in rows],
+    })
+
+
+@app.route("/officer/evidence/<cid>/<sha256>")
+def officer_evidence(cid: str, sha256: str):
+    """One attachment, with range requests; the hash is its ETag."""
+    found = get_evidence(cid, sha256)
+    if not found:
+        return "Not found", 404
+    filename, content_type, _ = found
+    try:
+        # conditional=True answers If-None-Match and Range from the file itself
+        resp = send_file(evidence_path(sha256), mimetype=content_type, download_name=filename,
+                         conditional=True, etag=sha256)
+    except FileNotFoundError:
+        app.logger.error("evidence %s of complaint %s is missing from %s", sha256, cid, EVIDENCE_DIR)
+        return "Not found", 404
+    resp.headers['Cache-Control'] = 'private, no-cache'
+    return resp
+
+
+@app.route("/officer/events")
+def officer_events():
+    """Server-sent events with the panel's new and changed complaints."""
+    since = request.headers.get("Last-Event-ID", type=int)
+    if since is None:
+        since = request.args.get("since", type=int)
+    stream, missed = change_feed.open(_officer_filters(), since)
+    if stream is None:
+        return jsonify({"status":"error","message":"too many live panels open; reload later"}), 503
+    # end with the officer session; the browser's reconnect then meets the login redirect
+    session_left = float(session.get("officer_at", 0)) + 1800 - datetime.now().timestamp()
+    resp = Response(_event_stream(stream, missed, max(0.0, min(EVENTS_STREAM_SECONDS, session_left))),
+                    mimetype="text/event-stream")
+    resp.headers['Cache-Control'] = 'no-cache'
+    resp.headers['X-Accel-Buffering'] = 'no'
+    return resp
+
+
 # ---------- Security headers ----------
 @app.after_request
 def add_security_headers(resp):
     resp.headers['X-Frame-Options'] = 'SAMEORIGIN'
     resp.headers['X-Content-Type-Options'] = 'nosniff'
-    resp.headers['Referrer-Policy'] = 'no-referrer-when-downgrade'
+    resp.headers.setdefault('Referrer-Policy', 'no-referrer-when-downgrade')
     resp.headers['Content-Security-Policy'] = "default-src 'self' 'unsafe-inline' data:"
     return resp
 
 
-# Ensure DB is initialized when app is imported (e.g., under gunicorn)
-init_db()
+# Migrate on import unless the caller migrates itself (gunicorn.conf.py
+# does it once in the master; see migrate-db for other deploys)
+if MIGRATE_ON_IMPORT:
+    init_db()
 
 # ---------- start ----------
 if __name__ == "__main__":
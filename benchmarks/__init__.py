@@ -0,0 +1,7 @@
+"""Benchmarks for the petition portal.
+
+Each module is runnable with ``python -m benchmarks.<name>`` from the repo
+root. They point ``DB_PATH`` at a scratch database before importing ``app``
+so a real ``complaints.db`` is never touched. ``datagen`` seeds that
+database and ``report`` holds the shared timing and table helpers.
+"""
@@ -0,0 +1,123 @@
+"""Officer panel reloads versus the change feed.
+
+    python -m benchmarks.change_feed --complaints 50000 --streams 1,10,50 --updates 300
+
+"panel reload" is what an officer refreshing by hand pays each time: the
+newest panel page through the test client, at ``--per-page`` rows. Then
+for each ``--streams`` count, that many /officer/events streams are opened
+in-process with a mix of panel filters. A writer meanwhile changes the
+status of ``--updates`` complaints, one every ``--interval-ms``. Each row
+reports the time from an update's commit to the event reaching a stream
+that shows it. "same worker" is a write in the streaming worker, which
+wakes its poller at once. "other worker" skips that wake-up, like a write
+served by another gunicorn worker, so it waits for the next poll.
+``polls`` counts the DB reads of the worker's shared poller, which does
+not grow with the number of open streams.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("DB_PATH", os.path.join(tempfile.mkdtemp(prefix="bench-"), "complaints.db"))
+
+import app  # noqa: E402
+from benchmarks import datagen, report  # noqa: E402
+
+
+def panel_reload(per_page: int, seconds: float) -> dict:
+    client = app.app.test_client()
+    client.post("/officer/login", data={"pin": app.OFFICER_PIN})
+    samples = report.measure(lambda: client.get(f"/officer/panel?per_page={per_page}").get_data(), seconds)
+    return report.summarize("panel reload", samples)
+
+
+def polls() -> float:
+    return sum(v for name, _, v in app.metrics.snapshot()["counters"] if name == "change_feed_polls_total")
+
+
+def run_streams(n: int, ids: list, updates: int, interval: float, rng: random.Random, local: bool) -> dict:
+    taluks = sorted(app.locations)
+    committed, delays = {}, []
+    lock = threading.Lock()
+    streams = []
+    for i in range(n):
+        # a third watch everything, the rest one taluk
+        filters = {} if i % 3 == 0 else {"taluk": taluks[i % len(taluks)]}
+        stream, _ = app.change_feed.open(filters, None)
+        streams.append(stream)
+
+    def consume(stream):
+        for text in app._event_stream(stream, [], 3600):
+            if text.startswith("event: reset"):
+                return
+            data = next((line[6:] for line in text.split("\n") if line.startswith("data: ")), None)
+            if data is None:
+                continue
+            cid = json.loads(data)["row"]["id"]
+            received = time.perf_counter()
+            with lock:
+                if cid in committed:
+                    delays.append(received - committed[cid])
+
+    readers = [threading.Thread(target=consume, args=(s,), daemon=True) for s in streams]
+    for t in readers:
+        t.start()
+    poke = app.change_feed.poke
+    if not local:
+        app.change_feed.poke = lambda: None
+    before = polls()
+    started = time.perf_counter()
+    for cid in rng.sample(ids, updates):
+        app.update_status(cid, rng.choice(app.STATUS_VALUES))
+        with lock:
+            committed[cid] = time.perf_counter()
+        time.sleep(interval)
+    time.sleep(app.CHANGE_POLL_SECONDS * 2)
+    elapsed = time.perf_counter() - started
+    app.change_feed.poke = poke
+    for stream in streams:
+        # ends the stream with a reset event
+        stream.queue.put(None)
+    for t in readers:
+        t.join(5)
+    where = "same worker" if local else "other worker"
+    return report.summarize(f"{n} streams, {where}", delays, polls=f"{polls() - before:.0f}",
+                            elapsed_s=f"{elapsed:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--complaints", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--per-page", type=int, default=app.OFFICER_PAGE_MAX)
+    parser.add_argument("--streams", default="1,10,50")
+    parser.add_argument("--updates", type=int, default=300)
+    parser.add_argument("--interval-ms", type=float, default=10.0)
+    parser.add_argument("--seconds", type=float, default=3.0, help="time spent on panel reloads")
+    parser.add_argument("--json", help="write results here for benchmarks.report")
+    args = parser.parse_args()
+
+    datagen.populate(args.users, args.complaints, args.seed)
+    app.app.config["SESSION_COOKIE_SECURE"] = False
+    rng = random.Random(args.seed)
+    ids = [datagen.complaint_id(n) for n in range(args.complaints)]
+    counts = [int(n) for n in args.streams.split(",")]
+    app.EVENTS_MAX_STREAMS = max(counts)
+    rows = [panel_reload(args.per_page, args.seconds)]
+    for local in (True, False):
+        for n in counts:
+            rows.append(run_streams(n, ids, args.updates, args.interval_ms / 1000, rng, local))
+    print(f"{args.complaints} complaints, poll every {app.CHANGE_POLL_SECONDS}s, "
+          f"{args.updates} updates {args.interval_ms:.0f} ms apart")
+    report.print_table(rows, extra=("polls", "elapsed_s"))
+    if args.json:
+        report.write_json(args.json, "change_feed", rows, vars(args))
+
+
+if __name__ == "__main__":
+    main()
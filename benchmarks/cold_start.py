@@ -0,0 +1,141 @@
+"""Cold start: import time, schema check and time to the first responses.
+
+    python -m benchmarks.cold_start --runs 10
+    python -m benchmarks.cold_start --runs 5 --gunicorn 2 --json cold.json
+
+Every run is a fresh interpreter on a seeded scratch database whose schema
+is already current. The child times ``import app`` (with
+MIGRATE_ON_IMPORT=0), then ``init_db()``, which is the check a worker does
+when nothing ran migrate-db first. Then it times its first ``/``,
+``/track`` and petition PDF on the test client. "spawn to first /" runs
+from the parent's spawn to that first response, so it includes
+interpreter start-up. "migrate-db (new db)" times the CLI on an empty
+database. ``--gunicorn N`` also times a gunicorn with N workers from spawn
+to its first 200 on ``/``, including the gunicorn.conf.py migration.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+os.environ.setdefault("DB_PATH", os.path.join(tempfile.mkdtemp(prefix="bench-"), "complaints.db"))
+
+import app  # noqa: E402
+from benchmarks import datagen, report  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.init_db()
+checked = time.perf_counter()
+out = {"import app": imported - started, "init_db (current)": checked - imported,
+       "reportlab_at_import": "reportlab" in sys.modules}
+client = app.app.test_client()
+for name, path in (("first /", "/"), ("first /track", "/track"),
+                   ("first pdf", "/petition/" + sys.argv[1] + "/download")):
+    t = time.perf_counter()
+    if path == "/track":
+        status = client.post(path, data={"key": sys.argv[1]}, follow_redirects=True).status_code
+    else:
+        status = client.get(path).status_code
+    out[name] = time.perf_counter() - t
+    if name == "first /":
+        out["first_response_at"] = time.time()
+    if status != 200:
+        sys.exit(f"{path} answered {status}")
+print(json.dumps(out))
+"""
+
+
+def child_env(db_path: str) -> dict:
+    return dict(os.environ, DB_PATH=db_path, MIGRATE_ON_IMPORT="0")
+
+
+def run_child(cid: str) -> dict:
+    spawned = time.time()
+    out = subprocess.run([sys.executable, "-c", CHILD, cid], cwd=ROOT, env=child_env(app.DB_PATH),
+                         capture_output=True, text=True, check=True).stdout
+    timings = json.loads(out)
+    timings["spawn to first /"] = timings.pop("first_response_at") - spawned
+    return timings
+
+
+def time_new_db_migration(scratch: str, n: int) -> float:
+    env = child_env(os.path.join(scratch, f"new-{n}.db"))
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "flask", "--app", "app", "migrate-db"], cwd=ROOT, env=env,
+                   capture_output=True, check=True)
+    return time.perf_counter() - started
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_gunicorn(workers: int) -> float:
+    port = _free_port()
+    env = dict(os.environ, DB_PATH=app.DB_PATH)
+    env.pop("MIGRATE_ON_IMPORT", None)
+    started = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "gunicorn", "-w", str(workers), "-b", f"127.0.0.1:{port}",
+                             "--log-level", "warning", "app:app"], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL)
+    try:
+        while True:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=5).read()
+                return time.perf_counter() - started
+            except OSError:
+                if proc.poll() is not None:
+                    sys.exit("gunicorn exited during start-up")
+                if time.perf_counter() - started > 60:
+                    sys.exit("gunicorn did not start")
+                time.sleep(0.005)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--complaints", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--gunicorn", type=int, metavar="WORKERS", help="also time a gunicorn with this many workers")
+    parser.add_argument("--json", help="write results here for benchmarks.report")
+    args = parser.parse_args()
+
+    datagen.populate(args.users, args.complaints, args.seed)
+    cid = datagen.complaint_id(0)
+    samples, eager = {}, False
+    for _ in range(args.runs):
+        timings = run_child(cid)
+        eager |= timings.pop("reportlab_at_import")
+        for name, seconds in timings.items():
+            samples.setdefault(name, []).append(seconds)
+    scratch = tempfile.mkdtemp(prefix="bench-cold-")
+    samples["migrate-db (new db)"] = [time_new_db_migration(scratch, n) for n in range(args.runs)]
+    if args.gunicorn:
+        samples[f"gunicorn -w {args.gunicorn} to first /"] = [time_gunicorn(args.gunicorn) for _ in range(args.runs)]
+    rows = [report.summarize(name, values) for name, values in samples.items()]
+    print(f"{args.runs} cold starts, {args.complaints} complaints; "
+          f"ReportLab {'loaded' if eager else 'not loaded'} by import app")
+    report.print_table(rows)
+    if args.json:
+        report.write_json(args.json, "cold_start", rows, vars(args))
+
+
+if __name__ == "__main__":
+    main()
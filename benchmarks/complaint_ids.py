@@ -0,0 +1,123 @@
+"""Insert throughput with legacy random ids versus time-ordered ids.
+
+    python -m benchmarks.complaint_ids --rows 1000000 --inserts 20000 --cache-kb 2048
+
+For each scheme this fills its own scratch database with ``--rows``
+complaints keyed by that scheme, then times ``--inserts`` more through
+``app.submit_complaint`` (one transaction each, as /submit does). The
+legacy scheme is ``uuid4()[:8]``, so taken ids happen and are counted; the
+insert is retried with a fresh id like the app would. ``--cache-kb``
+shrinks the page cache so a laptop-sized table behaves like a large one:
+random keys then touch a cold index page per insert, time-ordered keys
+keep appending to the same few.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+
+os.environ.setdefault("DB_PATH", os.path.join(tempfile.mkdtemp(prefix="bench-"), "complaints.db"))
+
+import app  # noqa: E402
+from benchmarks import report  # noqa: E402
+
+DESCRIPTION = "benchmark petition text " * 8
+
+
+def legacy_id(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))[:8]
+
+
+def use_database(path: str):
+    pool = app.ConnectionPool(path, 4, attach={"archive": os.path.splitext(path)[0] + "-archive.db"})
+    app.store = app.SqliteStore(pool)
+    app.init_db()
+
+
+def _row(cid: str, n: int, created: str):
+    return (cid, f"9{n % 5000:09d}", "Bench", "1990-01-01", "Tenkasi", "Tenkasi", "Ilanji",
+            DESCRIPTION, None, "Pending", created, created)
+
+
+def preload(scheme: str, rows: int, rng: random.Random, batch: int = 20000) -> dict:
+    """Fill the table; returns how many legacy ids were already taken."""
+    gen = app.ComplaintIdGenerator()
+    start = time.time() - 365 * 86400
+    spacing = 365 * 86400 / max(rows, 1)
+    created = app.db_timestamp(app.datetime.now())
+    taken = 0
+    columns = f"{app.COMPLAINT_COLUMNS},updated_at"
+    for lo in range(0, rows, batch):
+        n = min(batch, rows - lo)
+        if scheme == "legacy":
+            chunk = [_row(legacy_id(rng), lo + i, created) for i in range(n)]
+        else:
+            chunk = [_row(gen.next(now=start + (lo + i) * spacing), lo + i, created) for i in range(n)]
+        with app.get_conn() as conn:
+            cur = conn.executemany(f"INSERT OR IGNORE INTO complaints ({columns}) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)", chunk)
+            taken += n - cur.rowcount
+    return {"taken": taken}
+
+
+def timed_inserts(scheme: str, inserts: int, rng: random.Random):
+    samples, taken = [], 0
+    for n in range(inserts):
+        complaint = {
+            "mobile": f"8{n % 5000:09d}", "petitioner_name": "Bench", "petitioner_dob": "1990-01-01",
+            "taluk": "Tenkasi", "firka": "Tenkasi", "village": "Ilanji", "description": DESCRIPTION,
+            "response_text": None, "status": "Pending", "created_at": app.db_timestamp(app.datetime.now()),
+        }
+        started = time.perf_counter()
+        while True:
+            # the time-ordered scheme goes through the app's own generator and retry
+            if scheme == "legacy":
+                complaint["id"] = legacy_id(rng)
+            try:
+                app.submit_complaint(complaint)
+                break
+            except app.sqlite3.IntegrityError:
+                taken += 1
+        samples.append(time.perf_counter() - started)
+        if scheme != "legacy":
+            complaint.pop("id", None)
+    return samples, taken
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=300_000, help="rows in the table before timing")
+    parser.add_argument("--inserts", type=int, default=5000)
+    parser.add_argument("--cache-kb", type=int, default=app.DB_CACHE_KB, help="SQLite page cache per connection")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="write results here for benchmarks.report")
+    args = parser.parse_args()
+    app.DB_CACHE_KB = args.cache_kb
+    app.MONTHLY_COMPLAINT_LIMIT = 0
+    app.QUOTA_WINDOW_LIMIT = 0
+    app.SUBMIT_BATCHING = False
+    scratch = tempfile.mkdtemp(prefix="bench-ids-")
+    rows = []
+    for scheme in ("legacy", "time-ordered"):
+        rng = random.Random(args.seed)
+        path = os.path.join(scratch, f"{scheme}.db")
+        use_database(path)
+        started = time.perf_counter()
+        loaded = preload(scheme, args.rows, rng)
+        load_s = time.perf_counter() - started
+        print(f"{scheme}: loaded {args.rows} rows in {load_s:.1f}s, {loaded['taken']} ids already taken")
+        samples, taken = timed_inserts(scheme, args.inserts, rng)
+        with app.get_conn() as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        size_mb = os.path.getsize(path) / 2**20
+        rows.append(report.summarize(scheme, samples, retries=taken, load_rows_s=f"{args.rows / load_s:.0f}",
+                                     db_mb=f"{size_mb:.0f}"))
+    print(f"{args.rows} rows preloaded, {args.inserts} timed inserts, cache {args.cache_kb} KiB")
+    report.print_table(rows, extra=("retries", "load_rows_s", "db_mb"))
+    if args.json:
+        report.write_json(args.json, "complaint_ids", rows, vars(args))
+
+
+if __name__ == "__main__":
+    main()
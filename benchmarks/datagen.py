@@ -0,0 +1,142 @@
+"""Seeded synthetic data for benchmarks.
+
+    python -m benchmarks.datagen --users 2000 --complaints 100000 --db /tmp/bench.db
+
+Villages get Zipf-like weights, so a few places file most petitions. Each
+user has a home village and most of their petitions come from it, and a
+small share of users file many petitions. Timestamps cover ``days`` days
+with a daytime peak. Status follows age (recent petitions are mostly
+Pending, old ones mostly Resolved or Rejected). Descriptions mix English
+and Tamil topic words into a large filler vocabulary.
+
+The same seed on an empty database gives the same rows on any given day
+(timestamps run up to midnight today). All users share ``BENCH_PASSWORD``,
+and ``mobile_for``/``complaint_id`` let a load driver address them without
+reading the database.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+if __name__ == "__main__" and "--db" in sys.argv:
+    os.environ["DB_PATH"] = sys.argv[sys.argv.index("--db") + 1]
+os.environ.setdefault("DB_PATH", os.path.join(tempfile.mkdtemp(prefix="bench-"), "complaints.db"))
+
+import app  # noqa: E402
+
+BENCH_PASSWORD = "bench-password"
+
+ENGLISH = ("school teacher bus driver neighbour harassment threat village road night phone "
+           "office police relative husband shop message stalking dowry").split()
+TAMIL = "பள்ளி ஆசிரியர் தொந்தரவு பேருந்து ஓட்டுநர் அண்டை வீட்டார் மிரட்டல் கிராமம் இரவு கணவர் வரதட்சணை".split()
+NAMES = "Lakshmi Meena Priya Ramesh Kumar Selvi Anitha Murugan Devi Karthik".split()
+# filler vocabulary so topic words hit a realistic fraction of rows
+FILLER = [f"w{n:04d}" for n in range(4000)]
+RESPONSES = [
+    "Enquiry completed and action taken.",
+    "Forwarded to the block officer; counselling arranged.",
+    "Complaint closed after field verification.",
+]
+
+
+def mobile_for(n: int, seed: int = 42) -> str:
+    # 7919 is coprime with 10**9, so distinct n give distinct numbers
+    return f"9{(n * 7919 + seed) % 10**9:09d}"
+
+
+def complaint_id(n: int) -> str:
+    return f"g{n:07d}"
+
+
+def _place_weights(rng: random.Random):
+    places = [(t, f, v) for t, fs in app.locations.items() for f, vs in fs.items() for v in vs]
+    rng.shuffle(places)
+    return places, [1 / (rank + 1) ** 0.8 for rank in range(len(places))]
+
+
+def description(rng: random.Random) -> str:
+    n = rng.randint(200, 400) if rng.random() < 0.1 else rng.randint(15, 80)
+    words = [rng.choice(FILLER) for _ in range(n)]
+    topic = TAMIL if rng.random() < 0.4 else ENGLISH
+    for _ in range(rng.randint(1, 3)):
+        words[rng.randrange(n)] = rng.choice(topic)
+    return " ".join(words)
+
+
+def _status(rng: random.Random, age_days: float):
+    r = rng.random()
+    if age_days < 7:
+        return "Pending" if r < 0.8 else "In Progress"
+    if age_days < 60:
+        return "Pending" if r < 0.3 else "In Progress" if r < 0.7 else "Resolved" if r < 0.93 else "Rejected"
+    return "Pending" if r < 0.05 else "In Progress" if r < 0.12 else "Resolved" if r < 0.85 else "Rejected"
+
+
+def populate(users: int, complaints: int, seed: int = 42, days: int = 540, batch: int = 20000) -> dict:
+    """Top the database up to ``users`` users and ``complaints`` complaints."""
+    rng = random.Random(seed)
+    places, weights = _place_weights(rng)
+    users = max(1, users)
+    homes = rng.choices(places, weights, k=users)
+    now = app.datetime.combine(app.datetime.now().date(), app.datetime.min.time())
+    started = time.perf_counter()
+    with app.get_conn() as conn:
+        have_users = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        have = conn.execute("SELECT COUNT(*) FROM complaints").fetchone()[0]
+    if have_users < users:
+        # one hash for everyone; hashing per user would dominate the run
+        password_hash = app.generate_password_hash(BENCH_PASSWORD, app.PASSWORD_HASH_METHOD)
+        created = app.db_timestamp(now - app.timedelta(days=days))
+        with app.get_conn() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO users (mobile, password_hash, created_at) VALUES (?, ?, ?)",
+                ((mobile_for(n, seed), password_hash, created) for n in range(users)),
+            )
+    columns = f"{app.COMPLAINT_COLUMNS},updated_at"
+    for lo in range(have, complaints, batch):
+        rows = []
+        for i in range(lo, min(complaints, lo + batch)):
+            owner = int(users * rng.random() ** 2)
+            place = homes[owner] if rng.random() < 0.9 else rng.choices(places, weights)[0]
+            age = rng.random() * days
+            created = now - app.timedelta(days=age)
+            created = min(now, created.replace(hour=min(21, max(7, int(rng.gauss(13, 3))))))
+            status = _status(rng, age)
+            closed = status in ("Resolved", "Rejected")
+            updated = min(now, created + app.timedelta(days=rng.random() * min(age, 45))) if status != "Pending" else created
+            rows.append((
+                complaint_id(i), mobile_for(owner, seed), rng.choice(NAMES),
+                f"{rng.randint(1960, 2012)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                *place, description(rng), rng.choice(RESPONSES) if closed else None, status,
+                app.db_timestamp(created), app.db_timestamp(updated),
+            ))
+        with app.get_conn() as conn:
+            conn.executemany(f"INSERT INTO complaints ({columns}) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)", rows)
+    if complaints > have:
+        app.rebuild_quota_ledger()
+    return {
+        "users": max(users - have_users, 0),
+        "complaints": max(complaints - have, 0),
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--complaints", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--days", type=int, default=540)
+    parser.add_argument("--db", help="database to fill (default: a scratch file)")
+    args = parser.parse_args()
+    added = populate(args.users, args.complaints, args.seed, args.days)
+    rate = added["complaints"] / added["seconds"] if added["seconds"] else 0
+    print(f"{app.DB_PATH}: +{added['users']} users, +{added['complaints']} complaints "
+          f"in {added['seconds']:.1f}s ({rate:.0f} complaints/s)")
+
+
+if __name__ == "__main__":
+    main()
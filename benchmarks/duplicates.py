@@ -0,0 +1,128 @@
+"""Near-duplicate detection: backfill rate, recall and lookup latency.
+
+    python -m benchmarks.duplicates --complaints 50000 --planted 500
+
+The generated complaints are first indexed with index-duplicates'
+backfill ("backfill" row, ``rows_s``). Then ``--planted`` of them get a
+copy with a share of its words replaced, at each of ``--edit-rates``. The
+copies are filed through insert_complaint, which signs and matches them,
+and the recall rows report how often the copy was matched to its original.
+They are grouped by the pair's true Jaccard similarity over word pairs;
+below DUPLICATE_THRESHOLD a miss is the intended answer. "lookup" times
+finding the matches for one signature through the LSH buckets, against
+comparing it with every stored signature ("scan"). ``candidates`` is the
+mean number of signatures each reads.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault("DB_PATH", os.path.join(tempfile.mkdtemp(prefix="bench-"), "complaints.db"))
+
+import app  # noqa: E402
+from benchmarks import datagen, report  # noqa: E402
+
+JACCARD_BUCKETS = (0.8, 0.6, 0.5, 0.4, 0.2, 0.0)
+
+
+def jaccard(a: str, b: str) -> float:
+    a, b = app.description_shingles(a), app.description_shingles(b)
+    return len(a & b) / len(a | b)
+
+
+def edited(text: str, rate: float, rng: random.Random) -> str:
+    words = text.split()
+    for i in rng.sample(range(len(words)), round(len(words) * rate)):
+        words[i] = rng.choice(datagen.FILLER)
+    return " ".join(words)
+
+
+def run_planted(originals: list, rates: list, rng: random.Random) -> tuple:
+    """File an edited copy of each original per rate; returns result rows and the copies' signatures."""
+    by_bucket, signatures = {}, []
+    now = app.db_timestamp(app.datetime.now())
+    for n, (cid, mobile, text) in enumerate(originals):
+        for k, rate in enumerate(rates):
+            copy = edited(text, rate, rng)
+            dup_id = f"dup{n:06d}{k}"
+            started = time.perf_counter()
+            app.insert_complaint(dict(
+                id=dup_id, mobile=mobile, petitioner_name="Bench", petitioner_dob="1990-01-01",
+                taluk="Tenkasi", firka="Kallurani", village="Melapavoor", description=copy,
+                status="Pending", created_at=now,
+            ))
+            elapsed = time.perf_counter() - started
+            bucket = next(lo for lo in JACCARD_BUCKETS if jaccard(text, copy) >= lo)
+            found = cid in {d for d, _ in app.list_duplicates([dup_id]).get(dup_id, ())}
+            by_bucket.setdefault(bucket, []).append((elapsed, found))
+            signatures.append(app.description_signature(copy))
+    rows = []
+    for lo in sorted(by_bucket, reverse=True):
+        runs = by_bucket[lo]
+        rows.append(report.summarize(
+            f"insert, jaccard >= {lo:.1f}", [t for t, _ in runs],
+            recall=f"{sum(found for _, found in runs) / len(runs):.1%}",
+        ))
+    return rows, signatures
+
+
+def bucket_reads(conn, signature: bytes) -> int:
+    buckets = app.lsh_buckets(signature)
+    return conn.execute(f"SELECT COUNT(DISTINCT ref) FROM complaint_lsh WHERE bucket IN ({','.join('?' * len(buckets))})",
+                        buckets).fetchone()[0]
+
+
+def scan_duplicates(conn, signature: bytes) -> list:
+    rows = conn.execute("SELECT complaint_id, signature FROM complaint_minhash").fetchall()
+    matches = [(cid, app.signature_similarity(signature, bytes(theirs))) for cid, theirs in rows if theirs]
+    return sorted((m for m in matches if m[1] >= app.DUPLICATE_THRESHOLD), key=lambda m: -m[1])
+
+
+def run_lookups(signatures: list, seconds: float, rng: random.Random) -> list:
+    with app.get_conn() as conn:
+        stored = conn.execute("SELECT COUNT(*) FROM complaint_minhash").fetchone()[0]
+        reads = [min(bucket_reads(conn, sig), app.DUPLICATE_CANDIDATES_MAX) for sig in signatures]
+    rows = []
+    for name, find, candidates in (("lookup (lsh)", app.find_duplicates, sum(reads) / len(reads)),
+                                   ("lookup (scan)", scan_duplicates, stored)):
+        def lookup():
+            with app.get_conn() as conn:
+                find(conn, rng.choice(signatures))
+        rows.append(report.summarize(name, report.measure(lookup, seconds), candidates=f"{candidates:.0f}"))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--complaints", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--planted", type=int, default=500)
+    parser.add_argument("--edit-rates", default="0.05,0.1,0.2,0.3,0.5")
+    parser.add_argument("--seconds", type=float, default=2.0, help="time spent on each lookup kind")
+    parser.add_argument("--json", help="write results here for benchmarks.report")
+    args = parser.parse_args()
+
+    datagen.populate(args.users, args.complaints, args.seed)
+    counts = app.backfill_duplicate_index()
+    rows = [report.summarize("backfill", [counts["seconds"]], rows_s=f"{counts['indexed'] / counts['seconds']:.0f}")]
+    rng = random.Random(args.seed)
+    ids = rng.sample([datagen.complaint_id(n) for n in range(args.complaints)], min(args.planted, args.complaints))
+    with app.get_conn() as conn:
+        originals = [conn.execute("SELECT id, mobile, description FROM complaints WHERE id = ?", (cid,)).fetchone()
+                     for cid in ids]
+    rates = [float(r) for r in args.edit_rates.split(",")]
+    planted, signatures = run_planted(originals, rates, rng)
+    rows.extend(planted)
+    rows.extend(run_lookups([s for s in signatures if s], args.seconds, rng))
+    print(f"{args.complaints} complaints, {counts['indexed']} backfilled; {len(originals)} planted at edit rates "
+          f"{args.edit_rates}; threshold {app.DUPLICATE_THRESHOLD}")
+    report.print_table(rows, extra=("recall", "rows_s", "candidates"))
+    if args.json:
+        report.write_json(args.json, "duplicates", rows, vars(args))
+
+
+if __name__ == "__main__":
+    main()
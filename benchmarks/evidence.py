@@ -0,0 +1,129 @@
+"""Evidence attachments: upload cost, deduplication and downloads.
+
+    python -m benchmarks.evidence --sizes-mb 0.1,1,10 --uploads 20
+
+For each ``--sizes-mb`` size, ``--uploads`` petitions are posted to /submit
+with one attachment each through the test client. "new" attachments are all
+different; "duplicate" ones repeat the same bytes, so they are hashed and
+linked to the stored copy. ``disk_mb`` is what each run added under
+EVIDENCE_DIR and ``peak_kb`` the Python heap peak of one such request,
+which stays flat as files grow because parts go to disk as they arrive.
+Request bodies are built before timing. The largest attachment is then
+downloaded whole and as 64 KiB ranges from random offsets.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("DB_PATH", os.path.join(tempfile.mkdtemp(prefix="bench-"), "complaints.db"))
+
+import app  # noqa: E402
+from benchmarks import report  # noqa: E402
+from werkzeug.test import EnvironBuilder  # noqa: E402
+
+FORM = {"petitioner_name": "Bench", "petitioner_dob": "1990-01-01", "taluk": "Tenkasi",
+        "firka": "Kallurani", "village": "Melapavoor", "description": "benchmark petition"}
+RANGE_BYTES = 64 * 1024
+
+
+def disk_bytes() -> int:
+    total = 0
+    for root, _, files in os.walk(app.EVIDENCE_DIR):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def upload_environ(payload: bytes, name: str) -> dict:
+    with tempfile.TemporaryFile() as fh:
+        fh.write(payload)
+        fh.seek(0)
+        builder = EnvironBuilder(path="/submit", method="POST", data=dict(FORM, evidence=(fh, name)))
+        try:
+            environ = builder.get_environ()
+        finally:
+            builder.close()
+    return environ
+
+
+def post(client, environ: dict) -> str:
+    resp = client.open(environ)
+    body = resp.get_json()
+    if resp.status_code != 200:
+        raise SystemExit(f"/submit answered {resp.status_code}: {body}")
+    return body["complaint_id"]
+
+
+def run_uploads(client, size: int, uploads: int, duplicate: bool, rng: random.Random):
+    base = rng.randbytes(size)
+    environs = [upload_environ(base if duplicate else n.to_bytes(8, "big") + base[8:], f"photo-{n}.jpg")
+                for n in range(uploads + 1)]
+    tracemalloc.start()
+    post(client, environs.pop())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    before = disk_bytes()
+    samples, cids = [], []
+    for environ in environs:
+        started = time.perf_counter()
+        cids.append(post(client, environ))
+        samples.append(time.perf_counter() - started)
+    label = f"{round(size / 2**20, 2):g} MB {'duplicate' if duplicate else 'new'}"
+    row = report.summarize(f"upload {label}", samples, disk_mb=f"{(disk_bytes() - before) / 2**20:.1f}",
+                           peak_kb=f"{peak / 1024:.0f}", mb_s=f"{size * len(samples) / sum(samples) / 2**20:.0f}")
+    return row, cids[-1]
+
+
+def run_downloads(officer, cid: str, seconds: float, rng: random.Random) -> list:
+    sha256, _, _, size = app.list_evidence([cid])[cid][0]
+    url = f"/officer/evidence/{cid}/{sha256}"
+    whole = report.measure(lambda: officer.get(url).get_data(), seconds)
+
+    def ranged():
+        start = rng.randrange(max(1, size - RANGE_BYTES))
+        resp = officer.get(url, headers={"Range": f"bytes={start}-{start + RANGE_BYTES - 1}"})
+        assert resp.status_code == 206
+        resp.get_data()
+
+    return [report.summarize(f"download {round(size / 2**20, 2):g} MB", whole,
+                             mb_s=f"{size * len(whole) / sum(whole) / 2**20:.0f}"),
+            report.summarize("download 64 KiB range", report.measure(ranged, seconds))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-mb", default="0.1,1,10")
+    parser.add_argument("--uploads", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=2.0, help="time spent on each download kind")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="write results here for benchmarks.report")
+    args = parser.parse_args()
+
+    app.MONTHLY_COMPLAINT_LIMIT = 0
+    app.QUOTA_WINDOW_LIMIT = 0
+    app.app.config["SESSION_COOKIE_SECURE"] = False
+    sizes = [int(float(mb) * 2**20) for mb in args.sizes_mb.split(",")]
+    app.EVIDENCE_MAX_BYTES = max(app.EVIDENCE_MAX_BYTES, max(sizes))
+    app.EVIDENCE_REQUEST_MAX = app.EVIDENCE_MAX_BYTES + 2**20
+    client = app.app.test_client()
+    client.post("/register", data={"mobile": "9000000001", "password": "bench-password"})
+    client.post("/login", data={"mobile": "9000000001", "password": "bench-password"})
+    officer = app.app.test_client()
+    officer.post("/officer/login", data={"pin": app.OFFICER_PIN})
+    rng = random.Random(args.seed)
+    rows = []
+    for size in sizes:
+        for duplicate in (False, True):
+            row, cid = run_uploads(client, size, args.uploads, duplicate, rng)
+            rows.append(row)
+    rows.extend(run_downloads(officer, cid, args.seconds, rng))
+    print(f"{args.uploads} uploads per row; evidence in {app.EVIDENCE_DIR}")
+    report.print_table(rows, extra=("mb_s", "disk_mb", "peak_kb"))
+    if args.json:
+        report.write_json(args.json, "evidence", rows, vars(args))
+
+
+if __name__ == "__main__":
+    main()
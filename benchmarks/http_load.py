@@ -0,0 +1,244 @@
+"""HTTP load driver for the main pages.
+
+    python -m benchmarks.http_load --concurrency 8 --seconds 20
+    python -m benchmarks.http_load --gunicorn 4 --concurrency 32 --json load.json
+    python -m benchmarks.http_load --url http://127.0.0.1:8000 --users 2000 --complaints 100000
+
+Every virtual user logs in as a seeded citizen and as an officer. It then
+picks requests from ``--mix`` back to back until time runs out (a closed
+loop). By default this runs in-process on Flask's test client. ``--gunicorn N``
+starts a local gunicorn with N workers on the seeded scratch database.
+``--url`` drives a server you started yourself. That server's database must
+be filled with ``benchmarks.datagen`` using the same --users/--complaints/--seed,
+and it must run with QUOTA_MONTHLY_LIMIT=0, or /submit soon answers 429.
+"""
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+os.environ.setdefault("DB_PATH", os.path.join(tempfile.mkdtemp(prefix="bench-"), "complaints.db"))
+
+import app  # noqa: E402
+from benchmarks import datagen, report  # noqa: E402
+
+DEFAULT_MIX = "index=25,submit=5,track=25,panel=15,pdf=30"
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpSession:
+    """Minimal cookie-keeping client for a live server.
+
+    Cookies are kept by hand because the session cookie is marked Secure
+    and a local benchmark talks plain HTTP.
+    """
+
+    def __init__(self, base: str):
+        self.base = base.rstrip("/")
+        self.cookies = {}
+        self.location = None
+        self.opener = urllib.request.build_opener(_NoRedirect)
+
+    def request(self, method: str, path: str, data: dict | None = None) -> int:
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        req = urllib.request.Request(self.base + path, data=body, method=method)
+        if self.cookies:
+            req.add_header("Cookie", "; ".join(f"{k}={v}" for k, v in self.cookies.items()))
+        try:
+            resp = self.opener.open(req, timeout=30)
+        except urllib.error.HTTPError as exc:
+            resp = exc
+        with resp:
+            resp.read()
+            self.location = resp.headers.get("Location")
+            for header in resp.headers.get_all("Set-Cookie") or []:
+                name, _, value = header.split(";", 1)[0].partition("=")
+                self.cookies[name.strip()] = value
+            return resp.status
+
+    def get(self, path: str) -> int:
+        return self.request("GET", path)
+
+    def post(self, path: str, data: dict) -> int:
+        return self.request("POST", path, data)
+
+
+class ClientSession:
+    """Same interface over Flask's in-process test client."""
+
+    def __init__(self):
+        self.client = app.app.test_client()
+        self.location = None
+
+    def get(self, path: str) -> int:
+        return self.client.get(path).status_code
+
+    def post(self, path: str, data: dict) -> int:
+        resp = self.client.post(path, data=data)
+        self.location = resp.headers.get("Location")
+        return resp.status_code
+
+
+def scenarios(args, rng: random.Random, citizen, officer, mobile: str):
+    places = [(t, f, v) for t, fs in app.locations.items() for f, vs in fs.items() for v in vs]
+
+    def some_id():
+        return datagen.complaint_id(rng.randrange(args.complaints))
+
+    def submit():
+        taluk, firka, village = rng.choice(places)
+        return citizen.post("/submit", {
+            "petitioner_name": "Load Test", "petitioner_dob": "1990-01-01", "taluk": taluk, "firka": firka,
+            "village": village, "description": " ".join(datagen.description(rng).split()[:40]),
+        })
+
+    def track():
+        # the search is posted, then its results fetched from the redirect
+        status = citizen.post("/track", {"key": some_id() if rng.random() < 0.5 else mobile})
+        return citizen.get(citizen.location) if status == 303 else status
+
+    return {
+        "index": lambda: citizen.get("/"),
+        "submit": submit,
+        "track": track,
+        "panel": lambda: officer.get("/officer/panel" + rng.choice(
+            ["", "?status=Pending", f"?taluk={urllib.parse.quote(rng.choice(sorted(app.locations)))}"])),
+        "pdf": lambda: citizen.get(f"/petition/{some_id()}/download"),
+    }
+
+
+def run(args, make_session) -> list:
+    mix = [(name, float(weight)) for name, weight in (part.split("=") for part in args.mix.split(","))]
+    names, weights = [n for n, _ in mix], [w for _, w in mix]
+    samples = {n: [] for n in names}
+    codes = {n: {} for n in names}
+    lock = threading.Lock()
+    barrier = threading.Barrier(args.concurrency + 1)
+    window = {}
+
+    def user(n):
+        rng = random.Random(args.seed * 1000 + n)
+        mobile = datagen.mobile_for(rng.randrange(args.users), args.seed)
+        citizen, officer = make_session(), make_session()
+        citizen.post("/login", {"mobile": mobile, "password": datagen.BENCH_PASSWORD})
+        officer.post("/officer/login", {"pin": args.officer_pin})
+        calls = scenarios(args, rng, citizen, officer, mobile)
+        local = {name: [] for name in names}
+        local_codes = {name: {} for name in names}
+        barrier.wait()
+        while time.perf_counter() < window["end"]:
+            name = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            status = calls[name]()
+            local[name].append(time.perf_counter() - started)
+            local_codes[name][status] = local_codes[name].get(status, 0) + 1
+        with lock:
+            for name in names:
+                samples[name].extend(local[name])
+                for status, count in local_codes[name].items():
+                    codes[name][status] = codes[name].get(status, 0) + count
+
+    threads = [threading.Thread(target=user, args=(n,)) for n in range(args.concurrency)]
+    for t in threads:
+        t.start()
+    window["end"] = float("inf")
+    # logins (password hashing) happen before the barrier and are not measured
+    barrier.wait()
+    started = time.perf_counter()
+    window["end"] = started + args.seconds
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    rows = []
+    for name in names:
+        failed = sum(count for status, count in codes[name].items() if status >= 400)
+        rows.append(report.summarize(name, samples[name], elapsed, errors=failed,
+                                     codes=",".join(f"{s}:{c}" for s, c in sorted(codes[name].items()))))
+    rows.append(report.summarize("all", [s for n in names for s in samples[n]], elapsed,
+                                 errors=sum(r["errors"] for r in rows), codes=""))
+    return rows
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(workers: int, threads: int):
+    port = _free_port()
+    env = dict(os.environ, DB_PATH=app.DB_PATH, QUOTA_MONTHLY_LIMIT="0", QUOTA_WINDOW_LIMIT="0")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-w", str(workers), "--threads", str(threads),
+         "-b", f"127.0.0.1:{port}", "app:app"],
+        cwd=root, env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(200):
+        try:
+            urllib.request.urlopen(url + "/locations", timeout=1).read()
+            return proc, url
+        except OSError:
+            if proc.poll() is not None:
+                sys.exit("gunicorn exited during start-up")
+            time.sleep(0.1)
+    proc.terminate()
+    sys.exit("gunicorn did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--complaints", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario=weight,...")
+    parser.add_argument("--url", help="drive an already running server")
+    parser.add_argument("--gunicorn", type=int, metavar="WORKERS", help="start a local gunicorn with this many workers")
+    parser.add_argument("--gunicorn-threads", type=int, default=1)
+    parser.add_argument("--officer-pin", default=app.OFFICER_PIN)
+    parser.add_argument("--json", help="write results here for benchmarks.report")
+    args = parser.parse_args()
+
+    proc = None
+    if not args.url:
+        added = datagen.populate(args.users, args.complaints, args.seed)
+        if added["complaints"]:
+            print(f"seeded {added['complaints']} complaints in {added['seconds']:.1f}s")
+    if args.gunicorn:
+        proc, args.url = start_gunicorn(args.gunicorn, args.gunicorn_threads)
+    try:
+        if args.url:
+            rows = run(args, lambda: HttpSession(args.url))
+        else:
+            app.app.config["SESSION_COOKIE_SECURE"] = False
+            app.MONTHLY_COMPLAINT_LIMIT = 0
+            app.QUOTA_WINDOW_LIMIT = 0
+            rows = run(args, ClientSession)
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+    target = args.url or "test client"
+    print(f"{target}, {args.concurrency} users, {args.seconds:.0f}s")
+    report.print_table(rows, extra=("errors", "codes"))
+    if args.json:
+        report.write_json(args.json, "http_load", rows, vars(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Cost of rejecting a throttled login vs. checking a password.
+
+    python -m benchmarks.login_throttle --n 2000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DB_PATH", os.path.join(tempfile.mkdtemp(prefix="bench-"), "complaints.db"))
+
+import app  # noqa: E402
+
+
+def per_call(fn, n: int) -> float:
+    started = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - started) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=2000)
+    args = parser.parse_args()
+    app.app.config["SESSION_COOKIE_SECURE"] = False
+    app.create_user("9000000000", "correct horse")
+    stored = app.get_user("9000000000")[1]
+    limiter = app.login_mobile_limiter
+    # the test client's address
+    key = app.login_key("9000000000", "127.0.0.1")
+    for _ in range(limiter.limit):
+        limiter.hit(key)
+
+    def shared_lookup():
+        limiter._local.clear()
+        limiter.blocked(key)
+
+    client = app.app.test_client()
+    form = {"mobile": "9000000000", "password": "wrong"}
+    rows = [
+        ("blocked(), in-memory reject", per_call(lambda: limiter.blocked(key), args.n)),
+        ("blocked(), SQLite lookup", per_call(shared_lookup, args.n)),
+        ("POST /login, throttled (429)", per_call(lambda: client.post("/login", data=form), max(1, args.n // 10))),
+        ("check_password_hash", per_call(lambda: app.check_password_hash(stored, "wrong"), 5)),
+    ]
+    print(f"{'path':<32} {'us/call':>12}")
+    for label, us in rows:
+        print(f"{label:<32} {us:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Micro-benchmarks for each DB helper, petition downloads and page revalidation.
+
+    python -m benchmarks.micro --complaints 100000 --json micro.json
+    python -m benchmarks.micro --only search,download
+
+Every case runs for ``--seconds`` against a database seeded by
+``benchmarks.datagen``. Arguments rotate through real ids, mobiles and
+places so results do not reflect one hot row. Write cases run last because
+they change the data.
+"""
+import argparse
+import os
+import random
+import tempfile
+
+os.environ.setdefault("DB_PATH", os.path.join(tempfile.mkdtemp(prefix="bench-"), "complaints.db"))
+
+import app  # noqa: E402
+from benchmarks import datagen, report  # noqa: E402
+
+
+def _samples(conn, rng: random.Random):
+    ids = [r[0] for r in conn.execute("SELECT id FROM complaints ORDER BY random() LIMIT 2000")]
+    mobiles = [r[0] for r in conn.execute("SELECT mobile FROM users ORDER BY random() LIMIT 2000")]
+    keys = [tuple(r) for r in conn.execute("SELECT created_at, id FROM complaints ORDER BY random() LIMIT 500")]
+    taluks = sorted(app.locations)
+    rng.shuffle(ids)
+    return ids, mobiles, keys, taluks
+
+
+def cases(rng: random.Random):
+    with app.get_conn() as conn:
+        ids, mobiles, keys, taluks = _samples(conn, rng)
+    pick = rng.choice
+    now = app.datetime.now()
+    client = app.app.test_client()
+    tags = {}
+
+    def download(cid, headers=None):
+        resp = client.get(f"/petition/{cid}/download", headers=headers or {})
+        assert resp.status_code in (200, 304), resp.status_code
+        tags.setdefault(cid, resp.headers.get("ETag"))
+
+    def download_revalidate():
+        cid = pick(warm)
+        download(cid, {"If-None-Match": tags[cid]})
+
+    def download_cold():
+        app.pdf_cache = app.PdfCache(app.PDF_CACHE_MAX_BYTES)
+        download(pick(ids))
+
+    def charge_quota():
+        # the ledger reads and upserts every submission makes, with both rules on
+        app.MONTHLY_COMPLAINT_LIMIT = app.QUOTA_WINDOW_LIMIT = 10**9
+        try:
+            with app.get_conn() as conn:
+                app.charge_quota(conn, pick(mobiles), now)
+        finally:
+            app.MONTHLY_COMPLAINT_LIMIT = app.QUOTA_WINDOW_LIMIT = 0
+
+    def page(path, revalidate=False):
+        headers = {"If-None-Match": pages[path]} if revalidate else {}
+        resp = client.get(path, headers=headers)
+        assert resp.status_code in (200, 304), resp.status_code
+        pages.setdefault(path, resp.headers.get("ETag"))
+
+    warm = ids[:50]
+    for cid in warm:
+        download(cid)
+    with client.session_transaction() as sess:
+        sess["user_mobile"] = mobiles[0]
+        # searches as POST /track would remember them
+        sess["track"] = [[f"bench{n}", key] for n, key in enumerate(warm + mobiles[:50])]
+    track_paths = [f"/track/bench{n}" for n in range(len(warm) + 50)]
+    pages = {}
+    for path in ["/"] + track_paths:
+        page(path)
+    submitted = iter(range(10**9))
+    reads = [
+        ("get_user", lambda: app.get_user(pick(mobiles))),
+        ("get_by_id", lambda: app.get_by_id(pick(ids))),
+        ("get_version", lambda: app.get_version(pick(ids))),
+        ("get_with_version", lambda: app.get_with_version(pick(ids))),
+        ("get_user_version", lambda: app.get_user_version(pick(mobiles))),
+        ("find_complaints_by_mobile", lambda: app.find_complaints_by_mobile(pick(mobiles))),
+        ("list_all_complaints first page", lambda: app.list_all_complaints(limit=51)),
+        ("list_all_complaints deep page", lambda: app.list_all_complaints(limit=51, before=pick(keys))),
+        ("list_all_complaints taluk+status", lambda: app.list_all_complaints(
+            {"taluk": pick(taluks), "status": "Pending"}, limit=51)),
+        ("count_complaints", lambda: app.count_complaints()),
+        ("count_complaints taluk+status", lambda: app.count_complaints({"taluk": pick(taluks), "status": "Pending"})),
+        ("search_complaints", lambda: app.search_complaints(pick(datagen.ENGLISH + datagen.TAMIL), limit=50)),
+        ("search_complaints + taluk", lambda: app.search_complaints(pick(datagen.ENGLISH), {"taluk": pick(taluks)})),
+        ("count_search_matches", lambda: app.count_search_matches(pick(datagen.ENGLISH))),
+        ("complaint_stats all", lambda: app.complaint_stats()),
+        ("complaint_stats taluk", lambda: app.complaint_stats(pick(taluks))),
+        ("index render", lambda: page("/")),
+        ("index 304", lambda: page("/", revalidate=True)),
+        ("track render", lambda: page(pick(track_paths))),
+        ("track 304", lambda: page(pick(track_paths), revalidate=True)),
+        ("download warm (cache)", lambda: download(pick(warm))),
+        ("download 304", download_revalidate),
+        ("download cold (render)", download_cold),
+    ]
+    writes = [
+        ("update_status", lambda: app.update_status(pick(ids), pick(app.STATUS_VALUES))),
+        ("update_response_and_resolve", lambda: app.update_response_and_resolve(pick(ids), "Action taken.")),
+        ("charge_quota", charge_quota),
+        ("batch_update_complaints x50", lambda: app.batch_update_complaints(rng.sample(ids, 50), "In Progress")),
+        ("submit_complaint", lambda: app.submit_complaint({
+            "id": f"m{next(submitted):07d}", "mobile": pick(mobiles), "petitioner_name": "Bench",
+            "petitioner_dob": "1990-01-01", "taluk": "Tenkasi", "firka": "Tenkasi", "village": "Ilanji",
+            "description": "benchmark petition", "response_text": None, "status": "Pending",
+            "created_at": app.db_timestamp(app.datetime.now()),
+        })),
+    ]
+    return reads + writes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--complaints", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--seconds", type=float, default=1.0, help="time per case")
+    parser.add_argument("--only", help="comma-separated substrings of case names")
+    parser.add_argument("--json", help="write results here for benchmarks.report")
+    args = parser.parse_args()
+    added = datagen.populate(args.users, args.complaints, args.seed)
+    if added["complaints"]:
+        print(f"seeded {added['complaints']} complaints in {added['seconds']:.1f}s")
+    app.MONTHLY_COMPLAINT_LIMIT = 0
+    app.QUOTA_WINDOW_LIMIT = 0
+    only = args.only.split(",") if args.only else None
+    rows = []
+    for name, fn in cases(random.Random(args.seed)):
+        if only and not any(o in name for o in only):
+            continue
+        rows.append(report.summarize(name, report.measure(fn, args.seconds)))
+    report.print_table(rows)
+    if args.json:
+        report.write_json(args.json, "micro", rows, vars(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Login throughput for each password hash setting.
+
+For every method this verifies a correct password in one thread (logins/sec
+on a single core) and then through ``app.PasswordHasher`` with concurrent
+callers (aggregate logins/sec, and that divided by the workers used). Pick
+the most expensive setting whose per-core rate still covers peak logins.
+
+    python -m benchmarks.password_hash --methods scrypt:32768:8:1,pbkdf2:sha256:600000
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("DB_PATH", os.path.join(tempfile.mkdtemp(prefix="bench-"), "complaints.db"))
+
+import app  # noqa: E402
+
+DEFAULT_METHODS = ",".join([
+    "scrypt:16384:8:1",
+    "scrypt:32768:8:1",
+    "pbkdf2:sha256:600000",
+    "pbkdf2:sha256:1000000",
+])
+
+
+def single_core(stored: str, seconds: float) -> float:
+    n, started = 0, time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        app.check_password_hash(stored, "correct horse")
+        n += 1
+    return n / (time.perf_counter() - started)
+
+
+def pooled(hasher, stored: str, callers: int, seconds: float) -> float:
+    done = [0] * callers
+    deadline = time.perf_counter() + seconds
+
+    def caller(i):
+        while time.perf_counter() < deadline:
+            hasher.verify(stored, "correct horse")
+            done[i] += 1
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(callers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sum(done) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--methods", default=DEFAULT_METHODS)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+    print(f"{'method':<24} {'hash ms':>8} {'1 core/s':>9} {f'pool({args.workers})/s':>11} {'per core/s':>11}")
+    for method in args.methods.split(","):
+        hasher = app.PasswordHasher(method=method, workers=args.workers, max_pending=args.workers)
+        started = time.perf_counter()
+        stored = hasher.hash("correct horse")
+        hash_ms = (time.perf_counter() - started) * 1000
+        one = single_core(stored, args.seconds)
+        pool = pooled(hasher, stored, args.workers, args.seconds)
+        print(f"{method:<24} {hash_ms:>8.1f} {one:>9.1f} {pool:>11.1f} {pool / args.workers:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
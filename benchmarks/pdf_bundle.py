@@ -0,0 +1,42 @@
+"""Bulk petition rendering throughput (pages/s) as the process pool grows.
+
+    python -m benchmarks.pdf_bundle --rows 2000 --workers 1,2,4,8
+"""
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DB_PATH", os.path.join(tempfile.mkdtemp(prefix="bench-"), "complaints.db"))
+
+import app  # noqa: E402
+from benchmarks import datagen  # noqa: E402
+
+
+def seed(rows: int):
+    datagen.populate(users=max(1, rows // 20), complaints=rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--workers", default="1,2,4")
+    args = parser.parse_args()
+    seed(args.rows)
+    print(f"{'workers':>8} {'pages':>7} {'seconds':>8} {'pages/s':>8} {'zip MB':>7}")
+    for workers in [int(w) for w in args.workers.split(",")]:
+        with app.pdf_process_pool(workers) as pool:
+            # warm the pool so process start-up isn't billed to rendering
+            list(pool.map(app._render_chunk, [[]] * workers))
+            started = time.perf_counter()
+            size = 0
+            rendered = list(app.render_petition_files(app.iter_complaints_with_evidence(), pool, window=workers * 2))
+            for chunk in app.stream_petition_zip(rendered):
+                size += len(chunk)
+            pages = len(rendered)
+            elapsed = time.perf_counter() - started
+        print(f"{workers:>8} {pages:>7} {elapsed:>8.2f} {pages / elapsed:>8.1f} {size / 1e6:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
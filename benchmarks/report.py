@@ -0,0 +1,113 @@
+"""Timing helpers and result tables shared by the benchmarks.
+
+Results are rows of ``{"name", "n", "ops_s", "p50_ms", "p95_ms", "p99_ms",
+"max_ms"}``. ``--json`` on a benchmark writes them together with the git
+commit, and this module compares two such files:
+
+    python -m benchmarks.report before.json after.json
+"""
+import argparse
+import json
+import platform
+import sqlite3
+import subprocess
+import sys
+import time
+
+
+def measure(fn, seconds: float = 1.0, min_calls: int = 5, warmup: int = 2) -> list:
+    """Call ``fn`` repeatedly for about ``seconds``; returns per-call seconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    deadline = time.perf_counter() + seconds
+    while len(samples) < min_calls or time.perf_counter() < deadline:
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def percentile(ordered: list, q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else 0.0
+
+
+def summarize(name: str, samples: list, elapsed: float | None = None, **extra) -> dict:
+    """``elapsed`` is wall time for concurrent runs; otherwise samples add up."""
+    ordered = sorted(samples)
+    wall = elapsed if elapsed is not None else sum(ordered)
+    row = {
+        "name": name,
+        "n": len(ordered),
+        "ops_s": len(ordered) / wall if wall else 0.0,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "max_ms": (ordered[-1] if ordered else 0.0) * 1000,
+    }
+    row.update(extra)
+    return row
+
+
+def print_table(rows: list, extra: tuple = ()):
+    width = max([len(r["name"]) for r in rows] + [8])
+    head = f"{'name':<{width}} {'n':>7} {'ops/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    print(head + "".join(f" {col:>8}" for col in extra))
+    for r in rows:
+        line = (f"{r['name']:<{width}} {r['n']:>7} {r['ops_s']:>9.1f} {r['p50_ms']:>8.2f} "
+                f"{r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['max_ms']:>8.2f}")
+        print(line + "".join(f" {r.get(col, ''):>8}" for col in extra))
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_json(path: str, benchmark: str, rows: list, args: dict):
+    with open(path, "w") as fh:
+        json.dump({
+            "benchmark": benchmark,
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "args": args,
+            "results": rows,
+        }, fh, indent=2)
+
+
+def compare(before: dict, after: dict):
+    old = {r["name"]: r for r in before["results"]}
+    print(f"{before.get('commit') or '?'} -> {after.get('commit') or '?'}")
+    width = max([len(r["name"]) for r in after["results"]] + [8])
+    print(f"{'name':<{width}} {'p50 ms':>9} {'->':>9} {'change':>8} {'ops/s':>9} {'->':>9} {'change':>8}")
+    for r in after["results"]:
+        o = old.get(r["name"])
+        if o is None:
+            print(f"{r['name']:<{width}} {'(new)':>9} {r['p50_ms']:>9.2f} {'':>8} {'':>9} {r['ops_s']:>9.1f}")
+            continue
+        p50 = (r["p50_ms"] / o["p50_ms"] - 1) * 100 if o["p50_ms"] else 0.0
+        ops = (r["ops_s"] / o["ops_s"] - 1) * 100 if o["ops_s"] else 0.0
+        print(f"{r['name']:<{width}} {o['p50_ms']:>9.2f} {r['p50_ms']:>9.2f} {p50:>+7.1f}% "
+              f"{o['ops_s']:>9.1f} {r['ops_s']:>9.1f} {ops:>+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+    with open(args.before) as fh:
+        before = json.load(fh)
+    with open(args.after) as fh:
+        after = json.load(fh)
+    if before.get("benchmark") != after.get("benchmark"):
+        sys.exit(f"different benchmarks: {before.get('benchmark')} vs {after.get('benchmark')}")
+    compare(before, after)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Full-text search latency on a large synthetic corpus.
+
+    python -m benchmarks.search --rows 1000000
+
+Rows come from ``benchmarks.datagen`` and mix English and Tamil text.
+Timings cover ranked search alone, search combined with location/status
+filters, and the matching COUNT.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("DB_PATH", os.path.join(tempfile.mkdtemp(prefix="bench-"), "complaints.db"))
+
+import app  # noqa: E402
+from benchmarks import datagen  # noqa: E402
+
+
+def seed(rows: int):
+    added = datagen.populate(users=max(1, rows // 20), complaints=rows, seed=7)
+    if added["complaints"]:
+        print(f"seeded {added['complaints']} rows in {added['seconds']:.1f}s "
+              f"({added['complaints'] / added['seconds']:.0f} rows/s)")
+
+
+def timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[max(0, int(len(samples) * 0.95) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+    seed(args.rows)
+    cases = [
+        ("english word", "harassment", None),
+        ("english prefix", "harass", None),
+        ("two words", "school teacher", None),
+        ("tamil word", "ஆசிரியர்", None),
+        ("name", "Lakshmi", None),
+        ("word + taluk", "dowry", {"taluk": "Tenkasi"}),
+        ("word + status/taluk", "stalking", {"status": "Pending", "taluk": "Sivagiri"}),
+    ]
+    print(f"{'case':<22} {'search p50':>11} {'search p95':>11} {'count p50':>10} {'matches':>9}")
+    for label, text, filters in cases:
+        s50, s95 = timed(lambda: app.search_complaints(text, filters, limit=50), args.repeat)
+        c50, _ = timed(lambda: app.count_search_matches(text, filters), max(3, args.repeat // 10))
+        print(f"{label:<22} {s50:>9.1f}ms {s95:>9.1f}ms {c50:>8.1f}ms {app.count_search_matches(text, filters):>9}")
+
+
+if __name__ == "__main__":
+    main()
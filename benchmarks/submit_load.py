@@ -0,0 +1,68 @@
+"""Submission throughput and latency: direct commits vs. the group-commit writer.
+
+    python -m benchmarks.submit_load --threads 32 --per-thread 50
+
+Each thread plays one citizen (its own mobile) submitting complaints back
+to back, the way concurrent /submit requests hit one gunicorn worker.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+
+os.environ.setdefault("DB_PATH", os.path.join(tempfile.mkdtemp(prefix="bench-"), "complaints.db"))
+
+import app  # noqa: E402
+
+
+def run(threads: int, per_thread: int, batching: bool):
+    app.SUBMIT_BATCHING = batching
+    app.MONTHLY_COMPLAINT_LIMIT = per_thread + 1
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def citizen(n):
+        mobile = f"{'b' if batching else 'd'}{n:05d}-{uuid.uuid4().hex[:6]}"
+        local = []
+        barrier.wait()
+        for _ in range(per_thread):
+            complaint = {
+                "mobile": mobile, "petitioner_name": "Load", "petitioner_dob": "2000-01-01",
+                "taluk": "Tenkasi", "firka": "Tenkasi", "village": "Ilanji", "description": "load test " * 20,
+                "response_text": None, "status": "Pending", "created_at": app.db_timestamp(app.datetime.now()),
+            }
+            started = time.perf_counter()
+            app.submit_complaint(complaint)
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=citizen, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+    return len(latencies) / elapsed, statistics.median(latencies) * 1000, p99 * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--per-thread", type=int, default=50)
+    args = parser.parse_args()
+    print(f"{'mode':<10} {'submits/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for label, batching in (("direct", False), ("batched", True)):
+        rate, p50, p99 = run(args.threads, args.per_thread, batching)
+        print(f"{label:<10} {rate:>10.0f} {p50:>8.2f} {p99:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Gunicorn settings, read automatically when gunicorn starts in this directory."""
+import os
+
+# Import the app once in the master and fork the workers from it. Code
+# changes then need a restart; a HUP reload keeps the loaded code.
+preload_app = True
+# the master migrates in on_starting instead
+os.environ["MIGRATE_ON_IMPORT"] = "0"
+# /officer/events streams hold a request thread each; a sync worker would
+# be tied up by one officer panel
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+
+
+def on_starting(server):
+    # once per start, before any worker exists
+    import app
+
+    for name, seconds in app.init_db():
+        server.log.info("applied migration %s (%.2fs)", name, seconds)
+
+
+def post_fork(server, worker):
+    # threads don't survive the fork, so each worker starts its own snapshot writer
+    import app
+
+    if app.METRICS_ENABLED:
+        app.metrics.start_flusher()
@@ -0,0 +1,111 @@
+import itertools
+import os
+import tempfile
+from datetime import datetime
+
+# app reads its configuration at import
+os.environ.setdefault("DB_PATH", os.path.join(tempfile.mkdtemp(prefix="portal-tests-"), "complaints.db"))
+os.environ.setdefault("OFFICER_PIN", "test-pin")
+
+import pytest  # noqa: E402
+
+import app as portal  # noqa: E402
+
+portal.app.config.update(TESTING=True, SESSION_COOKIE_SECURE=False)
+
+
+@pytest.fixture
+def client():
+    return portal.app.test_client()
+
+
+@pytest.fixture
+def officer(client):
+    """A client holding an officer session."""
+    assert client.post("/officer/login", data={"pin": os.environ["OFFICER_PIN"]}).status_code == 302
+    return client
+
+
+_complaint_ids = itertools.count()
+
+
+@pytest.fixture
+def make_complaint():
+    """Files a complaint and returns its id; any field can be overridden.
+
+    ``created_at`` may be a datetime. Complaints go in with insert_complaint
+    under fresh, increasing ids unless one is given; ``submit=True`` files
+    through submit_complaint instead, which generates the id and charges
+    the quota.
+    """
+    def make(submit: bool = False, **fields) -> str:
+        c = dict(mobile="9000000001", petitioner_name="Test", petitioner_dob="1990-01-01", taluk="Tenkasi",
+                 firka="Kallurani", village="Melapavoor", description="x", status="Pending",
+                 created_at=datetime(2025, 1, 1, 9))
+        c.update(fields)
+        if isinstance(c["created_at"], datetime):
+            c["created_at"] = portal.db_timestamp(c["created_at"])
+        if submit:
+            return portal.submit_complaint(c)
+        c.setdefault("id", f"t{next(_complaint_ids):06d}")
+        portal.insert_complaint(c)
+        return c["id"]
+
+    return make
+
+
+@pytest.fixture(scope="session")
+def pg_url(tmp_path_factory):
+    """A PostgreSQL server: TEST_DATABASE_URL if set, else a throwaway one from pgserver."""
+    url = os.environ.get("TEST_DATABASE_URL")
+    if url:
+        yield url
+        return
+    pgserver = pytest.importorskip("pgserver", reason="set TEST_DATABASE_URL or install pgserver")
+    server = pgserver.get_server(str(tmp_path_factory.mktemp("pg")), cleanup_mode="stop")
+    yield server.get_uri()
+    server.cleanup()
+
+
+def _fresh_pg_database(url: str, name: str) -> str:
+    psycopg = pytest.importorskip("psycopg")
+    pytest.importorskip("psycopg_pool")
+    with psycopg.connect(url, autocommit=True) as conn:
+        conn.execute(f"DROP DATABASE IF EXISTS {name}")
+        try:
+            # a linguistic collation, as most servers default to, where byte-order tricks fail
+            conn.execute(f"CREATE DATABASE {name} TEMPLATE template0 LOCALE_PROVIDER icu ICU_LOCALE 'en-US'")
+        except psycopg.errors.FeatureNotSupported:
+            conn.execute(f"CREATE DATABASE {name} TEMPLATE template0")
+    return psycopg.conninfo.make_conninfo(url, dbname=name)
+
+
+def sqlite_store(tmp_path):
+    pool = portal.ConnectionPool(str(tmp_path / "complaints.db"), 4, attach={"archive": str(tmp_path / "archive.db")})
+    return portal.SqliteStore(pool)
+
+
+@pytest.fixture
+def scratch_store(tmp_path, monkeypatch):
+    """The active store swapped for an empty, migrated SQLite database."""
+    store = sqlite_store(tmp_path)
+    monkeypatch.setattr(portal, "store", store)
+    portal._quota_exhausted.clear()
+    store.migrate()
+    return store
+
+
+@pytest.fixture(params=["sqlite", "postgres"])
+def backend(request, tmp_path, monkeypatch):
+    """The active store swapped for an empty, migrated database on each backend."""
+    if request.param == "sqlite":
+        store = sqlite_store(tmp_path)
+    else:
+        url = _fresh_pg_database(request.getfixturevalue("pg_url"), "portal_contract")
+        store = portal.PostgresStore(url, 1, 4)
+    monkeypatch.setattr(portal, "store", store)
+    portal._quota_exhausted.clear()
+    store.migrate()
+    yield store
+    if request.param == "postgres":
+        store._get_pool().close()
@@ -0,0 +1,61 @@
+from datetime import datetime
+
+from click.testing import CliRunner
+
+import app as portal
+
+def closed_in(year: int = 2023) -> datetime:
+    return datetime(year, 4, 2, 9)
+
+
+def archived_ids() -> list:
+    with portal.get_conn() as conn:
+        return [r[0] for r in conn.execute("SELECT id FROM archive.complaints ORDER BY id")]
+
+
+def test_old_closed_complaints_move_and_stay_findable(client, scratch_store, make_complaint):
+    old = make_complaint(status="Resolved", created_at=closed_in())
+    rejected = make_complaint(status="Rejected", created_at=closed_in())
+    pending = make_complaint(status="Pending", created_at=closed_in())
+    recent = make_complaint(status="Resolved", created_at=closed_in(datetime.now().year + 1))
+    result = CliRunner().invoke(portal.archive_complaints_command, ["--days", "30", "--batch-size", "1"])
+    assert result.exit_code == 0 and "2 complaints moved" in result.output
+    assert archived_ids() == [old, rejected]
+    assert portal.count_complaints({}) == 2
+    assert portal.get_by_id(old)[9] == "Resolved"
+    assert client.get(f"/petition/{old}/download").data.startswith(b"%PDF")
+    # the moved rows keep counting
+    assert sorted(portal.complaint_stats(from_month="2023-01", to_month="2023-12")[1]) == [
+        ("2023-04", "Tenkasi", "Pending", 1), ("2023-04", "Tenkasi", "Rejected", 1), ("2023-04", "Tenkasi", "Resolved", 1)]
+    assert portal.stats_drift() == []
+    assert portal.archive_complaints(30) == 0
+
+
+def test_update_between_copy_and_delete_keeps_the_complaint_hot(scratch_store, monkeypatch, make_complaint):
+    cid = make_complaint(status="Resolved", created_at=closed_in())
+    drop = portal._drop_archived_copies
+
+    def reopened_meanwhile(ids, cutoff):
+        portal.update_status(cid, "In Progress")
+        return drop(ids, cutoff)
+
+    monkeypatch.setattr(portal, "_drop_archived_copies", reopened_meanwhile)
+    assert portal.archive_complaints(30) == 0
+    assert portal.get_with_version(cid)[0][9] == "In Progress"
+    assert portal.count_complaints({}) == 1 and archived_ids() == []
+    assert portal.stats_drift() == []
+
+
+def test_interrupted_move_is_finished_from_a_fresh_copy(scratch_store, monkeypatch, make_complaint):
+    cid = make_complaint(status="Resolved", created_at=closed_in())
+    drop = portal._drop_archived_copies
+    # a crash after the copy committed, then a new response before the next run
+    monkeypatch.setattr(portal, "_drop_archived_copies", lambda ids, cutoff: 0)
+    portal.archive_complaints(30)
+    monkeypatch.setattr(portal, "_drop_archived_copies", drop)
+    with portal.get_conn() as conn:
+        conn.execute("UPDATE complaints SET response_text='late note', version=version+1 WHERE id=?", (cid,))
+    assert portal.archive_complaints(30) == 1
+    assert archived_ids() == [cid] and portal.count_complaints({}) == 0
+    assert portal.get_by_id(cid)[8] == "late note"
+    assert portal.stats_drift() == []
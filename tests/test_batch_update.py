@@ -0,0 +1,54 @@
+import pytest
+
+import app as portal
+
+
+def test_batch_larger_than_one_query_is_chunked(officer, scratch_store, monkeypatch, make_complaint):
+    monkeypatch.setattr(portal, "IDS_PER_QUERY", 3)
+    ids = [make_complaint() for _ in range(8)]
+    resp = officer.post("/officer/batch-update", json={"ids": ids + ["missing"], "status": "In Progress"})
+    data = resp.get_json()
+    assert resp.status_code == 200 and data["updated"] == 8
+    assert data["results"] == {**dict.fromkeys(ids, "updated"), "missing": "not_found"}
+    assert sorted(r["id"] for r in data["rows"]) == ids
+    assert {r["status"] for r in data["rows"]} == {"In Progress"}
+    # one change-log entry per updated complaint, all from one commit
+    updates = [e for e in portal.read_changes(0, 100) if e["kind"] == "updated"]
+    assert sorted(e["row"]["id"] for e in updates) == ids
+
+
+def test_shared_response_resolves_from_a_form(officer, scratch_store, make_complaint):
+    ids = [make_complaint() for _ in range(2)]
+    resp = officer.post("/officer/batch-update", data={"ids": ids, "response_text": " Visited and counselled "})
+    assert resp.get_json()["updated"] == 2
+    assert {(r[8], r[9]) for r in map(portal.get_by_id, ids)} == {("Visited and counselled", "Resolved")}
+
+
+@pytest.mark.parametrize("body", [
+    ["batch000"],
+    "batch000",
+    {"ids": "batch000", "status": "Resolved"},
+    {"ids": ["batch000"], "response_text": ["done"]},
+    {"ids": [], "status": "Resolved"},
+    {"ids": ["batch000", 7], "status": "Resolved"},
+    {"ids": ["batch000", {"id": "batch000"}], "status": "Resolved"},
+    {"ids": ["batch000", ""], "status": "Resolved"},
+    {"ids": ["batch000", None], "status": "Resolved"},
+    {"ids": ["batch000"], "status": "Closed"},
+])
+def test_malformed_requests_get_400(officer, scratch_store, make_complaint, body):
+    make_complaint(id="batch000")
+    resp = officer.post("/officer/batch-update", json=body)
+    assert resp.status_code == 400 and resp.get_json()["status"] == "error"
+    assert portal.get_by_id("batch000")[9] == "Pending"
+
+
+def test_batch_size_is_capped(officer, scratch_store, monkeypatch):
+    monkeypatch.setattr(portal, "BATCH_UPDATE_MAX", 2)
+    resp = officer.post("/officer/batch-update", json={"ids": ["a", "b", "c"], "status": "Resolved"})
+    assert resp.status_code == 400
+
+
+def test_needs_an_officer(client):
+    resp = client.post("/officer/batch-update", json={"ids": ["a"], "status": "Resolved"})
+    assert resp.status_code == 302 and "/officer/login" in resp.headers["Location"]
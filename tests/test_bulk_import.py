@@ -0,0 +1,122 @@
+import csv
+
+import pytest
+
+import app as portal
+from conftest import sqlite_store
+
+COLUMNS = ["mobile", "petitioner_name", "petitioner_dob", "taluk", "firka", "village", "description", "created_at"]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = sqlite_store(tmp_path)
+    monkeypatch.setattr(portal, "store", store)
+    store.migrate()
+    return store
+
+
+def write_csv(path, rows: int):
+    with open(path, "w", newline="") as fh:
+        out = csv.writer(fh)
+        out.writerow(COLUMNS)
+        for n in range(rows):
+            out.writerow([f"9{n:09d}", "Import", "1990-01-01", "Tenkasi", "Kallurani", "Melapavoor",
+                          f"paper petition number {n} about a drunk neighbour", "05/03/2024"])
+
+
+def test_fingerprint_covers_the_whole_file(tmp_path):
+    path = tmp_path / "big.csv"
+    path.write_bytes(b"x" * (3 << 20))
+    before = portal._import_fingerprint(str(path))
+    with open(path, "r+b") as fh:
+        fh.seek(-1, 2)
+        fh.write(b"y")
+    assert portal._import_fingerprint(str(path)) != before
+
+
+def test_edited_file_is_not_resumed(store, tmp_path):
+    path = tmp_path / "backlog.csv"
+    write_csv(path, 30)
+    portal.bulk_import(str(path), "csv", batch_size=10)
+    with open(path, "a", newline="") as fh:
+        fh.write("9999999999,Late,1990-01-01,Tenkasi,Kallurani,Melapavoor,added later,05/03/2024\n")
+    with pytest.raises(ValueError, match="changed since the last run"):
+        portal.bulk_import(str(path), "csv", batch_size=10)
+
+
+def test_rows_without_an_id_get_repeatable_complaint_ids(store, tmp_path):
+    path = tmp_path / "backlog.csv"
+    write_csv(path, 12)
+    portal.bulk_import(str(path), "csv", batch_size=5)
+    with store.connection() as conn:
+        ids = [r[0] for r in conn.execute("SELECT id FROM complaints ORDER BY id")]
+    assert len(ids) == 12 and all(len(cid) == 16 and portal.normalize_complaint_id(cid) == cid for cid in ids)
+    # all filed on 5 March 2024, so they share the time part
+    assert {cid[:7] for cid in ids} == {portal.complaint_ids.seeded("", portal.datetime(2024, 3, 5).timestamp())[:7]}
+    with store.connection() as conn:
+        conn.execute("DELETE FROM complaints")
+    assert portal.bulk_import(str(path), "csv", batch_size=5, restart=True)["imported"] == 12
+    with store.connection() as conn:
+        assert [r[0] for r in conn.execute("SELECT id FROM complaints ORDER BY id")] == ids
+
+
+def crash_after_first_batch(monkeypatch):
+    validate = portal.validate_import_record
+
+    def dies_on_row_15(record, fingerprint, n, now):
+        if n == 15:
+            raise RuntimeError("killed")
+        return validate(record, fingerprint, n, now)
+
+    monkeypatch.setattr(portal, "validate_import_record", dies_on_row_15)
+
+
+def test_next_start_rebuilds_what_a_dead_import_skipped(store, tmp_path, monkeypatch):
+    path = tmp_path / "backlog.csv"
+    write_csv(path, 30)
+    crash_after_first_batch(monkeypatch)
+    with pytest.raises(RuntimeError):
+        portal.bulk_import(str(path), "csv", batch_size=10)
+    assert portal.count_complaints() == 10
+    assert portal.count_search_matches("drunk neighbour") == 0
+    assert portal.stats_drift()
+    steps = [name for name, _ in portal.init_db()]
+    assert steps == ["restore indexes, statistics and search index after a deferred import"]
+    assert portal.count_search_matches("drunk neighbour") == 10
+    assert portal.stats_drift() == []
+    assert portal.init_db() == []
+
+
+def test_a_start_during_a_deferred_load_leaves_it_alone(store, tmp_path, monkeypatch):
+    path = tmp_path / "backlog.csv"
+    write_csv(path, 30)
+    validate, seen = portal.validate_import_record, []
+
+    def another_start_on_row_15(record, fingerprint, n, now):
+        if n == 15:
+            seen.append(portal.init_db())
+            with store.connection() as conn:
+                seen.append(conn.execute("PRAGMA user_version").fetchone()[0])
+                seen.append(conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name=?",
+                                         ("complaints_fts_ai",)).fetchone()[0])
+        return validate(record, fingerprint, n, now)
+
+    monkeypatch.setattr(portal, "validate_import_record", another_start_on_row_15)
+    assert portal.bulk_import(str(path), "csv", batch_size=10)["imported"] == 30
+    assert seen == [[], len(portal.SQLITE_MIGRATIONS), 0]
+    assert portal.count_search_matches("drunk neighbour") == 30
+    assert portal.stats_drift() == []
+    assert portal.init_db() == []
+
+
+def test_finished_import_leaves_nothing_to_rebuild(store, tmp_path):
+    path = tmp_path / "backlog.csv"
+    write_csv(path, 25)
+    counts = portal.bulk_import(str(path), "csv", batch_size=10)
+    assert counts["imported"] == 25
+    assert portal.count_search_matches("drunk neighbour") == 25
+    assert portal.stats_drift() == []
+    with store.connection() as conn:
+        conn.execute("PRAGMA user_version=0")
+    assert "restore indexes, statistics and search index after a deferred import" not in dict(portal.init_db())
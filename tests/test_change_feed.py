@@ -0,0 +1,82 @@
+import queue
+import threading
+import time
+
+import pytest
+
+import app as portal
+
+def received(stream, timeout=2.0) -> list:
+    """Complaint ids in the change events queued for the stream."""
+    ids = []
+    while True:
+        try:
+            text = stream.queue.get(timeout=timeout)
+        except queue.Empty:
+            return ids
+        if "event: change" in text:
+            ids.append(portal.json.loads(text.split("data: ", 1)[1])["row"]["id"])
+        timeout = 0.3
+
+
+@pytest.fixture
+def feed(client):
+    return portal.ChangeFeed(0.05, 100)
+
+
+def test_reopening_at_the_head_sends_only_new_changes(feed, make_complaint):
+    stream, missed = feed.open({}, None)
+    first = make_complaint()
+    assert missed == [] and received(stream) == [first]
+    feed.close(stream)
+    # logged while no stream was open, so the poller never read them
+    skipped = [make_complaint() for _ in range(3)]
+    head = portal.change_log_bounds()[1]
+    stream, missed = feed.open({}, head)
+    assert missed == []
+    assert received(stream, 0.3) == []
+    latest = make_complaint()
+    assert received(stream) == [latest]
+    feed.close(stream)
+    # a client that was behind still gets them from the log
+    stream, missed = feed.open({}, head - len(skipped))
+    assert [portal.json.loads(m.split("data: ", 1)[1])["row"]["id"] for m in missed] == skipped + [latest]
+    feed.close(stream)
+
+
+def test_stream_skips_entries_it_already_has(feed, make_complaint):
+    stream, _ = feed.open({}, None)
+    make_complaint()
+    received(stream)
+    # a second client that already saw the next entry, e.g. from another worker
+    ahead = make_complaint()
+    later, missed = feed.open({}, portal.change_log_bounds()[1])
+    assert missed == []
+    newest = make_complaint()
+    assert received(stream) == [ahead, newest]
+    assert received(later) == [newest]
+    feed.close(stream)
+    feed.close(later)
+
+
+def test_opening_a_stream_does_not_hold_up_writers(feed, monkeypatch):
+    watching, _ = feed.open({}, None)
+    reading, release = threading.Event(), threading.Event()
+    bounds = portal.change_log_bounds
+
+    def slow_bounds():
+        reading.set()
+        release.wait(5)
+        return bounds()
+
+    monkeypatch.setattr(portal, "change_log_bounds", slow_bounds)
+    opener = threading.Thread(target=feed.open, args=({}, None))
+    opener.start()
+    assert reading.wait(5)
+    started = time.monotonic()
+    feed.poke()
+    assert time.monotonic() - started < 0.5
+    release.set()
+    opener.join(5)
+    assert feed.stream_count() == 2
+    feed.close(watching)
@@ -0,0 +1,44 @@
+import app as portal
+
+
+def random_part(cid: str) -> int:
+    n = 0
+    for ch in cid[7:]:
+        n = n * 32 + portal.CROCKFORD32.index(ch)
+    return n
+
+
+def test_ids_sort_by_second():
+    gen = portal.ComplaintIdGenerator()
+    ids = [gen.next(now=1_800_000_000 + n) for n in range(50)]
+    assert ids == sorted(ids)
+    assert all(len(cid) == 16 for cid in ids)
+
+
+def test_consecutive_ids_cannot_be_derived_from_each_other():
+    gen = portal.ComplaintIdGenerator()
+    ids = [gen.next(now=1_800_000_000) for _ in range(2000)]
+    assert len(set(ids)) == len(ids)
+    assert {cid[:7] for cid in ids} == {ids[0][:7]}
+    tails = [random_part(cid) for cid in ids]
+    # neighbours differ in about half of the 45 random bits, not by a counter step
+    flipped = [bin(a ^ b).count("1") for a, b in zip(tails, tails[1:])]
+    assert min(flipped) >= 5
+    assert 18 <= sum(flipped) / len(flipped) <= 27
+    assert max(abs(b - a) for a, b in zip(tails, tails[1:])) > 2**40
+
+
+def test_neighbouring_id_is_not_found(client):
+    complaint = dict(mobile="9000000021", petitioner_name="A", petitioner_dob="1990-01-01", taluk="Tenkasi",
+                     firka="Kallurani", village="Melapavoor", description="first petition", status="Pending",
+                     created_at=portal.db_timestamp(portal.datetime.now()))
+    cid = portal.submit_complaint(dict(complaint))
+    assert client.get(f"/petition/{cid}/download").status_code == 200
+    for step in (1, -1):
+        guess = cid[:7] + portal._base32((random_part(cid) + step) % 2**45, 9)
+        assert client.get(f"/petition/{guess}/download").status_code == 404
+
+
+def test_ids_normalize_as_typed():
+    assert portal.normalize_complaint_id("01nax-w105-s4ab-cdo") == "01NAXW105S4ABCD0"
+    assert portal.normalize_complaint_id("ABCDEF12") == "abcdef12"
@@ -0,0 +1,64 @@
+import sqlite3
+import threading
+
+import pytest
+
+import app as portal
+
+
+@pytest.fixture
+def pool(tmp_path):
+    return portal.ConnectionPool(str(tmp_path / "pool.db"), 2)
+
+
+def test_connections_are_configured_once_and_reused(pool):
+    with pool.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == portal.DB_BUSY_TIMEOUT_MS
+        first = conn
+    with pool.connection() as conn:
+        assert conn is first
+    stats = pool.stats()
+    assert (stats["misses"], stats["hits"], stats["idle"]) == (1, 1, 1)
+
+
+def test_commits_on_success_and_rolls_back_on_error(pool):
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE t (n INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+    with pytest.raises(RuntimeError):
+        with pool.connection() as conn:
+            conn.execute("INSERT INTO t VALUES (2)")
+            raise RuntimeError
+    # the connection went back to the pool clean, and only the first row is stored
+    with pool.connection() as conn:
+        assert not conn.in_transaction
+        assert conn.execute("SELECT n FROM t").fetchall() == [(1,)]
+    assert pool.stats()["idle"] == 1
+
+
+def test_checkout_waits_for_a_free_connection(pool, monkeypatch):
+    monkeypatch.setattr(portal, "DB_BUSY_TIMEOUT_MS", 100)
+    held = [pool.connection(), pool.connection()]
+    for cm in held:
+        cm.__enter__()
+    with pytest.raises(sqlite3.OperationalError, match="pool exhausted"):
+        with pool.connection():
+            pass
+    monkeypatch.setattr(portal, "DB_BUSY_TIMEOUT_MS", 5000)
+    threading.Timer(0.1, held[0].__exit__, (None, None, None)).start()
+    with pool.connection() as conn:
+        conn.execute("SELECT 1")
+    held[1].__exit__(None, None, None)
+    assert pool.stats()["waits"] == 1
+
+
+def test_a_forked_worker_gets_its_own_connections(pool, monkeypatch):
+    with pool.connection() as conn:
+        parent = conn
+    # as seen from a gunicorn worker forked after the master used the pool
+    monkeypatch.setattr(pool, "_pid", -1)
+    with pool.connection() as conn:
+        assert conn is not parent
+    assert pool.stats()["misses"] == 1
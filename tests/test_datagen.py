@@ -0,0 +1,36 @@
+from benchmarks import datagen
+from conftest import sqlite_store
+
+import app as portal
+
+
+def generated(store, monkeypatch, **sizes) -> list:
+    monkeypatch.setattr(portal, "store", store)
+    store.migrate()
+    datagen.populate(seed=7, **sizes)
+    with portal.get_conn() as conn:
+        return conn.execute(f"SELECT {portal.COMPLAINT_COLUMNS} FROM complaints ORDER BY id").fetchall()
+
+
+def test_same_seed_gives_the_same_rows(tmp_path, monkeypatch):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    first = generated(sqlite_store(tmp_path / "a"), monkeypatch, users=20, complaints=300)
+    again = generated(sqlite_store(tmp_path / "b"), monkeypatch, users=20, complaints=300)
+    assert first == again and len(first) == 300
+    assert [r[0] for r in first[:2]] == [datagen.complaint_id(0), datagen.complaint_id(1)]
+    assert {r[1] for r in first} <= {datagen.mobile_for(n, 7) for n in range(20)}
+    assert all(portal.is_valid_location(*r[4:7]) for r in first)
+    assert {r[9] for r in first} <= set(portal.STATUS_VALUES)
+
+
+def test_a_rerun_tops_up_to_the_target(tmp_path, monkeypatch):
+    store = sqlite_store(tmp_path)
+    generated(store, monkeypatch, users=10, complaints=50)
+    assert datagen.populate(10, 80, seed=7)["complaints"] == 30
+    assert datagen.populate(10, 80, seed=7)["complaints"] == 0
+    assert portal.count_complaints({}) == 80
+    # the quota ledger and statistics count the generated rows
+    with portal.get_conn() as conn:
+        assert conn.execute("SELECT SUM(n) FROM quota_ledger WHERE period LIKE 'M:%'").fetchone()[0] == 80
+    assert portal.stats_drift() == []
@@ -0,0 +1,56 @@
+import re
+
+from click.testing import CliRunner
+
+import app as portal
+
+BUS = ("the conductor on the evening town bus from tenkasi to courtallam keeps touching "
+       "schoolgirls and shouting at them when they complain to the driver")
+
+
+def test_signatures_estimate_word_pair_overlap():
+    retold = BUS.replace("keeps touching", "keeps on touching")
+    a, b = portal.description_shingles(BUS), portal.description_shingles(retold)
+    jaccard = len(a & b) / len(a | b)
+    estimate = portal.signature_similarity(portal.description_signature(BUS), portal.description_signature(retold))
+    assert abs(estimate - jaccard) < 0.2
+    # case and punctuation don't count; too little text isn't signed
+    assert portal.description_signature(BUS.upper() + "!") == portal.description_signature(BUS)
+    assert portal.description_signature("help me please") == b""
+
+
+def test_near_duplicates_are_matched_both_ways(scratch_store, make_complaint):
+    first = make_complaint(description=BUS)
+    make_complaint(description="a neighbour blocks the drain outside our house and floods the street whenever it rains heavily")
+    again = make_complaint(description="Again: " + BUS.replace("evening", "morning"))
+    short = make_complaint(description="bus conductor")
+    found = portal.list_duplicates([first, again, short])
+    assert [d for d, _ in found[again]] == [first] and [d for d, _ in found[first]] == [again]
+    assert found[again][0][1] >= portal.DUPLICATE_THRESHOLD
+    assert short not in found
+
+
+def test_panel_links_possible_duplicates(officer, scratch_store, make_complaint):
+    first = make_complaint(description=BUS)
+    again = make_complaint(description=BUS + " every day")
+    page = officer.get("/officer/panel").get_data(as_text=True)
+    row = page[page.index(f'<tr data-cid="{again}"'):]
+    row = row[:row.index("</tr>")]
+    assert re.search(rf'<td class="c-duplicates"><a href="/petition/{first}/download"[^>]*>{first}</a> '
+                     rf'<span class="helper">\d+%</span>', row)
+
+
+def test_index_duplicates_backfills_unindexed_complaints(scratch_store, make_complaint):
+    ids = [make_complaint(description=text) for text in
+           (BUS, BUS + " again", "nothing alike in this petition about water supply in the ward")]
+    with portal.get_conn() as conn:
+        # as a bulk import leaves them: in the table, not in the index
+        for table in ("complaint_duplicates", "complaint_lsh", "complaint_minhash"):
+            conn.execute(f"DELETE FROM {table}")
+    assert portal.list_duplicates(ids) == {}
+    runner = CliRunner()
+    result = runner.invoke(portal.index_duplicates_command, ["--batch-size", "2"])
+    assert result.exit_code == 0 and "3 complaints indexed, 1 possible duplicates" in result.output
+    assert [d for d, _ in portal.list_duplicates(ids)[ids[1]]] == [ids[0]]
+    assert "0 complaints indexed" in runner.invoke(portal.index_duplicates_command).output
+    assert "3 complaints indexed, 1 possible" in runner.invoke(portal.index_duplicates_command, ["--rebuild"]).output
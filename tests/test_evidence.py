@@ -0,0 +1,61 @@
+import os
+from io import BytesIO
+
+import pytest
+
+import app as portal
+
+FORM = {"petitioner_name": "Evidence", "petitioner_dob": "1990-01-01", "taluk": "Tenkasi",
+        "firka": "Kallurani", "village": "Melapavoor", "description": "photos of the threats"}
+PHOTO = bytes(range(256)) * 64
+
+
+@pytest.fixture
+def citizen(scratch_store, tmp_path, monkeypatch):
+    monkeypatch.setattr(portal, "EVIDENCE_DIR", str(tmp_path / "evidence"))
+    monkeypatch.setattr(portal, "MONTHLY_COMPLAINT_LIMIT", 0)
+    client = portal.app.test_client()
+    client.post("/register", data={"mobile": "9000001601", "password": "right-password"})
+    assert client.post("/login", data={"mobile": "9000001601", "password": "right-password"}).status_code == 302
+    return client
+
+
+def submit(client, *files) -> str:
+    resp = client.post("/submit", data=dict(FORM, evidence=[(BytesIO(data), name) for data, name in files]))
+    assert resp.status_code == 200, resp.get_data(as_text=True)
+    return resp.get_json()["complaint_id"]
+
+
+def stored_files() -> list:
+    return sorted(os.path.relpath(os.path.join(root, name), portal.EVIDENCE_DIR)
+                  for root, _, names in os.walk(portal.EVIDENCE_DIR) for name in names
+                  if os.path.relpath(root, portal.EVIDENCE_DIR) != "tmp")
+
+
+def test_the_same_file_is_stored_once(citizen):
+    first = submit(citizen, (PHOTO, "photo.jpg"), (b"notes", "notes.txt"))
+    second = submit(citizen, (PHOTO, "again.JPG"))
+    found = portal.list_evidence([first, second])
+    sha256 = portal.hashlib.sha256(PHOTO).hexdigest()
+    assert (sha256, "photo.jpg", "image/jpeg", len(PHOTO)) in found[first]
+    assert found[second] == [(sha256, "again.JPG", "image/jpeg", len(PHOTO))]
+    notes = portal.hashlib.sha256(b"notes").hexdigest()
+    assert stored_files() == sorted(os.path.join(h[:2], h[2:]) for h in (sha256, notes))
+
+
+def test_officers_download_whole_files_and_ranges(citizen, officer):
+    cid = submit(citizen, (PHOTO, "photo.jpg"))
+    url = f"/officer/evidence/{cid}/{portal.hashlib.sha256(PHOTO).hexdigest()}"
+    whole = officer.get(url)
+    assert whole.status_code == 200 and whole.data == PHOTO and whole.mimetype == "image/jpeg"
+    part = officer.get(url, headers={"Range": "bytes=1000-1999"})
+    assert part.status_code == 206 and part.data == PHOTO[1000:2000]
+    assert officer.get(url, headers={"If-None-Match": whole.headers["ETag"]}).status_code == 304
+    assert officer.get(f"/officer/evidence/{cid}/{'0' * 64}").status_code == 404
+    assert portal.app.test_client().get(url).status_code == 302
+
+
+def test_unlisted_types_are_refused(citizen):
+    resp = citizen.post("/submit", data=dict(FORM, evidence=(BytesIO(b"MZ"), "setup.exe")))
+    assert resp.status_code == 400
+    assert stored_files() == []
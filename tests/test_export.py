@@ -0,0 +1,65 @@
+import csv
+import json
+from datetime import datetime, timedelta
+from io import StringIO
+
+import app as portal
+
+
+def file_complaints(make_complaint, n: int, **fields) -> list:
+    return [make_complaint(petitioner_name="Export, \"quoted\"", description=f"line one\nline two {i}",
+                           created_at=datetime(2025, 4, 1) + timedelta(hours=i), **fields) for i in range(n)]
+
+
+def test_csv_export_streams_every_row(officer, scratch_store, monkeypatch, make_complaint):
+    monkeypatch.setattr(portal, "EXPORT_BATCH_ROWS", 4)
+    ids = file_complaints(make_complaint, 10)
+    resp = officer.get("/officer/export?format=csv")
+    assert resp.status_code == 200 and resp.mimetype == "text/csv"
+    assert resp.headers["Cache-Control"] == "no-store"
+    assert resp.is_streamed
+    rows = list(csv.DictReader(StringIO(resp.get_data(as_text=True))))
+    assert [r["id"] for r in rows] == ids[::-1]
+    assert rows[0]["petitioner_name"] == 'Export, "quoted"'
+    assert rows[0]["description"] == "line one\nline two 9"
+
+
+def test_csv_cells_are_never_formulas(officer, scratch_store, make_complaint):
+    cells = ["=HYPERLINK(\"http://x\")", "+91 1", "-2+3", "@SUM(A1)", "\tcmd", "\rcmd", "plain = text"]
+    for text in cells:
+        make_complaint(description=text)
+    rows = csv.DictReader(StringIO(officer.get("/officer/export?format=csv").get_data(as_text=True)))
+    assert sorted(r["description"] for r in rows) == sorted(["'" + t for t in cells[:-1]] + cells[-1:])
+    # the ndjson export is data, not a sheet, and stays as filed
+    ndjson = officer.get("/officer/export?format=ndjson").get_data(as_text=True)
+    assert sorted(json.loads(line)["description"] for line in ndjson.splitlines()) == sorted(cells)
+
+
+def test_ndjson_export_applies_the_filters(officer, scratch_store, make_complaint):
+    ids = file_complaints(make_complaint, 6)
+    portal.batch_update_complaints(ids[:2], status="Resolved")
+    resp = officer.get("/officer/export?format=ndjson&status=Pending&from_date=2025-04-01&to_date=2025-04-01")
+    assert resp.mimetype == "application/x-ndjson"
+    records = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert [r["id"] for r in records] == ids[:1:-1]
+    assert set(records[0]) == set(portal.COMPLAINT_COLUMNS.split(","))
+
+
+def test_unknown_format_is_refused(officer, scratch_store):
+    assert officer.get("/officer/export?format=xlsx").status_code == 400
+
+
+def test_no_connection_is_held_between_pages(officer, tmp_path, monkeypatch, make_complaint):
+    # one pooled connection, so a page that kept it would starve the calls below
+    store = portal.SqliteStore(portal.ConnectionPool(str(tmp_path / "complaints.db"), 1,
+                                                     attach={"archive": str(tmp_path / "archive.db")}))
+    monkeypatch.setattr(portal, "store", store)
+    store.migrate()
+    monkeypatch.setattr(portal, "DB_BUSY_TIMEOUT_MS", 200)
+    monkeypatch.setattr(portal, "EXPORT_BATCH_ROWS", 3)
+    ids = file_complaints(make_complaint, 8)
+    seen = []
+    for chunk in officer.get("/officer/export?format=ndjson").response:
+        assert portal.count_complaints({}) == 8
+        seen += [json.loads(line)["id"] for line in chunk.decode().splitlines()]
+    assert seen == ids[::-1]
@@ -0,0 +1,60 @@
+import gzip
+import json
+
+import pytest
+
+import app as portal
+
+
+def test_locations_are_served_compressed_with_a_strong_etag(client):
+    plain = client.get("/locations", headers={"Accept-Encoding": "identity"})
+    assert json.loads(plain.data) == portal.locations
+    assert plain.headers["Cache-Control"] == f"public, max-age={portal.LOCATIONS_MAX_AGE}"
+    zipped = client.get("/locations", headers={"Accept-Encoding": "gzip"})
+    assert zipped.headers["Content-Encoding"] == "gzip" and gzip.decompress(zipped.data) == plain.data
+    assert zipped.headers["ETag"] != plain.headers["ETag"] and "Accept-Encoding" in zipped.headers["Vary"]
+    again = client.get("/locations", headers={"Accept-Encoding": "gzip", "If-None-Match": plain.headers["ETag"]})
+    assert again.status_code == 304 and again.data == b""
+
+
+def test_versioned_url_is_immutable(client):
+    etag = portal.LOCATIONS_PAYLOAD["etag"]
+    assert "immutable" in client.get(f"/locations?v={etag}").headers["Cache-Control"]
+    assert "immutable" not in client.get("/locations?v=stale").headers["Cache-Control"]
+
+
+def test_one_taluk(client):
+    resp = client.get("/locations/Sivagiri", headers={"Accept-Encoding": "identity"})
+    assert json.loads(resp.data) == portal.locations["Sivagiri"]
+    assert client.get("/locations/Nowhere").status_code == 404
+
+
+def test_validation_index():
+    assert portal.is_valid_location("Tenkasi", "Kallurani", "Melapavoor")
+    assert portal.is_valid_location("Tenkasi", "Kallurani")
+    # a village of another firka, a firka of another taluk
+    assert not portal.is_valid_location("Tenkasi", "Kallurani", "Pulliyur")
+    assert not portal.is_valid_location("Sivagiri", "Kallurani")
+    assert not portal.is_valid_location("Nowhere")
+
+
+@pytest.mark.parametrize("query", [
+    "status=Closed",
+    "taluk=Tenkasy",
+    "firka=Kallurani",
+    "taluk=Sivagiri&firka=Kallurani",
+    "taluk=Tenkasi&firka=Kallurani&village=Pulliyur",
+    "from_date=01-02-2025",
+])
+@pytest.mark.parametrize("path", [
+    "/officer/panel", "/officer/count", "/officer/export", "/officer/petitions/bundle", "/officer/events",
+])
+def test_unknown_filters_are_refused_not_dropped(officer, path, query):
+    resp = officer.get(f"{path}?{query}")
+    assert resp.status_code == 400 and resp.get_json()["status"] == "error"
+
+
+def test_stats_refuse_unknown_locations(officer):
+    assert officer.get("/officer/stats?taluk=Tenkasi&firka=Kallurani").status_code == 200
+    assert officer.get("/officer/stats?taluk=Tenkasy").status_code == 400
+    assert officer.get("/officer/dashboard?taluk=Sivagiri&firka=Kallurani").status_code == 400
@@ -0,0 +1,105 @@
+import itertools
+
+import pytest
+
+import app as portal
+
+_mobiles = itertools.count(9100000000)
+
+
+@pytest.fixture
+def account():
+    mobile = str(next(_mobiles))
+    assert portal.create_user(mobile, "right-password")
+    return mobile
+
+
+def post_login(client, mobile, password, ip):
+    return client.post("/login", data={"mobile": mobile, "password": password}, environ_base={"REMOTE_ADDR": ip})
+
+
+@pytest.fixture
+def verify_calls(monkeypatch):
+    calls = []
+    verify = portal.password_hasher.verify
+
+    def counting(password_hash, password):
+        calls.append(password)
+        return verify(password_hash, password)
+
+    monkeypatch.setattr(portal.password_hasher, "verify", counting)
+    return calls
+
+
+def test_blocked_login_is_rejected_before_hashing(client, account, verify_calls):
+    for _ in range(portal.LOGIN_MAX_FAILURES):
+        assert post_login(client, account, "wrong", "10.1.0.1").status_code == 302
+    assert len(verify_calls) == portal.LOGIN_MAX_FAILURES
+    resp = post_login(client, account, "right-password", "10.1.0.1")
+    assert resp.status_code == 429
+    assert len(verify_calls) == portal.LOGIN_MAX_FAILURES
+
+
+def test_failures_elsewhere_do_not_lock_the_owner_out(client, account):
+    for n in range(portal.LOGIN_MAX_FAILURES * 2):
+        post_login(client, account, "wrong", f"10.2.0.{n % 2}")
+    assert post_login(client, account, "wrong", "10.2.0.1").status_code == 429
+    resp = post_login(client, account, "right-password", "10.2.0.9")
+    assert resp.status_code == 302 and resp.headers["Location"].endswith("/")
+
+
+def test_guesses_from_many_addresses_hit_the_per_number_ceiling(client, account, monkeypatch):
+    monkeypatch.setattr(portal.login_account_limiter, "limit", portal.LOGIN_MAX_FAILURES * 3)
+    for n in range(portal.LOGIN_MAX_FAILURES * 3):
+        assert post_login(client, account, "wrong", f"10.4.{n}.1").status_code == 302
+    # a fresh address, and the owner's right password, both wait out the window
+    assert post_login(client, account, "right-password", "10.4.99.1").status_code == 429
+    assert post_login(client, str(next(_mobiles)), "wrong", "10.4.99.1").status_code == 302
+
+
+def test_success_clears_the_count(client, account):
+    for _ in range(portal.LOGIN_MAX_FAILURES - 1):
+        post_login(client, account, "wrong", "10.3.0.1")
+    assert post_login(client, account, "right-password", "10.3.0.1").status_code == 302
+    for _ in range(portal.LOGIN_MAX_FAILURES - 1):
+        assert post_login(client, account, "wrong", "10.3.0.1").status_code == 302
+
+
+@pytest.mark.parametrize("shared", [False, True])
+def test_window_expiry(shared, monkeypatch):
+    limiter = portal.SlidingWindowLimiter(f"test-expiry-{shared}", 3, 60, shared=shared)
+    clock = [6_000_000.0]  # the start of a window
+    monkeypatch.setattr(portal.time, "time", lambda: clock[0])
+    for _ in range(3):
+        limiter.hit("k")
+    assert limiter.blocked("k")
+    # next window: the previous bucket still weighs (1 - elapsed share) * 3
+    clock[0] += 60
+    assert limiter.blocked("k")
+    clock[0] += 30
+    assert not limiter.blocked("k")
+    limiter.hit("k")
+    assert not limiter.blocked("k")
+    limiter.hit("k")
+    assert limiter.blocked("k")
+    # two windows on, nothing is left
+    clock[0] += 120
+    assert not limiter.blocked("k")
+
+
+def test_counts_are_shared_across_workers(backend):
+    # two workers' limiters: same name, separate memory
+    first = portal.SlidingWindowLimiter("test-shared", 3, 900, shared=True)
+    second = portal.SlidingWindowLimiter("test-shared", 3, 900, shared=True)
+    first.hit("k")
+    second.hit("k")
+    assert not first.blocked("k")
+    second.hit("k")
+    assert first.blocked("k")
+    second.reset("k")
+    first._local.clear()
+    assert not first.blocked("k")
+    alone = portal.SlidingWindowLimiter("test-shared", 3, 900, shared=False)
+    for _ in range(3):
+        alone.hit("k")
+    assert alone.blocked("k") and not second.blocked("k")
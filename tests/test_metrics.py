@@ -0,0 +1,36 @@
+from datetime import datetime
+
+import app as portal
+
+
+def scrape(client, token=None):
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    return client.get("/metrics", headers=headers)
+
+
+def test_metrics_need_a_token(client, monkeypatch):
+    monkeypatch.setattr(portal, "METRICS_TOKEN", None)
+    assert scrape(client).status_code == 404
+    monkeypatch.setattr(portal, "METRICS_TOKEN", "scrape-token")
+    assert scrape(client).status_code == 401
+    assert scrape(client, "wrong").status_code == 401
+    assert scrape(client, "scrape-token").status_code == 200
+
+
+def test_user_and_complaint_writes_are_timed(client, monkeypatch):
+    monkeypatch.setattr(portal, "METRICS_TOKEN", "scrape-token")
+    assert portal.create_user("9000000701", "pw-metrics")
+    portal.insert_complaint(dict(
+        id="metrics0001", mobile="9000000701", petitioner_name="Metrics", petitioner_dob="1990-01-01",
+        taluk="Tenkasi", firka="Kallurani", village="Melapavoor", description="timed insert", status="Pending",
+        created_at=portal.db_timestamp(datetime.now())))
+    text = scrape(client, "scrape-token").get_data(as_text=True)
+    for helper in ("add_user", "insert_complaint"):
+        assert f'db_call_duration_seconds_count{{helper="{helper}"}}' in text
+
+
+def test_redirected_officer_requests_are_timed(client, monkeypatch):
+    monkeypatch.setattr(portal, "METRICS_TOKEN", "scrape-token")
+    assert client.get("/officer/panel").status_code == 302
+    text = scrape(client, "scrape-token").get_data(as_text=True)
+    assert 'http_request_duration_seconds_count{endpoint="officer_panel",method="GET",status="302"}' in text
@@ -0,0 +1,105 @@
+import os
+import runpy
+import sqlite3
+import subprocess
+import sys
+
+from conftest import sqlite_store
+
+import app as portal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def legacy_database(path):
+    """A database as the first release's init_db left it, before any ALTERs ran."""
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE users (mobile TEXT PRIMARY KEY, password_hash TEXT NOT NULL, created_at TEXT NOT NULL);
+        CREATE TABLE complaints (id TEXT PRIMARY KEY, mobile TEXT, taluk TEXT, firka TEXT, village TEXT,
+                                 description TEXT, status TEXT, created_at TEXT,
+                                 FOREIGN KEY(mobile) REFERENCES users(mobile));
+        INSERT INTO users VALUES ('9000001501', 'pbkdf2:sha256:1000$salt$hash', '2024-03-01 10:00:00');
+        INSERT INTO complaints VALUES ('abcdef12', '9000001501', 'Tenkasi', 'Kallurani', 'Melapavoor',
+                                       'water tanker driver', 'Pending', '2024-03-02 11:30:00');
+        INSERT INTO complaints VALUES ('0123abcd', '9000001501', 'Tenkasi', 'Kallurani', 'Melapavoor',
+                                       'bus conductor', 'Resolved', '2024-03-05T08:15:00.250000');
+    """)
+    conn.commit()
+    conn.close()
+
+
+def test_legacy_database_migrates_with_its_data(tmp_path, monkeypatch):
+    legacy_database(tmp_path / "complaints.db")
+    store = sqlite_store(tmp_path)
+    monkeypatch.setattr(portal, "store", store)
+    applied = store.migrate()
+    assert [name for name, _ in applied] == [f"{n} {name}" for n, (name, _) in enumerate(portal.SQLITE_MIGRATIONS, 1)]
+    assert portal.get_by_id("abcdef12")[2:] == (None, None, "Tenkasi", "Kallurani", "Melapavoor",
+                                                 "water tanker driver", None, "Pending", "2024-03-02T11:30:00.000000")
+    assert portal.get_version("abcdef12") == (1, "2024-03-02T11:30:00.000000")
+    assert [r[0] for r in portal.search_complaints("tanker")] == ["abcdef12"]
+    assert sorted(portal.complaint_stats(from_month="2024-01")[1]) == [("2024-03", "Tenkasi", "Pending", 1),
+                                                                      ("2024-03", "Tenkasi", "Resolved", 1)]
+    with store.connection() as conn:
+        assert conn.execute("SELECT n FROM quota_ledger WHERE period='M:2024-03'").fetchone() == (2,)
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT id FROM complaints WHERE mobile=? ORDER BY created_at",
+                            ("9000001501",)).fetchall()
+    assert "idx_complaints_mobile_created" in str(plan)
+    # the next start finds nothing to do
+    assert store.migrate() == []
+
+
+def test_rerunning_every_step_changes_nothing(scratch_store):
+    portal.insert_complaint(dict(id="migrate01", mobile="9000001502", petitioner_name="M", petitioner_dob="1990-01-01",
+                                 taluk="Tenkasi", firka="Kallurani", village="Melapavoor", description="x",
+                                 status="Pending", created_at=portal.db_timestamp(portal.datetime(2025, 1, 1))))
+    with scratch_store.connection() as conn:
+        before = conn.execute("SELECT type, name, sql FROM sqlite_master ORDER BY name").fetchall()
+        conn.execute("PRAGMA user_version=0")
+    assert len(scratch_store.migrate()) == len(portal.SQLITE_MIGRATIONS)
+    with scratch_store.connection() as conn:
+        assert conn.execute("SELECT type, name, sql FROM sqlite_master ORDER BY name").fetchall() == before
+    assert portal.count_complaints({}) == 1 and portal.stats_drift() == []
+
+
+def import_app(tmp_path, migrate: str):
+    env = dict(os.environ, DB_PATH=str(tmp_path / "complaints.db"), MIGRATE_ON_IMPORT=migrate)
+    out = subprocess.run([sys.executable, "-c", "import sys, app; print('reportlab' in sys.modules)"],
+                         cwd=ROOT, env=env, capture_output=True, text=True, check=True).stdout
+    conn = sqlite3.connect(tmp_path / "complaints.db")
+    try:
+        return out.strip(), conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_import_migrates_unless_told_not_to(tmp_path):
+    (tmp_path / "skip").mkdir()
+    (tmp_path / "run").mkdir()
+    assert import_app(tmp_path / "skip", "0") == ("False", 0)
+    assert import_app(tmp_path / "run", "1") == ("False", len(portal.SQLITE_MIGRATIONS))
+
+
+class FakeServer:
+    def __init__(self):
+        self.logged = []
+        self.log = self
+
+    def info(self, msg, *args):
+        self.logged.append(msg % args)
+
+
+def test_gunicorn_preloads_and_migrates_once_in_the_master(tmp_path, monkeypatch):
+    monkeypatch.setenv("MIGRATE_ON_IMPORT", "1")
+    conf = runpy.run_path(os.path.join(ROOT, "gunicorn.conf.py"))
+    assert conf["preload_app"] is True and conf["worker_class"] == "gthread"
+    assert os.environ["MIGRATE_ON_IMPORT"] == "0"
+    monkeypatch.setattr(portal, "store", sqlite_store(tmp_path))
+    server = FakeServer()
+    conf["on_starting"](server)
+    assert len(server.logged) == len(portal.SQLITE_MIGRATIONS)
+    assert server.logged[0].startswith("applied migration 1 users table")
+    server.logged.clear()
+    conf["on_starting"](server)
+    assert server.logged == []
@@ -0,0 +1,52 @@
+import threading
+
+import pytest
+
+import app as portal
+
+
+def test_timeout_cancels_a_queued_hash_and_frees_its_slot():
+    hasher = portal.PasswordHasher(workers=1, max_pending=1, timeout=0.05)
+    release, ran = threading.Event(), []
+    blocker = hasher._pool().submit(release.wait)  # keeps the only worker busy
+    with pytest.raises(portal.HasherBusy):
+        hasher._run(ran.append, "queued")
+    with pytest.raises(portal.HasherBusy):
+        hasher._run(ran.append, "queued again")
+    release.set()
+    blocker.result()
+    assert hasher._run(ran.append, "after") is None
+    assert ran == ["after"]
+
+
+def test_slow_hash_answers_503(client, monkeypatch):
+    assert portal.create_user("9000000501", "right-password")
+    started = threading.Event()
+
+    def slow_check(password_hash, password):
+        started.set()
+        threading.Event().wait(0.5)
+        return True
+
+    monkeypatch.setattr(portal, "password_hasher", portal.PasswordHasher(timeout=0.05))
+    monkeypatch.setattr(portal, "check_password_hash", slow_check)
+    resp = client.post("/login", data={"mobile": "9000000501", "password": "right-password"})
+    assert started.is_set()
+    assert resp.status_code == 503 and b"try again" in resp.data
+    with client.session_transaction() as sess:
+        assert "user_mobile" not in sess
+
+
+def test_rehash_check_runs_on_the_pool(monkeypatch):
+    hasher = portal.PasswordHasher(workers=1)
+    threads = []
+    generate = portal.generate_password_hash
+
+    def recording(password, method):
+        threads.append(threading.current_thread())
+        return generate(password, method)
+
+    monkeypatch.setattr(portal, "generate_password_hash", recording)
+    assert hasher.needs_rehash("pbkdf2:sha256:1000$salt$hash")
+    assert not hasher.needs_rehash(generate("x", hasher.method))
+    assert len(threads) == 1 and threads[0] is not threading.current_thread()
@@ -0,0 +1,77 @@
+import pytest
+
+import app as portal
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """Fresh cache; returns the list of complaint ids rendered through it."""
+    monkeypatch.setattr(portal, "pdf_cache", portal.PdfCache(1 << 20))
+    calls = []
+    render = portal.render_petition_pdf
+
+    def counting(row, evidence=()):
+        calls.append(row[0])
+        return render(row, evidence)
+
+    monkeypatch.setattr(portal, "render_petition_pdf", counting)
+    return calls
+
+
+def test_download_renders_once_per_version(client, renders, make_complaint):
+    cid = make_complaint()
+    first = client.get(f"/petition/{cid}/download")
+    assert first.status_code == 200 and first.data.startswith(b"%PDF")
+    again = client.get(f"/petition/{cid}/download")
+    assert again.data == first.data and again.headers["ETag"] == first.headers["ETag"]
+    assert renders == [cid]
+    portal.update_status(cid, "In Progress")
+    changed = client.get(f"/petition/{cid}/download")
+    assert changed.headers["ETag"] != first.headers["ETag"]
+    assert renders == [cid, cid]
+
+
+def test_unchanged_petition_answers_304_without_rendering(client, renders, make_complaint):
+    cid = make_complaint()
+    etag = client.get(f"/petition/{cid}/download").headers["ETag"]
+    resp = client.get(f"/petition/{cid}/download", headers={"If-None-Match": etag})
+    assert resp.status_code == 304 and resp.data == b""
+    assert renders == [cid]
+
+
+def test_validators_describe_the_copy_rendered(client, renders, monkeypatch, make_complaint):
+    cid = make_complaint()
+    lookup = portal.get_version
+
+    def changed_meanwhile(cid):
+        meta = lookup(cid)
+        with portal.get_conn() as conn:
+            conn.execute("UPDATE complaints SET status='Resolved', version=version+1, updated_at=? WHERE id=?",
+                         ("2025-03-04T10:00:00", cid))
+        return meta
+
+    monkeypatch.setattr(portal, "get_version", changed_meanwhile)
+    resp = client.get(f"/petition/{cid}/download")
+    assert resp.headers["ETag"].strip('"') == portal._pdf_etag(cid, 2)
+    assert resp.last_modified == portal._http_time("2025-03-04T10:00:00")
+
+
+def test_memory_tier_is_bounded_and_lru():
+    cache = portal.PdfCache(10)
+    cache.put("a", 1, b"aaaa")
+    cache.put("b", 1, b"bbbb")
+    assert cache.get("a", 1) == b"aaaa"  # a is now the most recent
+    cache.put("c", 1, b"cccc")
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) == b"aaaa" and cache.get("c", 1) == b"cccc"
+    cache.put("big", 1, b"x" * 11)
+    assert cache.get("big", 1) is None
+
+
+def test_disk_tier_is_shared_and_keeps_one_version(tmp_path):
+    one, other = portal.PdfCache(1 << 20, str(tmp_path)), portal.PdfCache(1 << 20, str(tmp_path))
+    one.put("cid", 1, b"v1")
+    assert other.get("cid", 1) == b"v1"
+    other.put("cid", 2, b"v2")
+    assert one.get("cid", 2) == b"v2"
+    assert len(list(tmp_path.glob("*.pdf"))) == 1
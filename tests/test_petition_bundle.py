@@ -0,0 +1,46 @@
+import re
+import zipfile
+from datetime import datetime, timedelta
+from io import BytesIO
+
+from click.testing import CliRunner
+
+import app as portal
+
+PAGE = re.compile(rb"/Type /Page[^s]")
+
+
+def file_complaints(make_complaint, n: int) -> list:
+    return [make_complaint(description=f"petition {i}", created_at=datetime(2025, 2, 1) + timedelta(hours=i))
+            for i in range(n)]
+
+
+def test_zip_bundle_has_a_pdf_per_filtered_petition(officer, scratch_store, make_complaint):
+    ids = file_complaints(make_complaint, portal.BULK_PDF_CHUNK + 3)
+    portal.update_status(ids[0], "Rejected")
+    resp = officer.get("/officer/petitions/bundle?format=zip&status=Pending")
+    assert resp.status_code == 200 and resp.is_streamed
+    with zipfile.ZipFile(BytesIO(resp.data)) as zf:
+        names = zf.namelist()
+        assert names == [f"petition-{cid}.pdf" for cid in ids[:0:-1]]
+        first = zf.read(names[0])
+    assert first.startswith(b"%PDF") and len(PAGE.findall(first)) == 1
+
+
+def test_pdf_bundle_has_a_page_per_petition_and_a_cap(officer, scratch_store, monkeypatch, make_complaint):
+    file_complaints(make_complaint, 3)
+    resp = officer.get("/officer/petitions/bundle?format=pdf")
+    assert resp.mimetype == "application/pdf"
+    assert len(PAGE.findall(resp.data)) == 3
+    monkeypatch.setattr(portal, "BULK_PDF_MAX_ROWS", 2)
+    assert officer.get("/officer/petitions/bundle?format=pdf").status_code == 400
+
+
+def test_cli_writes_the_bundle(scratch_store, tmp_path, make_complaint):
+    ids = file_complaints(make_complaint, 5)
+    out = tmp_path / "bundle.zip"
+    result = CliRunner().invoke(portal.bundle_petitions_command, ["--out", str(out), "--workers", "2"])
+    assert result.exit_code == 0, result.output
+    assert result.output.startswith("5 petitions")
+    with zipfile.ZipFile(out) as zf:
+        assert len(zf.namelist()) == len(ids)
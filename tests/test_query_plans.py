@@ -0,0 +1,103 @@
+"""The complaints lookups behind /submit, / and the officer filters stay on an index.
+
+Each helper runs against a migrated SQLite database while its statements
+are recorded, and every SELECT on complaints is then explained.
+"""
+import re
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+
+import app as portal
+from conftest import sqlite_store
+
+MOBILE = "9000000201"
+# a full pass over a complaints table, as opposed to a walk of one of its indexes
+TABLE_SCAN = re.compile(r"^SCAN (main\.|archive\.)?(complaints|c)$")
+
+
+class RecordingConnection:
+    def __init__(self, conn, seen: list):
+        self._conn = conn
+        self._seen = seen
+
+    def execute(self, sql, params=()):
+        self._seen.append((sql, tuple(params)))
+        return self._conn.execute(sql, params)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = sqlite_store(tmp_path)
+    monkeypatch.setattr(portal, "store", store)
+    store.migrate()
+    portal.create_user(MOBILE, "pw-plans-1")
+    places = [(t, f, v) for t, firkas in portal.locations.items() for f, villages in firkas.items() for v in villages]
+    rows = []
+    for n in range(2000):
+        when = portal.db_timestamp(datetime(2025, 1 + n % 12, 1 + n % 28, n % 24))
+        rows.append((f"p{n:04d}", MOBILE if n % 50 == 0 else f"9{n:09d}", "A", "1990-01-01", *places[n % len(places)],
+                     "text", None, portal.STATUS_VALUES[n % 4], when, when))
+    with store.connection() as conn:
+        conn.executemany("INSERT INTO users (mobile, password_hash, created_at) VALUES (?, 'x', '') ON CONFLICT DO NOTHING",
+                         {(r[1],) for r in rows})
+        conn.executemany(
+            f"INSERT INTO complaints ({portal.COMPLAINT_COLUMNS},updated_at) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)", rows)
+        conn.execute("ANALYZE")
+    return store
+
+
+def plans(store, monkeypatch, call) -> list:
+    """(sql, plan lines) for each SELECT reading complaints that ``call`` runs."""
+    seen = []
+    connection = store.connection
+
+    @contextmanager
+    def recording():
+        with connection() as conn:
+            yield RecordingConnection(conn, seen)
+
+    monkeypatch.setattr(store, "connection", recording)
+    call()
+    monkeypatch.setattr(store, "connection", connection)
+    explained = []
+    with store.connection() as conn:
+        for sql, params in seen:
+            if sql.lstrip().upper().startswith("SELECT") and "complaints" in sql:
+                rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+                explained.append((sql, [r[3] for r in rows]))
+    assert explained, "the helper ran no SELECT on complaints"
+    return explained
+
+
+CASES = {
+    "find_complaints_by_mobile": (lambda: portal.find_complaints_by_mobile(MOBILE), "idx_complaints_mobile_created"),
+    "get_user_version": (lambda: portal.get_user_version(MOBILE), "idx_complaints_mobile_created"),
+    "list_all_complaints": (lambda: portal.list_all_complaints({}, limit=50), "idx_complaints_created"),
+    "list_all_complaints next page": (
+        lambda: portal.list_all_complaints({}, limit=50, before=("2025-06-01T00:00:00.000000", "p0100")),
+        "idx_complaints_created"),
+    "list_all_complaints by status and location": (
+        lambda: portal.list_all_complaints({"status": "Pending", "taluk": "Tenkasi", "firka": "Kallurani"}),
+        "idx_complaints_filters"),
+    "list_all_complaints by location": (
+        lambda: portal.list_all_complaints({"taluk": "Tenkasi", "firka": "Kallurani", "village": "Melapavoor"}),
+        "idx_complaints_location"),
+    "list_all_complaints by dates": (
+        lambda: portal.list_all_complaints({"from_date": "2025-03-01", "to_date": "2025-03-31"}),
+        "idx_complaints_created"),
+    "count_complaints by status": (lambda: portal.count_complaints({"status": "Resolved"}), "idx_complaints_filters"),
+}
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_helper_uses_its_index(name, store, monkeypatch):
+    call, index = CASES[name]
+    for sql, plan in plans(store, monkeypatch, call):
+        detail = "\n".join(plan)
+        assert not any(TABLE_SCAN.match(line) for line in plan), f"{sql}\n{detail}"
+        assert any(re.search(rf"USING (COVERING )?INDEX {index}\b", line) for line in plan), f"{sql}\n{detail}"
@@ -0,0 +1,54 @@
+import re
+
+import app as portal
+
+
+def found(text, **filters) -> list:
+    return [r[0] for r in portal.search_complaints(text, filters)]
+
+
+def test_every_word_must_match_as_a_prefix(scratch_store, make_complaint):
+    bus = make_complaint(description="The conductor on the evening bus harasses students")
+    school = make_complaint(description="Harassment outside the school gate")
+    assert sorted(found("harass")) == sorted([bus, school])
+    assert found("harass bus") == [bus]
+    assert found("harass train") == []
+    assert portal.count_search_matches("harass") == 2
+
+
+def test_names_rank_above_descriptions(scratch_store, make_complaint):
+    mention = make_complaint(description="Meena from the next street threatens us")
+    named = make_complaint(petitioner_name="Meena", description="a neighbour threatens us")
+    assert found("meena") == [named, mention]
+
+
+def test_tamil_words_are_kept_whole(scratch_store, make_complaint):
+    cid = make_complaint(description="பேருந்து நிலையத்தில் தொந்தரவு")
+    assert found("தொந்தரவு") == [cid]
+    # a search for part of a word still needs the word's start
+    assert found("ந்தரவு") == []
+
+
+def test_responses_are_indexed_as_they_change(scratch_store, make_complaint):
+    cid = make_complaint()
+    assert found("counselling") == []
+    portal.update_response_and_resolve(cid, "Referred for counselling")
+    assert found("counselling") == [cid]
+    portal.update_response_and_resolve(cid, "Closed after a visit")
+    assert found("counselling") == []
+
+
+def test_query_syntax_is_treated_as_text(scratch_store, make_complaint):
+    cid = make_complaint(description='she said "stop" (twice) AND left')
+    for text in ('"stop"', "stop AND", "(twice", "NEAR(stop left)", "col:stop", "*"):
+        portal.search_complaints(text)
+    assert found('"stop" (twice') == [cid]
+
+
+def test_search_combines_with_filters(officer, scratch_store, make_complaint):
+    pending = make_complaint(description="water tanker driver")
+    make_complaint(description="water tanker driver again", status="Resolved")
+    assert found("tanker", status="Pending") == [pending]
+    page = officer.get("/officer/panel?q=tanker&status=Pending").get_data(as_text=True)
+    assert re.findall(r'<tr data-cid="([^"]+)"', page) == [pending]
+    assert officer.get("/officer/count?q=tanker").get_json()["total"] == 2
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+from click.testing import CliRunner
+
+import app as portal
+
+
+def in_month(month: int) -> datetime:
+    return datetime(2025, month, 3, 9)
+
+
+def test_counters_follow_every_write(scratch_store, make_complaint):
+    a, b = make_complaint(created_at=in_month(5)), make_complaint(created_at=in_month(5))
+    make_complaint(firka="Tenkasi", village="Ilanji", created_at=in_month(6))
+    portal.update_status(a, "In Progress")
+    portal.batch_update_complaints([b], status="Rejected")
+    level, rows = portal.complaint_stats()
+    assert level == "taluk"
+    assert sorted(rows) == [("2025-05", "Tenkasi", "In Progress", 1), ("2025-05", "Tenkasi", "Rejected", 1),
+                            ("2025-06", "Tenkasi", "Pending", 1)]
+    with portal.get_conn() as conn:
+        conn.execute("DELETE FROM complaints WHERE id=?", (a,))
+    assert portal.stats_drift() == []
+
+
+def test_drill_down_and_month_range(scratch_store, make_complaint):
+    make_complaint(created_at=in_month(5))
+    make_complaint(firka="Tenkasi", village="Ilanji", created_at=in_month(5))
+    make_complaint(firka="Tenkasi", village="Ilanji", created_at=in_month(7))
+    assert portal.complaint_stats(taluk="Tenkasi", to_month="2025-06") == (
+        "firka", [("2025-05", "Kallurani", "Pending", 1), ("2025-05", "Tenkasi", "Pending", 1)])
+    assert portal.complaint_stats(taluk="Tenkasi", firka="Tenkasi", from_month="2025-06") == (
+        "village", [("2025-07", "Ilanji", "Pending", 1)])
+
+
+def test_stats_routes(officer, scratch_store, make_complaint):
+    cid = make_complaint(created_at=in_month(5))
+    portal.update_response_and_resolve(cid, "done")
+    data = officer.get("/officer/stats?taluk=Tenkasi").get_json()
+    assert data["level"] == "firka"
+    assert data["cells"] == [{"month": "2025-05", "firka": "Kallurani", "status": "Resolved", "count": 1}]
+    page = officer.get("/officer/dashboard").get_data(as_text=True)
+    assert "Tenkasi" in page and "2025-05" in page
+
+
+def test_rebuild_reports_and_repairs_drift(scratch_store, make_complaint):
+    make_complaint(created_at=in_month(5))
+    with portal.get_conn() as conn:
+        conn.execute("UPDATE complaint_stats SET n = 5")
+    runner = CliRunner()
+    result = runner.invoke(portal.rebuild_stats_command, ["--verify-only"])
+    assert "stored=5 actual=1" in result.output and "1 drifted cell(s)" in result.output
+    assert portal.stats_drift() != []
+    result = runner.invoke(portal.rebuild_stats_command)
+    assert "counters rebuilt" in result.output
+    assert portal.stats_drift() == []
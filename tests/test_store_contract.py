@@ -0,0 +1,176 @@
+"""The same behaviour from every storage backend (see the ``backend`` fixture)."""
+from datetime import datetime, timedelta
+
+import pytest
+
+import app as portal
+
+MOBILE = "9000000101"
+
+
+def complaint(**fields) -> dict:
+    c = dict(mobile=MOBILE, petitioner_name="Lakshmi", petitioner_dob="1990-01-01", taluk="Tenkasi",
+             firka="Kallurani", village="Melapavoor", description="bus driver harassment near the school",
+             status="Pending", created_at=portal.db_timestamp(datetime(2025, 5, 10, 9, 30)))
+    c.update(fields)
+    return c
+
+
+@pytest.fixture
+def user(backend):
+    assert portal.create_user(MOBILE, "correct-password")
+    return MOBILE
+
+
+def test_users(backend):
+    assert portal.create_user("9000000102", "pw-one-two")
+    assert not portal.create_user("9000000102", "pw-other")
+    mobile, password_hash, _ = portal.get_user("9000000102")
+    assert mobile == "9000000102"
+    assert portal.password_hasher.verify(password_hash, "pw-one-two")
+    assert portal.get_user("9000000199") is None
+
+
+def test_lookups(user):
+    first = portal.submit_complaint(complaint())
+    second = portal.submit_complaint(complaint(created_at=portal.db_timestamp(datetime(2025, 6, 1, 8, 0))))
+    row = portal.get_by_id(first)
+    assert row[0] == first and row[2] == "Lakshmi" and row[9] == "Pending"
+    assert portal.get_by_id("missing") is None
+    version, updated_at = portal.get_version(first)
+    assert version == 1 and updated_at == row[10]
+    assert portal.get_with_version(first) == (tuple(row), 1, updated_at)
+    assert portal.get_with_version("missing") == (None, None, None)
+    assert [r[0] for r in portal.find_complaints_by_mobile(user)] == [second, first]
+    assert portal.get_user_version(user)[:2] == (2, 2)
+
+
+def test_taken_id_raises_the_declared_error(user, backend):
+    portal.submit_complaint(complaint(id="TAKEN"))
+    with pytest.raises(backend.duplicate_key_errors):
+        portal.submit_complaint(complaint(id="TAKEN"))
+
+
+def test_listing_paging_and_filters(user):
+    ids = [portal.submit_complaint(complaint(taluk=t, firka=t, village=t, status=s,
+                                             created_at=portal.db_timestamp(datetime(2025, 5, d, 12))))
+           for d, t, s in ((1, "Tenkasi", "Pending"), (2, "Alangulam", "Pending"), (3, "Tenkasi", "Resolved"),
+                           (4, "Tenkasi", "Pending"))]
+    newest = [r[0] for r in portal.list_all_complaints({}, limit=2)]
+    assert newest == [ids[3], ids[2]]
+    last = portal.get_by_id(ids[2])
+    older = [r[0] for r in portal.list_all_complaints({}, limit=10, before=(last[10], last[0]))]
+    assert older == [ids[1], ids[0]]
+    filters = {"taluk": "Tenkasi", "status": "Pending"}
+    assert [r[0] for r in portal.list_all_complaints(filters)] == [ids[3], ids[0]]
+    assert portal.count_complaints(filters) == 2
+    dated = {"from_date": "2025-05-02", "to_date": "2025-05-03"}
+    assert sorted(r[0] for r in portal.iter_complaints(dated, batch_size=1)) == sorted(ids[1:3])
+    assert [r[0] for r in portal.iter_complaints({}, batch_size=3)] == ids[::-1]
+
+
+def test_search(user):
+    english = portal.submit_complaint(complaint(description="teacher threat after school"))
+    tamil = portal.submit_complaint(complaint(description="பேருந்து ஓட்டுநர் தொந்தரவு", taluk="Alangulam",
+                                              firka="Alangulam", village="Alangulam"))
+    assert [r[0] for r in portal.search_complaints("teach")] == [english]
+    assert [r[0] for r in portal.search_complaints("தொந்தரவு")] == [tamil]
+    assert portal.search_complaints("தொந்தரவு", {"taluk": "Tenkasi"}) == []
+    assert portal.count_search_matches("lakshmi") == 2
+    assert portal.search_complaints("?!") == []
+
+
+def test_stats_cover_the_whole_last_month(user):
+    for when, status in ((datetime(2025, 4, 30, 23, 59, 59, 999999), "Pending"),
+                         (datetime(2025, 5, 31, 23, 59, 59, 999999), "Pending"),
+                         (datetime(2025, 6, 1, 0, 0), "Resolved")):
+        portal.submit_complaint(complaint(created_at=portal.db_timestamp(when), status=status))
+    level, rows = portal.complaint_stats(from_month="2025-05", to_month="2025-05")
+    assert (level, rows) == ("taluk", [("2025-05", "Tenkasi", "Pending", 1)])
+    level, rows = portal.complaint_stats(taluk="Tenkasi", to_month="2025-06")
+    assert level == "firka"
+    assert rows == [("2025-06", "Kallurani", "Resolved", 1), ("2025-05", "Kallurani", "Pending", 1),
+                    ("2025-04", "Kallurani", "Pending", 1)]
+
+
+def test_stats_follow_updates_without_drift(user):
+    cid = portal.submit_complaint(complaint())
+    other = portal.submit_complaint(complaint())
+    portal.update_status(cid, "In Progress")
+    portal.update_response_and_resolve(other, "Enquiry completed.")
+    _, rows = portal.complaint_stats(taluk="Tenkasi", firka="Kallurani")
+    assert rows == [("2025-05", "Melapavoor", "In Progress", 1), ("2025-05", "Melapavoor", "Resolved", 1)]
+    assert portal.stats_drift() == []
+    with portal.get_conn() as conn:
+        conn.execute("UPDATE complaint_stats SET n = 5")
+    assert len(portal.stats_drift()) == 3  # emptied cells stay, at 0
+    portal.rebuild_stats()
+    assert portal.stats_drift() == []
+
+
+def test_monthly_quota(user, monkeypatch):
+    monkeypatch.setattr(portal, "MONTHLY_COMPLAINT_LIMIT", 2)
+    monkeypatch.setattr(portal, "QUOTA_WINDOW_LIMIT", 0)
+    portal.submit_complaint(complaint())
+    portal.submit_complaint(complaint())
+    with pytest.raises(portal.QuotaExceeded):
+        portal.submit_complaint(complaint())
+    # a new month starts a new count
+    portal.submit_complaint(complaint(created_at=portal.db_timestamp(datetime(2025, 6, 1, 9))))
+
+
+def test_ledger_backfill_covers_the_whole_window(user, backend, monkeypatch):
+    monkeypatch.setattr(portal, "MONTHLY_COMPLAINT_LIMIT", 0)
+    monkeypatch.setattr(portal, "QUOTA_WINDOW_DAYS", 45)
+    monkeypatch.setattr(portal, "QUOTA_WINDOW_LIMIT", 1)
+    portal.submit_complaint(complaint(created_at=portal.db_timestamp(datetime.now() - timedelta(days=40))))
+    with portal.get_conn() as conn:
+        # a database from before the ledger
+        conn.execute("DROP TABLE quota_ledger")
+        backend.migrate_shared(conn)
+    with pytest.raises(portal.QuotaExceeded):
+        portal.submit_complaint(complaint(created_at=portal.db_timestamp(datetime.now())))
+
+
+def test_batch_update_and_change_log(user):
+    ids = [portal.submit_complaint(complaint()) for _ in range(3)]
+    outcome, rows = portal.batch_update_complaints([ids[0], ids[1], "missing"], status="Rejected")
+    assert outcome == {ids[0]: "updated", ids[1]: "updated", "missing": "not_found"}
+    assert {r[9] for r in rows} == {"Rejected"}
+    assert portal.get_version(ids[0])[0] == 2
+    changes = portal.read_changes(0, 100)
+    assert [(e["kind"], e["row"]["id"]) for e in changes[:3]] == [("new", cid) for cid in ids]
+    assert [(e["kind"], e["prev_status"]) for e in changes[3:]] == [("updated", "Pending")] * 2
+    oldest, newest = portal.change_log_bounds()
+    assert newest - oldest == len(changes) - 1 == 4
+
+
+def test_evidence_and_duplicates(user):
+    text = "my neighbour has been threatening my daughter on the way to school every morning"
+    item = {"sha256": "ab" * 32, "filename": "photo.jpg", "content_type": "image/jpeg", "size": 2048}
+    first = portal.submit_complaint(complaint(description=text, evidence=[item]))
+    second = portal.submit_complaint(complaint(description=text + " again"))
+    assert portal.list_evidence([first, second]) == {first: [("ab" * 32, "photo.jpg", "image/jpeg", 2048)]}
+    assert portal.get_evidence(first, "ab" * 32) is not None
+    paged = {row[0]: files for row, files in portal.iter_complaints_with_evidence({}, batch_size=1)}
+    assert paged == {first: [("ab" * 32, "photo.jpg", "image/jpeg", 2048)], second: ()}
+    matches = portal.list_duplicates([first, second])
+    assert [d for d, _ in matches[second]] == [first]
+    assert matches[second][0][1] >= portal.DUPLICATE_THRESHOLD
+    counts = portal.backfill_duplicate_index(rebuild=True)
+    assert (counts["indexed"], counts["pairs"]) == (2, 1)
+
+
+def test_migrating_again_keeps_data_and_backfills_stats(user, backend):
+    cid = portal.submit_complaint(complaint())
+    with portal.get_conn() as conn:
+        conn.execute("DELETE FROM complaint_stats")
+        if backend.name == "postgres":
+            # a database from before PostgreSQL kept counters
+            conn.execute("DROP TABLE complaint_stats")
+    backend.migrate()
+    assert portal.get_by_id(cid)[0] == cid
+    if backend.name == "postgres":
+        assert portal.stats_drift() == []
+        portal.submit_complaint(complaint())
+        assert portal.complaint_stats()[1] == [("2025-05", "Tenkasi", "Pending", 2)]
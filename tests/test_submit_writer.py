@@ -0,0 +1,53 @@
+import threading
+from datetime import datetime
+
+import pytest
+
+import app as portal
+
+
+def complaint(cid: str) -> dict:
+    text = f"complaint {cid} about harassment near the bus stand every evening"
+    return dict(id=cid, mobile="9000000601", petitioner_name="Writer", petitioner_dob="1990-01-01", taluk="Tenkasi",
+                firka="Kallurani", village="Melapavoor", description=text, status="Pending",
+                created_at=portal.db_timestamp(datetime.now()), signature=portal.description_signature(text))
+
+
+def test_timed_out_submission_is_never_stored(client, monkeypatch):
+    writer = portal.SubmitWriter(64, 1)
+    started, release = threading.Event(), threading.Event()
+    insert = portal._insert_within_quota
+
+    def slow_first(conn, c):
+        if c["id"] == "writer-first":
+            started.set()
+            release.wait(5)
+        return insert(conn, c)
+
+    monkeypatch.setattr(portal, "_insert_within_quota", slow_first)
+    first = threading.Thread(target=writer.submit, args=(complaint("writer-first"),))
+    first.start()
+    assert started.wait(5)
+    # queued behind the group that is committing
+    with pytest.raises(portal.SubmitBusy):
+        writer.submit(complaint("writer-late"), timeout=0.05)
+    release.set()
+    first.join(5)
+    writer.submit(complaint("writer-next"))
+    assert portal.get_by_id("writer-first") and portal.get_by_id("writer-next")
+    assert portal.get_by_id("writer-late") is None
+
+
+def test_submission_in_a_committing_group_waits_for_it(client, monkeypatch):
+    writer = portal.SubmitWriter(64, 1)
+    release = threading.Event()
+    insert = portal._insert_within_quota
+
+    def slow(conn, c):
+        release.wait(5)
+        return insert(conn, c)
+
+    monkeypatch.setattr(portal, "_insert_within_quota", slow)
+    threading.Timer(0.2, release.set).start()
+    writer.submit(complaint("writer-slow"), timeout=0.05)
+    assert portal.get_by_id("writer-slow")
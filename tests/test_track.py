@@ -0,0 +1,35 @@
+from datetime import datetime
+
+import app as portal
+
+MOBILE = "9000000401"
+
+
+def test_search_key_stays_out_of_urls(client, make_complaint):
+    cid = make_complaint(submit=True, mobile=MOBILE, created_at=datetime.now())
+    for key in (cid, MOBILE):
+        resp = client.post("/track", data={"key": key})
+        assert resp.status_code == 303
+        location = resp.headers["Location"]
+        assert location.startswith("/track/") and key not in location
+        page = client.get(location)
+        assert page.status_code == 200 and cid in page.get_data(as_text=True)
+        assert page.headers["Referrer-Policy"] == "no-referrer"
+        again = client.get(location, headers={"If-None-Match": page.headers["ETag"]})
+        assert again.status_code == 304 and again.headers["Referrer-Policy"] == "no-referrer"
+
+
+def test_results_need_the_session_that_searched(client, make_complaint):
+    cid = make_complaint(submit=True, mobile=MOBILE, created_at=datetime.now())
+    location = client.post("/track", data={"key": cid}).headers["Location"]
+    other = portal.app.test_client()
+    resp = other.get(location)
+    assert resp.status_code == 302 and resp.headers["Location"] == "/track"
+    assert cid not in client.get(f"/track?key={cid}").get_data(as_text=True)
+
+
+def test_session_keeps_only_recent_searches(client):
+    locations = [client.post("/track", data={"key": MOBILE}).headers["Location"]
+                 for _ in range(portal.TRACK_SESSION_KEYS + 1)]
+    assert client.get(locations[0]).status_code == 302
+    assert all(client.get(loc).status_code == 200 for loc in locations[1:])